@@ -0,0 +1,37 @@
+"""normalize archive professors
+
+Revision ID: f4c1a8e3b5d2
+Revises: e2b8d4f0a7c3
+Create Date: 2026-10-19 21:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1a8e3b5d2'
+down_revision: Union[str, Sequence[str], None] = 'e2b8d4f0a7c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Match app.utils.professors.normalize_professor_name: NFKC, whitespace
+    # runs collapsed to one space, trimmed.
+    op.execute(
+        """
+        UPDATE archives
+        SET professor = btrim(regexp_replace(normalize(professor, NFKC), '\\s+', ' ', 'g'))
+        WHERE professor IS DISTINCT FROM
+            btrim(regexp_replace(normalize(professor, NFKC), '\\s+', ' ', 'g'))
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The original spellings are not kept; normalization is not reversible.
+    pass
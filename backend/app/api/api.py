@@ -7,6 +7,7 @@ from app.api.services import (
     courses,
     meme,
     notifications,
+    search,
     statistics,
     users,
 )
@@ -19,6 +20,7 @@ api_router.include_router(archives.router, prefix="/archives", tags=["archives"]
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(meme.router, tags=["meme"])
 api_router.include_router(statistics.router, tags=["statistics"])
+api_router.include_router(search.router, tags=["search"])
 api_router.include_router(ai_exam.router, prefix="/ai-exam", tags=["ai-exam"])
 api_router.include_router(
     notifications.router, prefix="/notifications", tags=["notifications"]
@@ -1,7 +1,9 @@
 import asyncio
 import json
 from datetime import datetime, timezone
+from typing import List
 
+from arq.constants import default_queue_name
 from arq.jobs import Job, JobStatus
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,9 +13,11 @@ from app.models.models import (
     ApiKeyResponse,
     ApiKeyUpdate,
     GenerateExamRequest,
+    QueueStats,
     TaskStatusResponse,
     TaskSubmitResponse,
     User,
+    UserRoles,
 )
 from app.utils.auth import get_current_user
 from app.utils.auth_ws import get_ws_token_payload
@@ -42,6 +46,8 @@ _STATUS_MAP = {
 }
 
 TASK_EVENT_STREAM_BLOCK_MS = 5000
+TASK_EVENT_STREAM_READ_COUNT = 100
+API_KEY_VALIDATION_TASK_KIND = "api_key_validation"
 
 
 @router.websocket("/ws/task/{task_id}")
@@ -61,10 +67,15 @@ async def stream_task_status(
     exp = payload.get("exp")
     exp_ts = float(exp) if exp is not None else None
 
-    from app.worker import get_redis_pool
+    from app.worker import (
+        get_redis_pool,
+        get_task_event_redis,
+        task_event_stream_key,
+    )
 
     try:
         redis = await get_redis_pool()
+        events = get_task_event_redis()
 
         metadata_key = f"task_metadata:{task_id}"
         metadata_str = await redis.get(metadata_key)
@@ -77,9 +88,11 @@ async def stream_task_status(
             await websocket.close(code=1008)
             return
 
-        stream_key = f"ai_exam:task_events:{task_id}"
+        stream_key = task_event_stream_key(task_id)
 
-        job = Job(task_id, redis)
+        job = Job(
+            task_id, redis, _queue_name=metadata.get("queue", default_queue_name)
+        )
         job_status_enum = await job.status()
         if job_status_enum is None:
             job_status = "not_found"
@@ -92,23 +105,23 @@ async def stream_task_status(
             created_at=metadata.get("created_at"),
         )
 
-        def _extract_status(fields):
-            if not isinstance(fields, dict):
-                return ""
-            status_raw = fields.get(b"status") or fields.get("status")
-            if isinstance(status_raw, bytes):
-                return status_raw.decode("utf-8", errors="ignore").strip()
-            return str(status_raw or "").strip()
-
-        def _extract_error(fields):
+        def _extract_field(fields, name: str):
             if not isinstance(fields, dict):
                 return None
-            error_raw = fields.get(b"error") or fields.get("error")
-            if isinstance(error_raw, bytes):
-                return error_raw.decode("utf-8", errors="ignore")
-            if error_raw is None:
+            raw = fields.get(name.encode("utf-8"))
+            if raw is None:
+                raw = fields.get(name)
+            if isinstance(raw, bytes):
+                return raw.decode("utf-8", errors="ignore")
+            if raw is None:
                 return None
-            return str(error_raw)
+            return str(raw)
+
+        def _extract_status(fields):
+            return (_extract_field(fields, "status") or "").strip()
+
+        def _extract_error(fields):
+            return _extract_field(fields, "error")
 
         async def _get_job_result():
             last_err: Exception | None = None
@@ -151,9 +164,9 @@ async def stream_task_status(
                 await websocket.close(code=4401)
                 return
 
-            streams = await redis.xread(
+            streams = await events.xread(
                 {stream_key: last_stream_id},
-                count=10,
+                count=TASK_EVENT_STREAM_READ_COUNT,
                 block=TASK_EVENT_STREAM_BLOCK_MS,
             )
             if not streams:
@@ -211,6 +224,21 @@ async def stream_task_status(
 
                     status_value = _extract_status(fields)
 
+                    # Partial output is replayed from the start of the stream,
+                    # so a client that reconnects mid-generation catches up.
+                    chunk_value = _extract_field(fields, "chunk")
+                    if chunk_value is not None:
+                        last_sent_status = status_value or last_sent_status
+                        await websocket.send_json(
+                            TaskStatusResponse(
+                                task_id=task_id,
+                                status=last_sent_status,
+                                created_at=metadata.get("created_at"),
+                                chunk=chunk_value,
+                            ).dict()
+                        )
+                        continue
+
                     if not status_value or status_value == last_sent_status:
                         continue
                     last_sent_status = status_value
@@ -272,7 +300,7 @@ async def submit_generate_task(
     current_user: User = Depends(get_current_user),
 ):
     """Submit AI exam generation task"""
-    from app.worker import get_redis_pool
+    from app.worker import get_redis_pool, plan_fair_enqueue
 
     # logger.info(
     #     f"[API] Task submitted by user {current_user.user_id} "
@@ -295,9 +323,15 @@ async def submit_generate_task(
                 continue
 
             metadata = json.loads(metadata_str.decode("utf-8"))
+            if metadata.get("kind") == API_KEY_VALIDATION_TASK_KIND:
+                continue
             if metadata.get("user_id") == current_user.user_id:
                 task_id = key.decode().replace("task_metadata:", "")
-                job = Job(task_id, redis)
+                job = Job(
+                    task_id,
+                    redis,
+                    _queue_name=metadata.get("queue", default_queue_name),
+                )
                 job_status_enum = await job.status()
 
                 if job_status_enum in [
@@ -323,13 +357,20 @@ async def submit_generate_task(
             "temperature": request.temperature,
         }
 
-        job = await redis.enqueue_job("generate_ai_exam_task", task_data)
+        queue_name, score_at = await plan_fair_enqueue(redis, current_user.user_id)
+        job = await redis.enqueue_job(
+            "generate_ai_exam_task",
+            task_data,
+            _queue_name=queue_name,
+            _defer_until=score_at,
+        )
 
         metadata = {
             "user_id": current_user.user_id,
             "archive_ids": request.archive_ids,
             "created_at": datetime.utcnow().isoformat(),
             "status": "pending",
+            "queue": queue_name,
         }
         await redis.set(
             f"task_metadata:{job.job_id}",
@@ -355,6 +396,29 @@ async def submit_generate_task(
         )
 
 
+@router.get("/admin/queues", response_model=List[QueueStats])
+async def get_queue_stats(
+    current_user: UserRoles = Depends(get_current_user),
+):
+    """Get AI worker queue depth and wait times (admin only)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+
+    from app.worker import get_queue_stats as collect_queue_stats
+    from app.worker import get_redis_pool
+
+    try:
+        redis = await get_redis_pool()
+        return await collect_queue_stats(redis)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get queue stats: {str(e)}",
+        )
+
+
 @router.delete("/task/{task_id}")
 async def delete_task(
     task_id: str,
@@ -434,29 +498,76 @@ async def get_api_key_status(
         )
 
 
+async def _enqueue_api_key_validation(user_id: int, api_key: str) -> str:
+    from app.worker import (
+        INTERACTIVE_QUEUE_NAME,
+        get_redis_pool,
+        stash_pending_api_key,
+    )
+
+    redis = await get_redis_pool()
+    key_ref = await stash_pending_api_key(redis, api_key)
+    job = await redis.enqueue_job(
+        "validate_api_key_task",
+        {"user_id": user_id, "key_ref": key_ref},
+        _queue_name=INTERACTIVE_QUEUE_NAME,
+    )
+    metadata = {
+        "user_id": user_id,
+        "kind": API_KEY_VALIDATION_TASK_KIND,
+        "created_at": datetime.utcnow().isoformat(),
+        "status": "pending",
+        "queue": INTERACTIVE_QUEUE_NAME,
+    }
+    await redis.set(
+        f"task_metadata:{job.job_id}",
+        json.dumps(metadata),
+        ex=86400,  # 24 hours TTL
+    )
+    return job.job_id
+
+
 @router.put("/api-key", response_model=ApiKeyResponse)
 async def update_api_key(
     request: ApiKeyUpdate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
-    """Update user's API key"""
+    """
+    Update user's API key
+
+    With defer_validation the key is checked and saved by the worker; the
+    returned validation_task_id can be followed on /ws/task/{task_id}.
+    """
     from sqlmodel import select, update
 
+    from app.services.gemini import (
+        GeminiErrorKind,
+        InvalidApiKeyError,
+        classify_gemini_error,
+        get_cached_key_validation,
+        validate_api_key,
+    )
+
     try:
+        validation_task_id = None
         if request.gemini_api_key:
-            from google import genai
-
-            client = genai.Client(api_key=request.gemini_api_key)
-            client.models.generate_content(model="gemini-2.5-flash", contents="Hello")
-
-        stmt = (
-            update(User)
-            .where(User.id == current_user.user_id, User.deleted_at.is_(None))
-            .values(gemini_api_key=request.gemini_api_key)
-        )
-        await db.execute(stmt)
-        await db.commit()
+            cached = get_cached_key_validation(request.gemini_api_key)
+            if request.defer_validation and cached is None:
+                validation_task_id = await _enqueue_api_key_validation(
+                    current_user.user_id, request.gemini_api_key
+                )
+            else:
+                await validate_api_key(request.gemini_api_key)
+
+        if validation_task_id is None:
+            stmt = (
+                update(User)
+                .where(User.id == current_user.user_id, User.deleted_at.is_(None))
+                .values(gemini_api_key=request.gemini_api_key)
+            )
+            await db.execute(stmt)
+            await db.commit()
 
         # Get updated user data
         user_query = select(User).where(
@@ -471,12 +582,30 @@ async def update_api_key(
         if has_api_key and user:
             api_key_masked = f"****{user.gemini_api_key[-4:]}"
 
-        return ApiKeyResponse(has_api_key=has_api_key, api_key_masked=api_key_masked)
+        return ApiKeyResponse(
+            has_api_key=has_api_key,
+            api_key_masked=api_key_masked,
+            validation_task_id=validation_task_id,
+        )
     except HTTPException:
         raise
+    except InvalidApiKeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid API Key: {str(e)}",
+        )
     except Exception as e:
         # logger.error(f"[API] Failed to update API key: {str(e)}")
 
+        if classify_gemini_error(e) in (
+            GeminiErrorKind.RATE_LIMITED,
+            GeminiErrorKind.SERVER_ERROR,
+            GeminiErrorKind.TIMEOUT,
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not validate API key right now, please try again later",
+            )
         # Check if it's an API key validation error
         if "API key" in str(e) or "authentication" in str(e).lower():
             raise HTTPException(
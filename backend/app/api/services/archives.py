@@ -1,6 +1,7 @@
-import io
+import logging
 import os
 import uuid
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile, status
 from sqlmodel import select
@@ -8,13 +9,86 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 from app.db.session import get_session
-from app.models.models import Archive, Course, CourseCategory, User
+from app.models.models import (
+    Archive,
+    Course,
+    CourseCategory,
+    ProfessorSuggestion,
+    StorageCacheStats,
+    User,
+    UserRoles,
+)
+from app.services import counters, professors
 from app.utils.auth import get_current_user
-from app.utils.storage import get_minio_client
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def _enqueue_archive_jobs(archive_id: int, functions: list[str]):
+    from app.worker import BATCH_QUEUE_NAME, archive_job_id, get_redis_pool
+
+    try:
+        redis = await get_redis_pool()
+        for function in functions:
+            await redis.enqueue_job(
+                function,
+                archive_id,
+                _job_id=archive_job_id(function, archive_id),
+                _queue_name=BATCH_QUEUE_NAME,
+            )
+    except Exception:
+        # Preprocessing and previews are optimisations; the worker can still
+        # do them lazily or in the preview backfill.
+        logger.exception("Failed to enqueue post-upload jobs for archive %s", archive_id)
+
+
+@router.get("/admin/storage-cache", response_model=StorageCacheStats)
+async def get_storage_cache_stats(
+    current_user: UserRoles = Depends(get_current_user),
+):
+    """
+    Hit and miss counts of the local storage cache in the process serving
+    this request (admin only). Poll it to follow the hit rate under load.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+
+    cache = get_storage().cache
+    if cache is None:
+        return StorageCacheStats(pid=os.getpid(), enabled=False)
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return StorageCacheStats(
+        pid=os.getpid(),
+        enabled=True,
+        hit_rate=stats["hits"] / lookups if lookups else None,
+        **stats,
+    )
+
+
+@router.get("/professors", response_model=List[ProfessorSuggestion])
+async def suggest_professors(
+    q: str = "",
+    course_id: Optional[int] = None,
+    limit: int = 10,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Autocomplete professor names, most used first, optionally within one
+    course. Served from an in-process index of live archives.
+    """
+    safe_limit = max(1, min(int(limit or 10), professors.PROFESSOR_SUGGESTIONS_MAX))
+    return await professors.suggest_professors(
+        db, q, course_id=course_id, limit=safe_limit
+    )
+
+
 @router.post("/upload")
 async def upload_archive(
     file: UploadFile,
@@ -51,6 +125,7 @@ async def upload_archive(
     if not course:
         course = Course(name=subject, category=category)
         db.add(course)
+        await counters.bump_counters(db, courses=1)
         await db.commit()
         await db.refresh(course)
 
@@ -69,21 +144,14 @@ async def upload_archive(
             detail="File size exceeds 20MB limit"
         )
 
+    professor = await professors.canonical_professor_name(db, professor)
+
     _, file_extension = os.path.splitext(file.filename)
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     object_name = f"archives/{course.id}/{unique_filename}"
 
     try:
-        minio_client = get_minio_client()
-        file_data = io.BytesIO(file_content)
-
-        minio_client.put_object(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            object_name=object_name,
-            data=file_data,
-            length=file_size,
-            content_type="application/pdf",
-        )
+        await get_storage().put(object_name, file_content)
 
         archive = Archive(
             course_id=course.id,
@@ -97,8 +165,20 @@ async def upload_archive(
         )
 
         db.add(archive)
+        await counters.bump_counters(db, archives=1)
         await db.commit()
         await db.refresh(archive)
+        professors.invalidate_professor_index()
+
+        post_upload_jobs = []
+        if settings.ARCHIVE_OPTIMIZE_PDFS:
+            post_upload_jobs.append("optimize_archive_task")
+        if settings.ARCHIVE_PREVIEWS_ENABLED:
+            post_upload_jobs.append("generate_archive_previews_task")
+        if settings.AI_EXAM_PREPROCESS_PDFS:
+            post_upload_jobs.append("preprocess_archive_task")
+        if post_upload_jobs:
+            await _enqueue_archive_jobs(archive.id, post_upload_jobs)
 
         return {
             "success": True,
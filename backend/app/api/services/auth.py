@@ -11,8 +11,14 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 from app.db.session import get_session
 from app.models.models import User
+from app.services import counters
 from app.services.auth import oauth_callback
-from app.utils.auth import authenticate_user, blacklist_token, get_current_user
+from app.utils.auth import (
+    authenticate_user,
+    blacklist_token,
+    clear_current_user_activity,
+    get_current_user,
+)
 from app.utils.jwt import jwt
 
 router = APIRouter()
@@ -110,11 +116,13 @@ async def auth_callback_endpoint(
             last_login=now,
         )
         db.add(user)
+        await counters.bump_counters(db, users=1)
         await db.commit()
         await db.refresh(user)
     else:
         if user.deleted_at is not None:
             user.deleted_at = None
+            await counters.bump_counters(db, users=1)
         user.last_login = now
         await db.commit()
         await db.refresh(user)
@@ -159,4 +167,5 @@ async def logout(
     if auth_header and auth_header.startswith("Bearer "):
         token = auth_header.split(" ")[1]
         blacklist_token(token)
+    clear_current_user_activity(current_user.user_id)
     return {"message": "Successfully logged out"}
@@ -1,28 +1,39 @@
 import json
 from datetime import datetime, timedelta, timezone
-from typing import List
+from urllib.parse import quote
+from typing import AsyncIterator, Callable, List
 
 from fastapi import (
     APIRouter,
     Depends,
     Form,
     HTTPException,
+    Request,
+    Response,
     WebSocket,
     WebSocketDisconnect,
     status,
 )
 from fastapi.encoders import jsonable_encoder
-from sqlmodel import select
+from fastapi.responses import StreamingResponse
+from sqlmodel import select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 from app.db.session import get_session
 from app.models.models import (
     Archive,
+    ArchiveBundleCreate,
+    ArchiveBundleRead,
     ArchiveDiscussionMessage,
     ArchiveDiscussionMessageRead,
+    ArchiveAccessRead,
     ArchiveRead,
     ArchiveType,
     ArchiveUpdateCourse,
+    BulkArchiveMove,
+    BulkIds,
+    BulkOperationResult,
     Course,
     CourseCreate,
     CourseInfo,
@@ -32,9 +43,17 @@ from app.models.models import (
     User,
     UserRoles,
 )
+from app.services import archive_access, bulk, bundles, counters, professors
 from app.utils.auth import get_current_user
 from app.utils.auth_ws import get_ws_token_payload
-from app.utils.storage import presigned_get_url
+from app.utils.ranges import RangeNotSatisfiable, etag_matches, parse_range_header
+from app.utils.storage import (
+    ARCHIVE_PREVIEW_VARIANTS,
+    ObjectNotFound,
+    get_storage,
+    presigned_get_url,
+    preview_object_name,
+)
 
 router = APIRouter()
 
@@ -128,9 +147,163 @@ async def get_archive_preview_url(
             status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
         )
 
-    return {
-        "url": presigned_get_url(archive.object_name, expires=timedelta(minutes=30))
+    if settings.ARCHIVE_CONTENT_PROXY_ENABLED:
+        # Relative to the API root; the client sends its token with it.
+        return {
+            "url": f"/courses/{course_id}/archives/{archive_id}/content",
+            "proxied": True,
+        }
+
+    # The optimized copy is linearized, so the first page shows sooner.
+    object_name = archive.optimized_object_name or archive.object_name
+    return {"url": presigned_get_url(object_name, expires=timedelta(minutes=30))}
+
+
+def _ranged_response(
+    request: Request,
+    *,
+    size: int,
+    etag: str,
+    media_type: str,
+    body: Callable[[int, int], AsyncIterator[bytes]],
+    headers: dict[str, str],
+) -> Response:
+    """
+    GET/HEAD response for a `size`-byte resource: 304 for a matching
+    If-None-Match, 206 or 416 for a single byte Range, 200 otherwise.
+    `body(offset, length)` streams the selected bytes and is only called
+    when they are sent.
+    """
+    headers = {**headers, "Accept-Ranges": "bytes", "ETag": etag}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    # A stale If-Range means the client's partial copy is outdated: send it all.
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == etag:
+        try:
+            byte_range = parse_range_header(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+
+    if byte_range is None:
+        status_code, offset, length = status.HTTP_200_OK, 0, size
+    else:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        offset, length = byte_range.start, byte_range.length
+        headers["Content-Range"] = byte_range.content_range(size)
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD" or length == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        body(offset, length),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+@router.api_route(
+    "/{course_id}/archives/{archive_id}/content", methods=["GET", "HEAD"]
+)
+async def get_archive_content(
+    course_id: int,
+    archive_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    The archive PDF relayed from storage, honouring a single byte Range and
+    If-None-Match, so pdf.js can load only the parts of the file it shows.
+    Chunks are passed through as they arrive; nothing is buffered whole.
+    """
+    query = select(Archive).where(
+        Archive.course_id == course_id,
+        Archive.id == archive_id,
+        Archive.deleted_at.is_(None),
+    )
+    result = await db.execute(query)
+    archive = result.scalar_one_or_none()
+
+    if not archive:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
+        )
+
+    storage = get_storage()
+    object_name = archive.optimized_object_name or archive.object_name
+    try:
+        info = await storage.stat(object_name)
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
+        )
+
+    def body(offset: int, length: int):
+        archive_access.record_archive_access(archive.id, length)
+        return storage.stream(object_name, offset=offset, length=length, info=info)
+
+    return _ranged_response(
+        request,
+        size=info.size,
+        etag=f'"{info.etag}"',
+        media_type="application/pdf",
+        body=body,
+        headers={"Cache-Control": "private, no-cache"},
+    )
+
+
+@router.get("/{course_id}/archives/{archive_id}/preview-image")
+async def get_archive_preview_image(
+    course_id: int,
+    archive_id: int,
+    request: Request,
+    variant: str = "thumb",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    First-page image of an archive ("thumb" for lists, "page" for a quick
+    look), a few KB instead of the whole PDF. Images never change once
+    rendered, so they are cached by the browser for a long time.
+    """
+    if variant not in ARCHIVE_PREVIEW_VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid preview variant"
+        )
+
+    query = select(Archive).where(
+        Archive.course_id == course_id,
+        Archive.id == archive_id,
+        Archive.deleted_at.is_(None),
+    )
+    result = await db.execute(query)
+    archive = result.scalar_one_or_none()
+
+    if not archive or archive.previews_generated_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Preview not available"
+        )
+
+    version = int(archive.previews_generated_at.timestamp())
+    headers = {
+        "Cache-Control": (
+            f"private, max-age={settings.ARCHIVE_PREVIEW_CACHE_MAX_AGE_SECONDS}, "
+            "immutable"
+        ),
+        "ETag": f'"{archive.id}-{variant}-{version}"',
     }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image = await get_storage().get(preview_object_name(archive.object_name, variant))
+    return Response(content=image, media_type="image/webp", headers=headers)
 
 
 @router.get("/{course_id}/archives/{archive_id}/download")
@@ -158,10 +331,92 @@ async def get_archive_download_url(
         )
 
     archive.download_count += 1
+    await counters.bump_counters(db, downloads=1)
     await db.commit()
     await db.refresh(archive)
 
-    return {"url": presigned_get_url(archive.object_name, expires=timedelta(hours=1))}
+    object_name = archive.optimized_object_name or archive.object_name
+    return {"url": presigned_get_url(object_name, expires=timedelta(hours=1))}
+
+
+@router.post("/{course_id}/bundles", response_model=ArchiveBundleRead)
+async def create_archive_bundle(
+    course_id: int,
+    selection: ArchiveBundleCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Prepare a zip of the course's archives (all, filtered, or the given ids)
+    and count one download for each. The returned URL works without a
+    token until the bundle expires, so browsers can download and resume it
+    natively, the same way presigned URLs work.
+    """
+    result = await db.execute(
+        select(Course).where(Course.id == course_id, Course.deleted_at.is_(None))
+    )
+    course = result.scalar_one_or_none()
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Course with id {course_id} not found",
+        )
+
+    archives = await bundles.select_bundle_archives(db, course_id, selection)
+    try:
+        manifest = await bundles.create_bundle(get_storage(), course, archives)
+    except bundles.BundleError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except ObjectNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Archive not found"
+        )
+
+    archive_ids = [archive.id for archive in archives]
+    await db.execute(
+        update(Archive)
+        .where(Archive.id.in_(archive_ids))
+        .values(download_count=Archive.download_count + 1)
+    )
+    await counters.bump_counters(db, downloads=len(archive_ids))
+    await db.commit()
+
+    return ArchiveBundleRead(
+        id=manifest.id,
+        url=f"/courses/{course_id}/bundles/{manifest.id}",
+        filename=manifest.filename,
+        size=manifest.layout.total_size,
+        archive_count=len(archive_ids),
+    )
+
+
+@router.api_route("/{course_id}/bundles/{bundle_id}", methods=["GET", "HEAD"])
+async def download_archive_bundle(course_id: int, bundle_id: str, request: Request):
+    """
+    Stream a prepared bundle as a stored zip, PDFs relayed from storage as
+    they are read. Range requests resume an interrupted download.
+    """
+    manifest = bundles.load_bundle(bundle_id)
+    if manifest is None or manifest.course_id != course_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found"
+        )
+
+    storage = get_storage()
+    filename = quote(manifest.filename)
+    return _ranged_response(
+        request,
+        size=manifest.layout.total_size,
+        etag=manifest.etag,
+        media_type="application/zip",
+        body=lambda offset, length: bundles.iter_bundle(
+            manifest, storage, offset, offset + length - 1
+        ),
+        headers={
+            "Cache-Control": "private, no-cache",
+            "Content-Disposition": f"attachment; filename*=UTF-8''{filename}",
+        },
+    )
 
 
 async def _ensure_archive_exists_for_discussion(
@@ -464,7 +719,7 @@ async def update_archive(
     if name is not None:
         archive.name = name
     if professor is not None:
-        archive.professor = professor
+        archive.professor = await professors.canonical_professor_name(db, professor)
     if archive_type is not None:
         archive.archive_type = archive_type
     if has_answers is not None:
@@ -475,6 +730,7 @@ async def update_archive(
     archive.updated_at = datetime.now(timezone.utc)
 
     await db.commit()
+    professors.invalidate_professor_index()
     await db.refresh(archive)
 
     return archive
@@ -557,6 +813,7 @@ async def update_archive_course(
                 name=course_update.course_name, category=course_update.course_category
             )
             db.add(new_course)
+            await counters.bump_counters(db, courses=1)
             await db.commit()
             await db.refresh(new_course)
     else:
@@ -572,6 +829,7 @@ async def update_archive_course(
     archive.updated_at = datetime.now(timezone.utc)
 
     await db.commit()
+    professors.invalidate_professor_index()
     await db.refresh(archive)
 
     return {
@@ -613,7 +871,11 @@ async def delete_archive(
         )
 
     archive.deleted_at = datetime.now(timezone.utc)
+    await counters.bump_counters(
+        db, archives=-1, downloads=-archive.download_count
+    )
     await db.commit()
+    professors.invalidate_professor_index()
 
     return {"message": "Archive deleted successfully"}
 
@@ -650,6 +912,7 @@ async def create_course(
     course = Course(name=course_data.name, category=course_data.category)
 
     db.add(course)
+    await counters.bump_counters(db, courses=1)
     await db.commit()
     await db.refresh(course)
 
@@ -741,30 +1004,255 @@ async def delete_course(
             status_code=status.HTTP_404_NOT_FOUND, detail="Course not found"
         )
 
-    archives_query = select(Archive).where(
-        Archive.course_id == course_id, Archive.deleted_at.is_(None)
-    )
-    archives_result = await db.execute(archives_query)
-    archives = archives_result.scalars().all()
-
-    # Soft delete all associated archives and the course
+    # Soft delete the course and, in one statement, its archives. They share
+    # the timestamp so restore_course can tell cascaded rows apart.
     current_time = datetime.now(timezone.utc)
-    for archive in archives:
-        archive.deleted_at = current_time
-
-    # Soft delete the course
     course.deleted_at = current_time
+    archive_count, archive_downloads = await bulk.soft_delete_archives(
+        db, Archive.course_id == course_id, deleted_at=current_time
+    )
+    message_count = 0
+    if settings.COURSE_DELETE_CASCADE_DISCUSSIONS:
+        message_count = await bulk.soft_delete_course_discussions(
+            db, [course_id], deleted_at=current_time
+        )
 
+    await counters.bump_counters(
+        db, courses=-1, archives=-archive_count, downloads=-archive_downloads
+    )
     await db.commit()
+    professors.invalidate_professor_index()
 
     return {
         "message": (
-            f"Course '{course.name}' and {len(archives)} associated "
+            f"Course '{course.name}' and {archive_count} associated "
             f"archives deleted successfully"
-        )
+        ),
+        "archives_deleted": archive_count,
+        "messages_deleted": message_count,
     }
 
 
+@router.post("/admin/courses/{course_id}/restore", response_model=CourseRead)
+async def restore_course(
+    course_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Undo delete_course: restore the course with the archives and discussion
+    messages deleted along with it. Only admins can restore courses.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can restore courses",
+        )
+
+    query = select(Course).where(
+        Course.id == course_id, Course.deleted_at.is_not(None)
+    )
+    result = await db.execute(query)
+    course = result.scalar_one_or_none()
+
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Deleted course not found"
+        )
+
+    check_query = select(Course.id).where(
+        Course.name == course.name,
+        Course.category == course.category,
+        Course.deleted_at.is_(None),
+    )
+    if await db.scalar(check_query) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Course with this name and category already exists",
+        )
+
+    deleted_at = course.deleted_at
+    archive_count, archive_downloads = await bulk.restore_archives(
+        db, Archive.course_id == course_id, deleted_at=deleted_at
+    )
+    await bulk.restore_course_discussions(db, [course_id], deleted_at=deleted_at)
+    course.deleted_at = None
+
+    await counters.bump_counters(
+        db, courses=1, archives=archive_count, downloads=archive_downloads
+    )
+    await db.commit()
+    professors.invalidate_professor_index()
+    await db.refresh(course)
+
+    return course
+
+
+@router.post("/admin/courses/bulk-delete", response_model=BulkOperationResult)
+async def bulk_delete_courses(
+    payload: BulkIds,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Soft delete many courses and their archives in one transaction.
+    Only admins can delete courses.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can delete courses",
+        )
+
+    ids = bulk.unique_ids(payload.ids)
+    current_time = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(Course)
+        .where(Course.id.in_(ids), Course.deleted_at.is_(None))
+        .values(deleted_at=current_time)
+        .returning(Course.id)
+    )
+    deleted_ids = result.scalars().all()
+
+    archive_count, archive_downloads = 0, 0
+    if deleted_ids:
+        archive_count, archive_downloads = await bulk.soft_delete_archives(
+            db, Archive.course_id.in_(deleted_ids), deleted_at=current_time
+        )
+        if settings.COURSE_DELETE_CASCADE_DISCUSSIONS:
+            await bulk.soft_delete_course_discussions(
+                db, deleted_ids, deleted_at=current_time
+            )
+
+    await counters.bump_counters(
+        db,
+        courses=-len(deleted_ids),
+        archives=-archive_count,
+        downloads=-archive_downloads,
+    )
+    await db.commit()
+    professors.invalidate_professor_index()
+
+    return bulk.bulk_result(ids, deleted_ids, missing_detail="Course not found")
+
+
+@router.post("/admin/archives/bulk-move", response_model=BulkOperationResult)
+async def bulk_move_archives(
+    payload: BulkArchiveMove,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Move many archives to one course, e.g. after merging courses.
+    Only admins can change archive's course.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can change archive's course",
+        )
+
+    target = await db.scalar(
+        select(Course.id).where(
+            Course.id == payload.course_id, Course.deleted_at.is_(None)
+        )
+    )
+    if target is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Target course not found"
+        )
+
+    ids = bulk.unique_ids(payload.ids)
+    result = await db.execute(
+        update(Archive)
+        .where(Archive.id.in_(ids), Archive.deleted_at.is_(None))
+        .values(course_id=payload.course_id, updated_at=datetime.now(timezone.utc))
+        .returning(Archive.id)
+    )
+    moved_ids = result.scalars().all()
+    await db.commit()
+    professors.invalidate_professor_index()
+
+    return bulk.bulk_result(ids, moved_ids, missing_detail="Archive not found")
+
+
+@router.post("/admin/archives/bulk-delete", response_model=BulkOperationResult)
+async def bulk_delete_archives(
+    payload: BulkIds,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Soft delete many archives in one statement. Only admins can use this.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can delete archives in bulk",
+        )
+
+    ids = bulk.unique_ids(payload.ids)
+    result = await db.execute(
+        update(Archive)
+        .where(Archive.id.in_(ids), Archive.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(timezone.utc))
+        .returning(Archive.id, Archive.download_count)
+    )
+    deleted = result.all()
+
+    await counters.bump_counters(
+        db,
+        archives=-len(deleted),
+        downloads=-sum(download_count for _, download_count in deleted),
+    )
+    await db.commit()
+    professors.invalidate_professor_index()
+
+    return bulk.bulk_result(
+        ids, [archive_id for archive_id, _ in deleted], missing_detail="Archive not found"
+    )
+
+
+@router.get(
+    "/admin/courses/{course_id}/archive-access",
+    response_model=List[ArchiveAccessRead],
+)
+async def list_archive_access(
+    course_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Requests and bytes served through the content endpoint for each live
+    archive of a course, most requested first. Only admins can access this.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can access archive usage",
+        )
+
+    result = await db.execute(
+        select(Archive.id, Archive.name)
+        .where(Archive.course_id == course_id, Archive.deleted_at.is_(None))
+        .order_by(Archive.id)
+    )
+    archives = result.all()
+    access = archive_access.get_archive_access(
+        archive_id for archive_id, _ in archives
+    )
+    usage = [
+        ArchiveAccessRead(
+            archive_id=archive_id,
+            name=name,
+            requests=access[archive_id][0],
+            bytes_sent=access[archive_id][1],
+        )
+        for archive_id, name in archives
+    ]
+    return sorted(usage, key=lambda item: item.requests, reverse=True)
+
+
 @router.get("/admin/courses", response_model=List[CourseRead])
 async def list_all_courses(
     current_user: User = Depends(get_current_user),
@@ -1,24 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import select
-from sqlalchemy import func
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.session import get_session
-from app.models.models import Meme, MemeRead
+from app.models.models import MemeRead
+from app.services.memes import pick_random_meme
 
 router = APIRouter()
 
 
 @router.get("/meme", response_model=MemeRead)
 async def get_random_meme(
+    language: Optional[str] = Query(default=None),
     db: AsyncSession = Depends(get_session),
 ):
     """
-    Get a random meme.
+    Get a random meme, optionally in a given language.
     """
-    query = select(Meme).order_by(func.random()).limit(1)
-    result = await db.execute(query)
-    meme = result.scalar_one_or_none()
+    meme = await pick_random_meme(db, language)
 
     if not meme:
         raise HTTPException(status_code=404, detail="No memes available")
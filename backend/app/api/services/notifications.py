@@ -1,10 +1,17 @@
-from datetime import datetime, timezone
-from typing import List
+import json
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from redis.exceptions import WatchError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 from app.db.session import get_session
 from app.models.models import (
     Notification,
@@ -13,45 +20,161 @@ from app.models.models import (
     NotificationUpdate,
     UserRoles,
 )
+from app.services import notification_events
+from app.utils import auth
 from app.utils.auth import get_current_user
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
+ACTIVE_NOTIFICATIONS_CACHE_KEY = "notifications:active"
+# Bumped by every admin write; a cache fill only lands if it is unchanged.
+NOTIFICATIONS_VERSION_KEY = "notifications:version"
 
-def _apply_time_filters(statement):
+
+def _is_visible(notification: Notification, now: datetime) -> bool:
+    return (notification.starts_at is None or notification.starts_at <= now) and (
+        notification.ends_at is None or notification.ends_at >= now
+    )
+
+
+def _next_transition(
+    notifications: List[Notification], now: datetime
+) -> Optional[datetime]:
+    """Earliest future moment at which a notification appears or disappears."""
+    transitions = []
+    for notification in notifications:
+        if notification.starts_at is not None and notification.starts_at > now:
+            transitions.append(notification.starts_at)
+        elif notification.ends_at is not None:
+            # Still visible at ends_at itself, gone right after.
+            transitions.append(notification.ends_at + timedelta(milliseconds=1))
+    return min(transitions, default=None)
+
+
+async def _load_active_notifications(db: AsyncSession) -> tuple[bytes, int]:
+    """Return the serialized active set and how many ms it stays valid."""
     now = datetime.now(timezone.utc)
-    return (
-        statement.where(Notification.deleted_at.is_(None))
+    # Fetch what is visible now plus what is scheduled to appear, so the
+    # cache TTL can end exactly at the next visibility change.
+    query = (
+        select(Notification)
+        .where(Notification.deleted_at.is_(None))
         .where(Notification.is_active.is_(True))
-        .where((Notification.starts_at.is_(None)) | (Notification.starts_at <= now))
         .where((Notification.ends_at.is_(None)) | (Notification.ends_at >= now))
+        .order_by(Notification.updated_at.desc())
     )
+    result = await db.execute(query)
+    candidates = result.scalars().all()
+
+    visible = [
+        NotificationRead.model_validate(notification)
+        for notification in candidates
+        if _is_visible(notification, now)
+    ]
+    payload = json.dumps(jsonable_encoder(visible)).encode("utf-8")
+
+    ttl_ms = int(settings.NOTIFICATIONS_CACHE_MAX_TTL_SECONDS * 1000)
+    next_transition = _next_transition(candidates, now)
+    if next_transition is not None:
+        until_ms = math.ceil((next_transition - now).total_seconds() * 1000)
+        ttl_ms = max(1, min(ttl_ms, until_ms))
+    return payload, ttl_ms
+
+
+def _store_active_notifications(
+    redis_client, version: Optional[bytes], payload: bytes, ttl_ms: int
+):
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(NOTIFICATIONS_VERSION_KEY)
+            if pipe.get(NOTIFICATIONS_VERSION_KEY) != version:
+                return
+            pipe.multi()
+            pipe.set(ACTIVE_NOTIFICATIONS_CACHE_KEY, payload, px=ttl_ms)
+            pipe.execute()
+        except WatchError:
+            # An admin write raced with this fill; leave the cache empty.
+            pass
+
+
+def invalidate_active_notifications():
+    try:
+        pipe = auth.redis_client.pipeline()
+        pipe.incr(NOTIFICATIONS_VERSION_KEY)
+        pipe.delete(ACTIVE_NOTIFICATIONS_CACHE_KEY)
+        pipe.execute()
+    except Exception:
+        logger.exception("Failed to invalidate active notifications cache")
+
+
+def _notification_changed(event_type: str, notification: Notification):
+    invalidate_active_notifications()
+    payload = None
+    if event_type != "deleted":
+        payload = jsonable_encoder(NotificationRead.model_validate(notification))
+    try:
+        notification_events.publish_notification_event(
+            auth.redis_client, event_type, notification.id, payload
+        )
+    except Exception:
+        logger.exception("Failed to publish notification event")
+
+
+async def _active_notifications_response(db: AsyncSession) -> Response:
+    redis_client = auth.redis_client
+    try:
+        cached = redis_client.get(ACTIVE_NOTIFICATIONS_CACHE_KEY)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        version = redis_client.get(NOTIFICATIONS_VERSION_KEY)
+    except Exception:
+        logger.exception("Active notifications cache unavailable")
+        payload, _ = await _load_active_notifications(db)
+        return Response(content=payload, media_type="application/json")
+
+    payload, ttl_ms = await _load_active_notifications(db)
+    try:
+        _store_active_notifications(redis_client, version, payload, ttl_ms)
+    except Exception:
+        logger.exception("Failed to cache active notifications")
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/active", response_model=List[NotificationRead])
 async def get_active_notifications(
     db: AsyncSession = Depends(get_session),
 ):
-    query = select(Notification).order_by(Notification.updated_at.desc())
-    query = _apply_time_filters(query)
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [
-        NotificationRead.model_validate(notification) for notification in notifications
-    ]
+    return await _active_notifications_response(db)
 
 
 @router.get("", response_model=List[NotificationRead])
 async def list_public_notifications(
     db: AsyncSession = Depends(get_session),
 ):
-    query = select(Notification).order_by(Notification.updated_at.desc())
-    query = _apply_time_filters(query)
-    result = await db.execute(query)
-    notifications = result.scalars().all()
-    return [
-        NotificationRead.model_validate(notification) for notification in notifications
-    ]
+    return await _active_notifications_response(db)
+
+
+@router.get("/stream")
+async def stream_notification_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """
+    Server-sent events for notification create/update/delete.
+
+    Browsers' EventSource resends the Last-Event-ID header on reconnect, so
+    missed events are replayed; a `reset` event asks the client to refetch.
+    """
+    return StreamingResponse(
+        notification_events.notification_event_stream(
+            notification_events.broadcaster,
+            request.is_disconnected,
+            last_event_id,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/admin/notifications", response_model=List[NotificationRead])
@@ -99,6 +222,7 @@ async def create_notification(
     db.add(notification)
     await db.commit()
     await db.refresh(notification)
+    _notification_changed("created", notification)
     return NotificationRead.model_validate(notification)
 
 
@@ -134,6 +258,7 @@ async def update_notification(
     db.add(notification)
     await db.commit()
     await db.refresh(notification)
+    _notification_changed("updated", notification)
     return NotificationRead.model_validate(notification)
 
 
@@ -165,3 +290,4 @@ async def delete_notification(
     notification.deleted_at = now
     notification.updated_at = now
     await db.commit()
+    _notification_changed("deleted", notification)
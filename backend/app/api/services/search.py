@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import get_session
+from app.models.models import SearchResults, UserRoles
+from app.services.catalog_search import search_catalog
+from app.utils.auth import get_current_user
+
+router = APIRouter()
+
+SEARCH_MAX_LIMIT = 50
+SEARCH_QUERY_MAX_LENGTH = 100
+
+
+@router.get("/search", response_model=SearchResults)
+async def search(
+    q: str = "",
+    limit: int = 20,
+    offset: int = 0,
+    current_user: UserRoles = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Search courses, archives and professors.
+
+    Chinese text is matched by character bigrams, so partial course names
+    work; the last word matches as a prefix. Pass `next_offset` back as
+    `offset` for the next page of archives.
+    """
+    safe_limit = max(1, min(int(limit or 20), SEARCH_MAX_LIMIT))
+    safe_offset = max(0, int(offset or 0))
+    return await search_catalog(
+        db, q[:SEARCH_QUERY_MAX_LENGTH], limit=safe_limit, offset=safe_offset
+    )
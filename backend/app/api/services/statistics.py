@@ -1,69 +1,70 @@
-from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
 
 from fastapi import APIRouter, Depends
-from sqlmodel import func, select
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import settings
 from app.db.session import get_session
-from app.models.models import Archive, Course, User
+from app.models.models import SystemCounter
+from app.services import counters
+from app.utils import auth
+from app.utils.activity import get_activity_counts
+from app.utils.cache import SingleFlightCache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
+statistics_cache: SingleFlightCache[dict] = SingleFlightCache(
+    settings.STATISTICS_CACHE_TTL_SECONDS
+)
 
-@router.get("/statistics")
-async def get_system_statistics(db: AsyncSession = Depends(get_session)):
-    """Get system-wide statistics"""
-    try:
-        result = await db.execute(
-            select(func.count(User.id)).where(User.deleted_at.is_(None))
-        )
-        total_users = result.scalar()
 
-        result = await db.execute(select(func.count(Course.id)))
-        total_courses = result.scalar()
+async def compute_system_statistics(db: AsyncSession) -> dict:
+    """
+    Read totals from system_counters and user activity from Redis; neither
+    grows with the size of the users, archives or courses tables.
+    """
+    result = await db.execute(select(SystemCounter.name, SystemCounter.value))
+    totals = dict(result.all())
 
-        result = await db.execute(
-            select(func.count(Archive.id)).where(Archive.deleted_at.is_(None))
-        )
-        total_archives = result.scalar()
+    online_users, active_today = get_activity_counts(auth.redis_client)
 
-        result = await db.execute(
-            select(func.coalesce(func.sum(Archive.download_count), 0)).where(
-                Archive.deleted_at.is_(None)
-            )
-        )
-        total_downloads = result.scalar()
+    return {
+        "totalUsers": totals.get(counters.USERS, 0),
+        "totalDownloads": totals.get(counters.DOWNLOADS, 0),
+        "onlineUsers": online_users,
+        "totalArchives": totals.get(counters.ARCHIVES, 0),
+        "totalCourses": totals.get(counters.COURSES, 0),
+        "activeToday": active_today,
+    }
 
-        two_hours_ago = datetime.now(timezone.utc) - timedelta(hours=2)
-        result = await db.execute(
-            select(func.count(User.id)).where(
-                User.deleted_at.is_(None),
-                (User.last_login >= two_hours_ago)
-                & ((User.last_logout.is_(None)) | (User.last_logout < User.last_login)),
-            )
-        )
-        online_users = result.scalar()
 
-        today_start = datetime.now(timezone.utc).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        result = await db.execute(
-            select(func.count(User.id)).where(
-                User.deleted_at.is_(None), User.last_login >= today_start
-            )
-        )
-        active_today = result.scalar()
+async def refresh_statistics_periodically(interval_seconds: float):
+    """Keep the statistics cache warm so visitors never wait on the query."""
+    from app.db.session import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                statistics_cache.set(await compute_system_statistics(db))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to refresh system statistics")
+        await asyncio.sleep(interval_seconds)
+
+
+@router.get("/statistics")
+async def get_system_statistics(db: AsyncSession = Depends(get_session)):
+    """Get system-wide statistics"""
+    try:
+        data = await statistics_cache.get(lambda: compute_system_statistics(db))
 
         return {
             "success": True,
-            "data": {
-                "totalUsers": total_users,
-                "totalDownloads": total_downloads,
-                "onlineUsers": online_users,
-                "totalArchives": total_archives,
-                "totalCourses": total_courses,
-                "activeToday": active_today,
-            },
+            "data": data,
         }
 
     except Exception as e:
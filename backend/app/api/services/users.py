@@ -1,19 +1,27 @@
+import base64
+import json
 from datetime import datetime, timezone
-from typing import List
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import select
+from sqlalchemy import and_, or_, tuple_
+from sqlmodel import func, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.session import get_session
 from app.models.models import (
+    BulkIds,
+    BulkOperationResult,
+    BulkUserUpdate,
     User,
     UserCreate,
     UserNicknameUpdate,
+    UserPage,
     UserRead,
     UserRoles,
     UserUpdate,
 )
+from app.services import bulk, counters
 from app.utils.auth import get_current_user, get_password_hash
 
 router = APIRouter()
@@ -21,22 +29,129 @@ router = APIRouter()
 NICKNAME_MAX_LENGTH = 15
 
 
-@router.get("/admin/users", response_model=List[UserRead])
+USER_SORT_COLUMNS = {
+    "name": User.name,
+    "email": User.email,
+    "last_login": User.last_login,
+    "id": User.id,
+}
+USER_PAGE_MAX_LIMIT = 200
+
+
+def _encode_user_cursor(value, user_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, user_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_user_cursor(cursor: str, sort: str):
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if sort == "last_login" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _after_cursor(sort: str, descending: bool, value, user_id: int):
+    """
+    Keyset condition for rows after (value, user_id) in the listing order.
+
+    NULL last_login values sort last in either direction.
+    """
+    column = USER_SORT_COLUMNS[sort]
+    if sort == "id":
+        return User.id < user_id if descending else User.id > user_id
+    if value is None:
+        return and_(
+            column.is_(None), User.id < user_id if descending else User.id > user_id
+        )
+    key, bound = tuple_(column, User.id), tuple_(value, user_id)
+    after = key < bound if descending else key > bound
+    if sort == "last_login":
+        after = or_(after, column.is_(None))
+    return after
+
+
+@router.get("/admin/users", response_model=UserPage)
 async def get_users(
+    q: Optional[str] = None,
+    is_admin: Optional[bool] = None,
+    sort: Literal["name", "email", "last_login", "id"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     current_user: UserRoles = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
     """
-    Get all users (admin only)
+    List users a page at a time (admin only).
+
+    `q` matches a case-insensitive prefix of the name, nickname or email.
+    Pass the returned `next_cursor` back to fetch the following page; the
+    total is only counted when `include_total` is set.
     """
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
 
-    result = await db.execute(select(User).where(User.deleted_at.is_(None)))
+    filters = [User.deleted_at.is_(None)]
+    if q and q.strip():
+        pattern = _escape_like(q.strip().lower()) + "%"
+        filters.append(
+            or_(
+                func.lower(User.name).like(pattern, escape="\\"),
+                func.lower(User.nickname).like(pattern, escape="\\"),
+                func.lower(User.email).like(pattern, escape="\\"),
+            )
+        )
+    if is_admin is not None:
+        filters.append(User.is_admin == is_admin)
+
+    safe_limit = max(1, min(int(limit or 50), USER_PAGE_MAX_LIMIT))
+    descending = order == "desc"
+    column = USER_SORT_COLUMNS[sort]
+    ordering = [column.desc() if descending else column.asc()]
+    if sort == "last_login":
+        ordering = [ordering[0].nulls_last()]
+    if sort != "id":
+        ordering.append(User.id.desc() if descending else User.id.asc())
+
+    query = select(User).where(*filters)
+    if cursor:
+        value, user_id = _decode_user_cursor(cursor, sort)
+        query = query.where(_after_cursor(sort, descending, value, user_id))
+    # One extra row tells us whether another page exists.
+    result = await db.execute(query.order_by(*ordering).limit(safe_limit + 1))
     users = result.scalars().all()
-    return users
+
+    next_cursor = None
+    if len(users) > safe_limit:
+        users = users[:safe_limit]
+        last = users[-1]
+        next_cursor = _encode_user_cursor(getattr(last, column.key), last.id)
+
+    total = None
+    if include_total:
+        total = await db.scalar(
+            select(func.count()).select_from(User).where(*filters)
+        )
+
+    return UserPage(
+        items=[UserRead.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+        total=total,
+    )
 
 
 @router.post("/admin/users", response_model=UserRead)
@@ -77,6 +192,7 @@ async def create_user(
     )
 
     db.add(user)
+    await counters.bump_counters(db, users=1)
     await db.commit()
     await db.refresh(user)
 
@@ -217,6 +333,72 @@ async def delete_user(
         )
 
     user.deleted_at = datetime.now(timezone.utc)
+    await counters.bump_counters(db, users=-1)
     await db.commit()
 
     return {"detail": "User deleted successfully"}
+
+
+@router.post("/admin/users/bulk-update", response_model=BulkOperationResult)
+async def bulk_update_users(
+    payload: BulkUserUpdate,
+    current_user: UserRoles = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Grant or revoke admin on many users at once (admin only)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+
+    ids = bulk.unique_ids(payload.ids)
+    result = await db.execute(
+        update(User)
+        .where(User.id.in_(ids), User.deleted_at.is_(None))
+        .values(is_admin=payload.is_admin)
+        .returning(User.id)
+    )
+    updated_ids = result.scalars().all()
+    await db.commit()
+
+    return bulk.bulk_result(ids, updated_ids, missing_detail="User not found")
+
+
+@router.post("/admin/users/bulk-delete", response_model=BulkOperationResult)
+async def bulk_delete_users(
+    payload: BulkIds,
+    current_user: UserRoles = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Delete many users at once (admin only)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+        )
+
+    ids = bulk.unique_ids(payload.ids)
+    failures = {}
+    if current_user.user_id in ids:
+        failures[current_user.user_id] = "Cannot delete yourself"
+    targets = [user_id for user_id in ids if user_id not in failures]
+
+    deleted_ids = []
+    if targets:
+        result = await db.execute(
+            update(User)
+            .where(User.id.in_(targets), User.deleted_at.is_(None))
+            .values(deleted_at=datetime.now(timezone.utc))
+            .returning(User.id)
+        )
+        deleted_ids = result.scalars().all()
+
+    await counters.bump_counters(db, users=-len(deleted_ids))
+    await db.commit()
+
+    return bulk.bulk_result(
+        ids, deleted_ids, failures, missing_detail="User not found"
+    )
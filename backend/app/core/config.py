@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +9,12 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
     DB_NAME: str
+    # Connections per process: DB_POOL_SIZE kept open, up to DB_MAX_OVERFLOW
+    # more under load; DB_POOL_WARM_CONNECTIONS of them opened at startup.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_WARM_CONNECTIONS: int = 2
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -25,8 +33,94 @@ class Settings(BaseSettings):
     MINIO_ROOT_PASSWORD: str
     MINIO_BUCKET_NAME: str
     EXTERNAL_ENDPOINT: str
+    MINIO_REGION: str = "us-east-1"
+    # Connections kept open to MinIO and threads running blocking storage calls.
+    MINIO_MAX_POOL_CONNECTIONS: int = 16
+    MINIO_EXECUTOR_WORKERS: int = 16
+    MINIO_TIMEOUT_SECONDS: float = 30.0
+    STORAGE_STREAM_CHUNK_SIZE: int = 256 * 1024
+    # Local LRU copy of fetched objects, shared by processes on one host;
+    # unset to read everything from MinIO.
+    STORAGE_CACHE_DIR: Optional[str] = None
+    STORAGE_CACHE_MAX_BYTES: int = 2 * 1024**3
 
     REDIS_URL: str
+    # Per process: the shared client for caches and sessions, the pool used
+    # to enqueue and inspect ARQ jobs, and the connections task status
+    # sockets hold while waiting for events (one per open socket).
+    REDIS_MAX_CONNECTIONS: int = 32
+    ARQ_MAX_CONNECTIONS: int = 16
+    TASK_EVENT_MAX_CONNECTIONS: int = 64
+
+    # Migrate to head on startup; turn off when `python -m app.db.migrations`
+    # runs as a separate deploy step.
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+
+    AI_EXAM_INTERACTIVE_MAX_JOBS: int = 5
+    AI_EXAM_BATCH_MAX_JOBS: int = 2
+    AI_EXAM_FAIR_SHARE_WINDOW_SECONDS: int = 3600
+    AI_EXAM_HEAVY_USER_THRESHOLD: int = 5
+    AI_EXAM_PRIORITY_HEADROOM_SECONDS: int = 120
+    AI_EXAM_PREPROCESS_PDFS: bool = False
+
+    # Store a linearized, image-recompressed copy of uploads and serve it.
+    ARCHIVE_OPTIMIZE_PDFS: bool = False
+    ARCHIVE_OPTIMIZE_MAX_DPI: int = 150
+    ARCHIVE_OPTIMIZE_JPEG_QUALITY: int = 75
+
+    # Preview PDFs through the API's range-aware content endpoint instead of
+    # presigned URLs, for deployments where MinIO is not reachable by clients.
+    ARCHIVE_CONTENT_PROXY_ENABLED: bool = False
+
+    # Zip downloads of many archives; manifests expire after the TTL.
+    ARCHIVE_BUNDLE_MAX_ARCHIVES: int = 500
+    ARCHIVE_BUNDLE_MAX_BYTES: int = 2 * 1024**3
+    ARCHIVE_BUNDLE_TTL_SECONDS: int = 6 * 3600
+
+    # First-page images rendered by the worker so lists need not load PDFs.
+    ARCHIVE_PREVIEWS_ENABLED: bool = True
+    ARCHIVE_PREVIEW_THUMB_WIDTH: int = 240
+    ARCHIVE_PREVIEW_PAGE_WIDTH: int = 800
+    ARCHIVE_PREVIEW_QUALITY: int = 70
+    ARCHIVE_PREVIEW_CACHE_MAX_AGE_SECONDS: int = 30 * 24 * 3600
+    # Archives without previews queued per hourly backfill run.
+    ARCHIVE_PREVIEW_BACKFILL_BATCH: int = 200
+
+    GEMINI_BASE_URL: Optional[str] = None
+    GEMINI_MODEL: str = "gemini-2.5-flash"
+    GEMINI_KEY_VALIDATION_TIMEOUT_SECONDS: float = 10.0
+    GEMINI_KEY_VALIDATION_CACHE_SECONDS: int = 600
+    GEMINI_KEY_VALIDATION_NEGATIVE_CACHE_SECONDS: int = 60
+    GEMINI_MAX_ATTEMPTS: int = 4
+    GEMINI_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    GEMINI_RETRY_MAX_DELAY_SECONDS: float = 20.0
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 60.0
+
+    ONLINE_USER_WINDOW_MINUTES: int = 15
+    USER_ACTIVITY_WRITE_INTERVAL_SECONDS: float = 60.0
+    USER_ACTIVITY_THROTTLE_MAX_ENTRIES: int = 10000
+
+    NOTIFICATIONS_CACHE_MAX_TTL_SECONDS: int = 3600
+    NOTIFICATION_EVENTS_MAXLEN: int = 1000
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+
+    # Also soft delete discussion messages when a course is deleted.
+    COURSE_DELETE_CASCADE_DISCUSSIONS: bool = False
+
+    # How often the in-process meme corpus is checked against the table.
+    MEME_CACHE_TTL_SECONDS: float = 300.0
+    # Above this many rows memes are picked from the table instead.
+    MEME_CACHE_MAX_ITEMS: int = 10000
+
+    # How often the in-process professor index is checked against archives.
+    PROFESSOR_INDEX_TTL_SECONDS: float = 60.0
+
+    STATISTICS_CACHE_TTL_SECONDS: float = 30.0
+    # 0 disables the background refresher; the cache is then filled on demand.
+    STATISTICS_REFRESH_INTERVAL_SECONDS: float = 0
 
     DEFAULT_ADMIN_NAME: str
     DEFAULT_ADMIN_PASSWORD: str
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+from arq.connections import ArqRedis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db import session
+from app.utils.storage import ObjectStorage, build_storage
+
+logger = logging.getLogger(__name__)
+
+# Seconds a caller waits for a free Redis connection before giving up.
+REDIS_POOL_TIMEOUT_SECONDS = 10
+
+
+def _async_pool(max_connections: int, **connection_kwargs):
+    # Blocking, so a burst past the cap waits for a connection instead of
+    # failing with "Too many connections".
+    return aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=max_connections,
+        timeout=REDIS_POOL_TIMEOUT_SECONDS,
+        **connection_kwargs,
+    )
+
+
+class Resources:
+    """
+    The connection pools a process shares: the Redis client, the ARQ pool
+    used to enqueue jobs, the client for task event streams, object storage
+    and the database engine.
+
+    Each is built on first use with the sizes from settings, so a process
+    holds a predictable number of connections. `start` builds and warms
+    them before traffic arrives, `close` drains them on shutdown; the API's
+    lifespan and the worker's startup and shutdown hooks call both.
+    """
+
+    def __init__(self):
+        self._redis: Optional[redis.Redis] = None
+        self._arq: Optional[ArqRedis] = None
+        self._arq_lock = asyncio.Lock()
+        self._task_events: Optional[aioredis.Redis] = None
+        self._storage: Optional[ObjectStorage] = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis(
+                connection_pool=redis.BlockingConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT_SECONDS,
+                )
+            )
+        return self._redis
+
+    async def arq_pool(self) -> ArqRedis:
+        async with self._arq_lock:
+            if self._arq is None:
+                pool = ArqRedis(_async_pool(settings.ARQ_MAX_CONNECTIONS))
+                try:
+                    await pool.ping()
+                except BaseException:
+                    await pool.aclose(close_connection_pool=True)
+                    raise
+                self._arq = pool
+        return self._arq
+
+    @property
+    def task_events(self) -> aioredis.Redis:
+        """
+        Client for the blocking XREADs of task status sockets. Each read
+        holds a connection for seconds, so they get their own pool and
+        cannot use up the connections that enqueue and inspect jobs.
+        """
+        if self._task_events is None:
+            self._task_events = aioredis.Redis(
+                connection_pool=_async_pool(settings.TASK_EVENT_MAX_CONNECTIONS)
+            )
+        return self._task_events
+
+    @property
+    def storage(self) -> ObjectStorage:
+        if self._storage is None:
+            self._storage = build_storage()
+        return self._storage
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return session.engine
+
+    async def _warm_database(self):
+        async with AsyncExitStack() as stack:
+            connections = await asyncio.gather(
+                *(
+                    stack.enter_async_context(self.engine.connect())
+                    for _ in range(settings.DB_POOL_WARM_CONNECTIONS)
+                )
+            )
+            for connection in connections:
+                await connection.execute(text("SELECT 1"))
+
+    async def start(self, *, arq_pool: bool = True):
+        """
+        Build the pools and open their first connections, so the first
+        requests do not pay for the handshakes. The bucket is created if
+        missing; the other steps only log when their service is down.
+        """
+        await self.storage.ensure_bucket()
+        steps = [
+            ("database", self._warm_database()),
+            ("redis", asyncio.to_thread(self.redis.ping)),
+        ]
+        if arq_pool:
+            steps.append(("arq", self.arq_pool()))
+        results = await asyncio.gather(
+            *(step for _, step in steps), return_exceptions=True
+        )
+        for (name, _), result in zip(steps, results):
+            if isinstance(result, Exception):
+                logger.error("Could not warm up %s: %s", name, result)
+
+    async def close(self):
+        """Drain every pool; safe to call more than once."""
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+        if self._arq is not None:
+            try:
+                await self._arq.aclose(close_connection_pool=True)
+            except Exception:
+                logger.exception("Failed to close the ARQ pool")
+            self._arq = None
+        if self._task_events is not None:
+            try:
+                await self._task_events.aclose(close_connection_pool=True)
+            except Exception:
+                logger.exception("Failed to close the task event client")
+            self._task_events = None
+        if self._redis is not None:
+            self._redis.connection_pool.disconnect()
+            self._redis = None
+        await self.engine.dispose()
+
+
+resources = Resources()
+
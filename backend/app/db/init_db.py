@@ -1,112 +1,171 @@
-import os
-import subprocess
+import hashlib
+import hmac
+import logging
 import unicodedata
 from functools import lru_cache
 from pathlib import Path
 
-import yaml
-from sqlmodel import SQLModel, func, select
+from sqlmodel import SQLModel, select
 
 from app.core.config import settings
+from app.db.migrations import run_migrations, startup_lock
 from app.db.session import AsyncSessionLocal, engine
 from app.models.models import Course, CourseCategory, Meme, User
+from app.services.catalog_search import backfill_search_vectors
+from app.services.counters import reconcile_counters
+from app.utils import auth as auth_utils
 from app.utils.auth import get_password_hash
 
+logger = logging.getLogger(__name__)
+
 SEED_DATA_PATH = Path(__file__).with_name("seed_data.yaml")
+ADMIN_FINGERPRINT_KEY = "init_db:admin_fingerprint"
 
 
 @lru_cache(maxsize=1)
 def load_seed_data():
+    import yaml
+
     with SEED_DATA_PATH.open(encoding="utf-8") as file:
         return yaml.safe_load(file) or {}
 
 
-async def init_db():
-    # Run Alembic migrations instead of create_all
+def admin_fingerprint(password_hash: str) -> str:
+    """
+    Ties the stored admin hash to the configured password, so a restart can
+    tell nothing changed without paying for a bcrypt hash.
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{password_hash}\0{settings.DEFAULT_ADMIN_PASSWORD}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def _admin_up_to_date(admin_user: User) -> bool:
+    if not admin_user.is_admin or not admin_user.password_hash:
+        return False
     try:
-        # Run alembic upgrade head to apply all migrations
-        result = subprocess.run(
-            ["uv", "run", "alembic", "upgrade", "head"],
-            cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            capture_output=True,
-            text=True,
+        stored = auth_utils.redis_client.get(ADMIN_FINGERPRINT_KEY)
+    except Exception:
+        logger.exception("Admin fingerprint unavailable")
+        return False
+    expected = admin_fingerprint(admin_user.password_hash).encode()
+    return stored is not None and hmac.compare_digest(stored, expected)
+
+
+def _remember_admin(admin_user: User):
+    try:
+        auth_utils.redis_client.set(
+            ADMIN_FINGERPRINT_KEY, admin_fingerprint(admin_user.password_hash)
         )
-        if result.returncode != 0:
-            print(f"Alembic migration failed: {result.stderr}")
-            # Fallback to create_all if migration fails
-            async with engine.begin() as conn:
-                await conn.run_sync(SQLModel.metadata.create_all)
-                await conn.commit()
-        else:
-            print("Database migrations applied successfully")
-    except Exception as e:
-        print(f"Error running migrations: {e}")
-        # Fallback to create_all
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.create_all)
-            await conn.commit()
+    except Exception:
+        logger.exception("Failed to store admin fingerprint")
 
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(User).where(User.name == settings.DEFAULT_ADMIN_NAME)
+
+async def ensure_default_admin(session) -> bool:
+    """Create, restore or reset the default admin; returns whether it did."""
+    result = await session.execute(
+        select(User).where(User.name == settings.DEFAULT_ADMIN_NAME)
+    )
+    admin_user = result.scalar_one_or_none()
+
+    if admin_user and getattr(admin_user, "deleted_at", None) is not None:
+        admin_user.deleted_at = None
+        admin_user.password_hash = get_password_hash(
+            settings.DEFAULT_ADMIN_PASSWORD
+        )
+        admin_user.is_local = True
+        admin_user.is_admin = True
+    elif not admin_user:
+        admin_user = User(
+            name=settings.DEFAULT_ADMIN_NAME,
+            email=settings.DEFAULT_ADMIN_EMAIL,
+            password_hash=get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),
+            is_local=True,
+            is_admin=True,
         )
-        admin_user = result.scalar_one_or_none()
-
-        if admin_user and getattr(admin_user, "deleted_at", None) is not None:
-            admin_user.deleted_at = None
-            admin_user.password_hash = get_password_hash(
-                settings.DEFAULT_ADMIN_PASSWORD
-            )
-            admin_user.is_local = True
-            admin_user.is_admin = True
-            await session.commit()
-            await session.refresh(admin_user)
-        elif not admin_user:
-            admin_user = User(
-                name=settings.DEFAULT_ADMIN_NAME,
-                email=settings.DEFAULT_ADMIN_EMAIL,
-                password_hash=get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),
-                is_local=True,
-                is_admin=True,
-            )
-            session.add(admin_user)
-            await session.commit()
-            await session.refresh(admin_user)
-        else:
-            # 如果已存在，更新資料
-            admin_user.name = settings.DEFAULT_ADMIN_NAME
-            admin_user.is_admin = True
-            admin_user.password_hash = get_password_hash(settings.DEFAULT_ADMIN_PASSWORD)
-            await session.commit()
-            await session.refresh(admin_user)
-
-        result = await session.execute(select(func.count()).select_from(Course))
-        count = result.scalar()
-        if count == 0:
-            seed_data = load_seed_data()
-            initial_courses = [
+        session.add(admin_user)
+    elif _admin_up_to_date(admin_user):
+        return False
+    else:
+        # 如果已存在，更新資料
+        admin_user.name = settings.DEFAULT_ADMIN_NAME
+        admin_user.is_admin = True
+        admin_user.password_hash = get_password_hash(settings.DEFAULT_ADMIN_PASSWORD)
+
+    await session.commit()
+    await session.refresh(admin_user)
+    _remember_admin(admin_user)
+    return True
+
+
+async def seed_database(session) -> bool:
+    """Insert the seed courses and memes into empty tables; returns whether it did."""
+    result = await session.execute(
+        select(
+            select(Course.id).exists().label("has_courses"),
+            select(Meme.id).exists().label("has_memes"),
+        )
+    )
+    has_courses, has_memes = result.one()
+    if has_courses and has_memes:
+        return False
+
+    seed_data = load_seed_data()
+    if not has_courses:
+        session.add_all(
+            [
                 Course(
                     name=unicodedata.normalize("NFKC", course["name"]),
                     category=CourseCategory[course["category"]],
                 )
                 for course in seed_data.get("courses", [])
             ]
-            session.add_all(initial_courses)
-            await session.commit()
-
-        result = await session.execute(select(func.count()).select_from(Meme))
-        count = result.scalar()
-        if count == 0:
-            seed_data = load_seed_data()
-            initial_memes = [
+        )
+    if not has_memes:
+        session.add_all(
+            [
                 Meme(
                     content=meme["content"],
                     language=meme["language"],
                 )
                 for meme in seed_data.get("memes", [])
             ]
-            session.add_all(initial_memes)
-            await session.commit()
+        )
+    await session.commit()
+    return True
+
+
+async def init_db():
+    """
+    Bring the schema to head and seed it. Holding the startup lock, every
+    process but the first finds the work done and returns after a few
+    cheap queries.
+    """
+    async with startup_lock():
+        migrated = False
+        if settings.RUN_MIGRATIONS_ON_STARTUP:
+            try:
+                migrated = await run_migrations()
+            except Exception:
+                logger.exception("Alembic migration failed")
+                # Fallback to create_all if migration fails
+                async with engine.begin() as conn:
+                    await conn.run_sync(SQLModel.metadata.create_all)
+                migrated = True
+
+        async with AsyncSessionLocal() as session:
+            admin_changed = await ensure_default_admin(session)
+            seeded = await seed_database(session)
+
+            if migrated or seeded or admin_changed:
+                # Rows from before search_vector existed have no vector yet.
+                await backfill_search_vectors(session)
+
+                # Seeding bypasses the write paths that maintain the counters;
+                # the hourly worker job corrects drift otherwise.
+                await reconcile_counters(session)
 
 
 async def get_session():
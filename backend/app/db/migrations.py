@@ -0,0 +1,103 @@
+"""
+Schema migrations, run in-process.
+
+Usage:
+  python -m app.db.migrations    # upgrade to head once, e.g. as a deploy job
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+# Alembic is imported by the functions below, so processes that import this
+# module through init_db without migrating (the worker, tests) never load it.
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI_PATH = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Key of the Postgres advisory lock that serializes startup work across
+# processes; any constant works as long as nothing else uses it.
+STARTUP_LOCK_KEY = 0x70617374  # "past"
+
+
+def alembic_config() -> "Config":
+    from alembic.config import Config
+
+    return Config(str(ALEMBIC_INI_PATH))
+
+
+def head_revisions(config: "Config") -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def _current_revisions(sync_connection) -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    context = MigrationContext.configure(sync_connection)
+    return set(context.get_current_heads())
+
+
+def _upgrade(sync_connection, config: "Config"):
+    from alembic import command
+
+    # env.py runs on this connection instead of opening its own engine.
+    config.attributes["connection"] = sync_connection
+    command.upgrade(config, "head")
+
+
+@asynccontextmanager
+async def startup_lock():
+    """
+    Hold a session-level advisory lock, so only one process at a time
+    migrates or seeds; the others wait and then find nothing to do.
+    """
+    async with engine.connect() as connection:
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY}
+        )
+        try:
+            yield
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY}
+            )
+
+
+async def run_migrations() -> bool:
+    """
+    Upgrade the schema to head; a no-op costing one query when it already
+    is. Returns whether any migration ran.
+    """
+    config = alembic_config()
+    heads = head_revisions(config)
+    async with engine.begin() as connection:
+        if await connection.run_sync(_current_revisions) == heads:
+            return False
+        await connection.run_sync(_upgrade, config)
+    logger.info("Database migrated to %s", ", ".join(sorted(heads)))
+    return True
+
+
+async def _main():
+    logging.basicConfig(level=logging.INFO)
+    async with startup_lock():
+        migrated = await run_migrations()
+    if not migrated:
+        logger.info("Database already at head")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
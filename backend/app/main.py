@@ -1,12 +1,50 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 # from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
+from app.core.resources import resources
 from app.api.api import api_router
+from app.api.services.statistics import refresh_statistics_periodically
 from app.db.init_db import init_db
+from app.services.memes import warm_meme_cache
+from app.services.notification_events import broadcaster as notification_broadcaster
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    await resources.start()
+    await warm_meme_cache()
+
+    refresher = None
+    if settings.STATISTICS_REFRESH_INTERVAL_SECONDS > 0:
+        refresher = asyncio.create_task(
+            refresh_statistics_periodically(
+                settings.STATISTICS_REFRESH_INTERVAL_SECONDS
+            )
+        )
+
+    try:
+        yield
+    finally:
+        if refresher is not None:
+            refresher.cancel()
+            # Let an in-flight refresh stop before its pools are closed.
+            with contextlib.suppress(asyncio.CancelledError):
+                await refresher
 
-app = FastAPI(title="Past Exam API", docs_url=None, redoc_url=None)
+        await notification_broadcaster.close()
+        await resources.close()
+
+
+app = FastAPI(
+    title="Past Exam API", docs_url=None, redoc_url=None, lifespan=lifespan
+)
 
 # app.add_middleware(
 #     CORSMiddleware,
@@ -24,7 +62,3 @@ app.add_middleware(
 
 app.include_router(api_router)
 
-
-@app.on_event("startup")
-async def on_startup():
-    await init_db()
@@ -3,9 +3,23 @@ from enum import Enum as PyEnum
 from typing import List, Optional
 
 from pydantic import BaseModel
-from sqlalchemy import Column, DateTime, String, Text
+from pydantic import Field as PydanticField
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    String,
+    Text,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
+from app.utils.search import archive_search_vector, course_search_vector
+
 
 class CourseCategory(str, PyEnum):
     FRESHMAN = "freshman"
@@ -31,6 +45,24 @@ class NotificationSeverity(str, PyEnum):
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    # Case-insensitive prefix search for the admin user listing.
+    __table_args__ = (
+        Index(
+            "ix_users_lower_name_prefix",
+            text("lower(name) text_pattern_ops"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_users_lower_nickname_prefix",
+            text("lower(nickname) text_pattern_ops"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_users_lower_email_prefix",
+            text("lower(email) text_pattern_ops"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     oauth_provider: Optional[str] = Field(default=None)
     oauth_sub: Optional[str] = Field(default=None)
@@ -45,7 +77,7 @@ class User(SQLModel, table=True):
         sa_column=Column(DateTime(timezone=True), nullable=True)
     )
     last_login: Optional[datetime] = Field(
-        sa_column=Column(DateTime(timezone=True), nullable=True)
+        sa_column=Column(DateTime(timezone=True), nullable=True, index=True)
     )
     last_logout: Optional[datetime] = Field(
         sa_column=Column(DateTime(timezone=True), nullable=True)
@@ -56,18 +88,30 @@ class User(SQLModel, table=True):
 
 class Course(SQLModel, table=True):
     __tablename__ = "courses"
+    __table_args__ = (
+        Index("ix_courses_search_vector", "search_vector", postgresql_using="gin"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     category: CourseCategory
     deleted_at: Optional[datetime] = Field(
         sa_column=Column(DateTime(timezone=True), nullable=True)
     )
+    # Maintained by the before_insert/before_update hooks below.
+    search_vector: Optional[str] = Field(
+        default=None, sa_column=Column(TSVECTOR, nullable=True), exclude=True
+    )
 
     archives: List["Archive"] = Relationship(back_populates="course")
 
 
 class Archive(SQLModel, table=True):
     __tablename__ = "archives"
+    __table_args__ = (
+        Index(
+            "ix_archives_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     name: str
@@ -78,11 +122,24 @@ class Archive(SQLModel, table=True):
     download_count: int = Field(default=0)
 
     object_name: str
+    # Linearized, recompressed copy served instead of the original upload.
+    optimized_object_name: Optional[str] = Field(default=None)
+    # Preprocessed copy (blank/duplicate pages dropped) used as AI exam input;
+    # the served copy itself when preprocessing could not make it smaller.
+    compact_object_name: Optional[str] = Field(default=None)
+    # Set once the first-page preview images are stored next to the object.
+    previews_generated_at: Optional[datetime] = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    # Set when the first page cannot be rendered, so the backfill skips it.
+    previews_failed_at: Optional[datetime] = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
 
     uploader_id: Optional[int] = Field(default=None, foreign_key="users.id")
     uploader: Optional["User"] = Relationship(back_populates="archives")
 
-    course_id: int = Field(foreign_key="courses.id")
+    course_id: int = Field(foreign_key="courses.id", index=True)
     course: "Course" = Relationship(back_populates="archives")
 
     created_at: datetime = Field(
@@ -102,6 +159,10 @@ class Archive(SQLModel, table=True):
     deleted_at: Optional[datetime] = Field(
         sa_column=Column(DateTime(timezone=True), nullable=True)
     )
+    # Maintained by the before_insert/before_update hooks below.
+    search_vector: Optional[str] = Field(
+        default=None, sa_column=Column(TSVECTOR, nullable=True), exclude=True
+    )
 
 
 class ArchiveDiscussionMessage(SQLModel, table=True):
@@ -122,6 +183,36 @@ class ArchiveDiscussionMessage(SQLModel, table=True):
     )
 
 
+def _search_fields_changed(target, *fields) -> bool:
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Course, "before_insert")
+@event.listens_for(Course, "before_update")
+def _set_course_search_vector(mapper, connection, target: Course):
+    if target.id is None or _search_fields_changed(target, "name"):
+        target.search_vector = course_search_vector(target.name)
+
+
+@event.listens_for(Archive, "before_insert")
+@event.listens_for(Archive, "before_update")
+def _set_archive_search_vector(mapper, connection, target: Archive):
+    if target.id is None or _search_fields_changed(target, "name", "professor"):
+        target.search_vector = archive_search_vector(target.name, target.professor)
+
+
+class SystemCounter(SQLModel, table=True):
+    """Running totals behind /statistics, kept in step by the write paths."""
+
+    __tablename__ = "system_counters"
+    name: str = Field(primary_key=True)
+    value: int = Field(
+        default=0,
+        sa_column=Column(BigInteger, nullable=False, server_default="0"),
+    )
+
+
 class Meme(SQLModel, table=True):
     __tablename__ = "memes"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -131,6 +222,13 @@ class Meme(SQLModel, table=True):
 
 class Notification(SQLModel, table=True):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index(
+            "ix_notifications_active_updated_at",
+            "updated_at",
+            postgresql_where=text("deleted_at IS NULL AND is_active"),
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(sa_column=Column(String(150), nullable=False))
     body: str = Field(sa_column=Column(Text, nullable=False))
@@ -174,6 +272,13 @@ class UserRead(BaseModel):
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    items: List[UserRead]
+    next_cursor: Optional[str] = None
+    # Only computed when requested with include_total.
+    total: Optional[int] = None
+
+
 class UserCreate(BaseModel):
     name: str
     email: str
@@ -271,11 +376,19 @@ class ArchiveRead(BaseModel):
     created_at: datetime
     uploader_id: Optional[int] = None
     download_count: int = 0
+    previews_generated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+class ArchiveAccessRead(BaseModel):
+    archive_id: int
+    name: str
+    requests: int
+    bytes_sent: int
+
+
 class ArchiveDiscussionMessageRead(BaseModel):
     id: int
     archive_id: int
@@ -313,6 +426,81 @@ class ArchiveUpdateCourse(BaseModel):
     course_category: Optional[CourseCategory] = None
 
 
+class ProfessorSuggestion(BaseModel):
+    name: str
+    archive_count: int
+
+
+class ArchiveSearchHit(BaseModel):
+    id: int
+    name: str
+    professor: str
+    academic_year: int
+    archive_type: ArchiveType
+    has_answers: bool
+    course_id: int
+    course_name: str
+    course_category: CourseCategory
+
+
+class SearchResults(BaseModel):
+    query: str
+    # Matching courses, on the first page only.
+    courses: List[CourseRead] = []
+    archives: List[ArchiveSearchHit] = []
+    next_offset: Optional[int] = None
+
+
+# Bulk admin operations
+
+BULK_MAX_ITEMS = 1000
+
+
+class BulkIds(BaseModel):
+    ids: List[int] = PydanticField(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkUserUpdate(BulkIds):
+    is_admin: bool
+
+
+class BulkArchiveMove(BulkIds):
+    course_id: int
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    success: bool
+    detail: Optional[str] = None
+
+
+class BulkOperationResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Zip bundles of a course's archives
+
+class ArchiveBundleCreate(BaseModel):
+    """Archives of the course to bundle; every live one when nothing is set."""
+
+    archive_ids: Optional[List[int]] = PydanticField(
+        default=None, max_length=BULK_MAX_ITEMS
+    )
+    archive_type: Optional[ArchiveType] = None
+    professor: Optional[str] = None
+    academic_year: Optional[int] = None
+
+
+class ArchiveBundleRead(BaseModel):
+    id: str
+    url: str
+    filename: str
+    size: int
+    archive_count: int
+
+
 # AI Exam related models
 
 
@@ -333,10 +521,32 @@ class TaskStatusResponse(BaseModel):
     status: str  # pending, in_progress, complete, failed, not_found
     result: Optional[dict] = None
     error: Optional[str] = None
+    chunk: Optional[str] = None  # partial generated text while in_progress
     created_at: Optional[str] = None
     completed_at: Optional[str] = None
 
 
+class StorageCacheStats(BaseModel):
+    # Counters are per process; pid says which one answered.
+    pid: int
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    hit_rate: Optional[float] = None
+
+
+class QueueStats(BaseModel):
+    queue: str
+    max_jobs: int
+    depth: int
+    ready: int
+    wait_ms_p50: Optional[int] = None
+    wait_ms_p95: Optional[int] = None
+    wait_samples: int = 0
+
+
 class GenerateExamResponse(BaseModel):
     success: bool
     generated_content: str
@@ -348,8 +558,10 @@ class GenerateExamResponse(BaseModel):
 
 class ApiKeyUpdate(BaseModel):
     gemini_api_key: Optional[str] = None
+    defer_validation: bool = False
 
 
 class ApiKeyResponse(BaseModel):
     has_api_key: bool
     api_key_masked: Optional[str] = None
+    validation_task_id: Optional[str] = None
@@ -0,0 +1,40 @@
+import logging
+from typing import Iterable
+
+from app.utils import auth
+
+logger = logging.getLogger(__name__)
+
+# Redis hashes keyed by archive id.
+ARCHIVE_ACCESS_REQUESTS_KEY = "archive_access:requests"
+ARCHIVE_ACCESS_BYTES_KEY = "archive_access:bytes"
+
+
+def record_archive_access(archive_id: int, bytes_sent: int):
+    """
+    Count a request for an archive's content and the bytes it asked for.
+
+    Best effort: a Redis outage must not fail the download itself.
+    """
+    try:
+        pipe = auth.redis_client.pipeline(transaction=False)
+        pipe.hincrby(ARCHIVE_ACCESS_REQUESTS_KEY, archive_id, 1)
+        pipe.hincrby(ARCHIVE_ACCESS_BYTES_KEY, archive_id, bytes_sent)
+        pipe.execute()
+    except Exception:
+        logger.exception("Failed to record access to archive %s", archive_id)
+
+
+def get_archive_access(archive_ids: Iterable[int]) -> dict[int, tuple[int, int]]:
+    """(requests, bytes) served through the content endpoint, per archive."""
+    archive_ids = list(archive_ids)
+    if not archive_ids:
+        return {}
+    pipe = auth.redis_client.pipeline(transaction=False)
+    pipe.hmget(ARCHIVE_ACCESS_REQUESTS_KEY, archive_ids)
+    pipe.hmget(ARCHIVE_ACCESS_BYTES_KEY, archive_ids)
+    requests, sent = pipe.execute()
+    return {
+        archive_id: (int(count or 0), int(total or 0))
+        for archive_id, count, total in zip(archive_ids, requests, sent)
+    }
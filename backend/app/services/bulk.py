@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import literal
+from sqlmodel import func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import (
+    Archive,
+    ArchiveDiscussionMessage,
+    BulkItemResult,
+    BulkOperationResult,
+)
+
+
+def unique_ids(ids: Iterable[int]) -> list[int]:
+    """Drop repeated ids, keeping the order they were given in."""
+    return list(dict.fromkeys(ids))
+
+
+def bulk_result(
+    ids: Iterable[int],
+    succeeded: Iterable[int],
+    failures: Optional[dict[int, str]] = None,
+    missing_detail: str = "Not found",
+) -> BulkOperationResult:
+    """
+    Per-item outcome of a set-based operation.
+
+    Ids neither in `succeeded` nor `failures` were not matched by the
+    statement and are reported with `missing_detail`.
+    """
+    succeeded = set(succeeded)
+    failures = failures or {}
+    results = []
+    for item_id in ids:
+        if item_id in succeeded:
+            results.append(BulkItemResult(id=item_id, success=True))
+        else:
+            detail = failures.get(item_id, missing_detail)
+            results.append(BulkItemResult(id=item_id, success=False, detail=detail))
+    ok = sum(result.success for result in results)
+    return BulkOperationResult(
+        succeeded=ok, failed=len(results) - ok, results=results
+    )
+
+
+async def _set_deleted_at(
+    db: AsyncSession, model, conditions, value: Optional[datetime], sum_column=None
+) -> tuple[int, int]:
+    """
+    Set deleted_at on every row matching `conditions` in one UPDATE.
+
+    Returns the number of rows changed and, if `sum_column` is given, its
+    total over those rows, aggregated in the database so no rows are loaded.
+    """
+    returned = sum_column if sum_column is not None else model.id
+    changed = (
+        update(model)
+        .where(*conditions)
+        .values(deleted_at=value)
+        .returning(returned)
+        .cte("changed_rows")
+    )
+    total = (
+        func.coalesce(func.sum(changed.c[returned.key]), 0)
+        if sum_column is not None
+        else literal(0)
+    )
+    result = await db.execute(select(func.count(), total).select_from(changed))
+    count, summed = result.one()
+    return int(count), int(summed)
+
+
+async def soft_delete_archives(
+    db: AsyncSession, *conditions, deleted_at: datetime
+) -> tuple[int, int]:
+    """
+    Soft delete the live archives matching `conditions`.
+
+    Returns (archives deleted, their summed download counts) for the
+    counters.
+    """
+    return await _set_deleted_at(
+        db,
+        Archive,
+        [Archive.deleted_at.is_(None), *conditions],
+        deleted_at,
+        sum_column=Archive.download_count,
+    )
+
+
+async def restore_archives(
+    db: AsyncSession, *conditions, deleted_at: datetime
+) -> tuple[int, int]:
+    """
+    Undo soft_delete_archives: restore the archives matching `conditions`
+    that were deleted at exactly `deleted_at`, leaving ones deleted on
+    their own earlier untouched.
+    """
+    return await _set_deleted_at(
+        db,
+        Archive,
+        [Archive.deleted_at == deleted_at, *conditions],
+        None,
+        sum_column=Archive.download_count,
+    )
+
+
+def _messages_of_courses(course_ids: list[int]):
+    return ArchiveDiscussionMessage.archive_id.in_(
+        select(Archive.id).where(Archive.course_id.in_(course_ids))
+    )
+
+
+async def soft_delete_course_discussions(
+    db: AsyncSession, course_ids: list[int], *, deleted_at: datetime
+) -> int:
+    """Soft delete the live discussion messages under the given courses."""
+    count, _ = await _set_deleted_at(
+        db,
+        ArchiveDiscussionMessage,
+        [
+            ArchiveDiscussionMessage.deleted_at.is_(None),
+            _messages_of_courses(course_ids),
+        ],
+        deleted_at,
+    )
+    return count
+
+
+async def restore_course_discussions(
+    db: AsyncSession, course_ids: list[int], *, deleted_at: datetime
+) -> int:
+    """Restore the discussion messages deleted along with the courses."""
+    count, _ = await _set_deleted_at(
+        db,
+        ArchiveDiscussionMessage,
+        [
+            ArchiveDiscussionMessage.deleted_at == deleted_at,
+            _messages_of_courses(course_ids),
+        ],
+        None,
+    )
+    return count
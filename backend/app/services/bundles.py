@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import re
+import secrets
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Archive, ArchiveBundleCreate, Course
+from app.utils import auth
+from app.utils.storage import ObjectInfo, ObjectStorage
+from app.utils.zipstream import ZipEntry, ZipLayout
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_KEY_PREFIX = "archive_bundle:"
+_UNSAFE_NAME = re.compile(r'[\x00-\x1f/\\:*?"<>|]+')
+
+
+class BundleError(ValueError):
+    pass
+
+
+class BundleManifest:
+    """
+    What a bundle contains, fixed when it is created: the objects, their
+    sizes and ETags, and the entry names. The zip layout derives from it,
+    so every request for the same bundle produces the same bytes and
+    interrupted downloads can resume with a Range request.
+    """
+
+    def __init__(
+        self,
+        bundle_id: str,
+        course_id: int,
+        filename: str,
+        created_at: datetime,
+        entries: list[tuple[int, str, str, str, int]],
+    ):
+        self.id = bundle_id
+        self.course_id = course_id
+        self.filename = filename
+        self.created_at = created_at
+        # (archive id, object name, etag, entry name, size)
+        self.entries = entries
+        self.layout = ZipLayout(
+            [ZipEntry(name, size) for _, _, _, name, size in entries], created_at
+        )
+
+    @property
+    def etag(self) -> str:
+        return f'"bundle-{self.id}"'
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "course_id": self.course_id,
+                "filename": self.filename,
+                "created_at": self.created_at.isoformat(),
+                "entries": self.entries,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, bundle_id: str, raw: bytes) -> "BundleManifest":
+        data = json.loads(raw)
+        return cls(
+            bundle_id,
+            data["course_id"],
+            data["filename"],
+            datetime.fromisoformat(data["created_at"]),
+            [tuple(entry) for entry in data["entries"]],
+        )
+
+
+def _manifest_key(bundle_id: str) -> str:
+    return f"{BUNDLE_KEY_PREFIX}{bundle_id}"
+
+
+def _crc_key(bundle_id: str) -> str:
+    return f"{BUNDLE_KEY_PREFIX}{bundle_id}:crc"
+
+
+def _safe_name(text: str) -> str:
+    return _UNSAFE_NAME.sub("_", text).strip() or "_"
+
+
+def entry_names(course_name: str, archives: list[Archive]) -> list[str]:
+    """Names as single downloads use them, made unique within the bundle."""
+    names = []
+    seen: dict[str, int] = {}
+    for archive in archives:
+        stem = _safe_name(
+            f"{archive.academic_year}_{course_name}_{archive.professor}_{archive.name}"
+        )
+        count = seen.get(stem, 0) + 1
+        seen[stem] = count
+        names.append(f"{stem}.pdf" if count == 1 else f"{stem} ({count}).pdf")
+    return names
+
+
+async def select_bundle_archives(
+    db: AsyncSession, course_id: int, selection: ArchiveBundleCreate
+) -> list[Archive]:
+    query = select(Archive).where(
+        Archive.course_id == course_id, Archive.deleted_at.is_(None)
+    )
+    if selection.archive_ids is not None:
+        query = query.where(Archive.id.in_(selection.archive_ids))
+    if selection.archive_type is not None:
+        query = query.where(Archive.archive_type == selection.archive_type)
+    if selection.professor:
+        query = query.where(Archive.professor == selection.professor)
+    if selection.academic_year is not None:
+        query = query.where(Archive.academic_year == selection.academic_year)
+    query = query.order_by(Archive.academic_year.desc(), Archive.id)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def create_bundle(
+    storage: ObjectStorage, course: Course, archives: list[Archive]
+) -> BundleManifest:
+    """Stat the selected objects and store the manifest for later requests."""
+    if not archives:
+        raise BundleError("No archives selected")
+    if len(archives) > settings.ARCHIVE_BUNDLE_MAX_ARCHIVES:
+        raise BundleError("Too many archives selected")
+
+    object_names = [
+        archive.optimized_object_name or archive.object_name for archive in archives
+    ]
+    infos = await asyncio.gather(*(storage.stat(name) for name in object_names))
+    if sum(info.size for info in infos) > settings.ARCHIVE_BUNDLE_MAX_BYTES:
+        raise BundleError("Selected archives are too large to bundle")
+
+    created_at = datetime.now(timezone.utc)
+    manifest = BundleManifest(
+        secrets.token_urlsafe(16),
+        course.id,
+        f"{_safe_name(course.name)}.zip",
+        created_at,
+        [
+            (archive.id, object_name, info.etag, name, info.size)
+            for archive, object_name, info, name in zip(
+                archives, object_names, infos, entry_names(course.name, archives)
+            )
+        ],
+    )
+    auth.redis_client.set(
+        _manifest_key(manifest.id),
+        manifest.to_json(),
+        ex=settings.ARCHIVE_BUNDLE_TTL_SECONDS,
+    )
+    return manifest
+
+
+def load_bundle(bundle_id: str) -> Optional[BundleManifest]:
+    raw = auth.redis_client.get(_manifest_key(bundle_id))
+    if raw is None:
+        return None
+    return BundleManifest.from_json(bundle_id, raw)
+
+
+def _load_crcs(bundle_id: str) -> dict[int, int]:
+    stored = auth.redis_client.hgetall(_crc_key(bundle_id))
+    return {int(index): int(crc) for index, crc in stored.items()}
+
+
+def _save_crcs(bundle_id: str, crcs: dict[int, int]):
+    try:
+        pipe = auth.redis_client.pipeline(transaction=False)
+        pipe.hset(_crc_key(bundle_id), mapping=crcs)
+        pipe.expire(_crc_key(bundle_id), settings.ARCHIVE_BUNDLE_TTL_SECONDS)
+        pipe.execute()
+    except Exception:
+        logger.exception("Failed to store CRCs of bundle %s", bundle_id)
+
+
+def _clip(data: bytes, data_start: int, start: int, end: int) -> bytes:
+    """The part of `data`, placed at `data_start`, inside [start, end]."""
+    low = max(start - data_start, 0)
+    high = min(end + 1 - data_start, len(data))
+    return data[low:high] if low < high else b""
+
+
+async def iter_bundle(
+    manifest: BundleManifest, storage: ObjectStorage, start: int, end: int
+) -> AsyncIterator[bytes]:
+    """
+    Yield bytes `start` to `end` (inclusive) of the bundle's zip.
+
+    PDFs are relayed from storage chunk by chunk. CRCs computed while
+    streaming are kept with the manifest, so a resumed download only
+    re-reads an object when the range needs a CRC that was never computed.
+    """
+    layout = manifest.layout
+    crcs = _load_crcs(manifest.id)
+    computed: dict[int, int] = {}
+    needs_central = end >= layout.central_offset
+    try:
+        for index, (_, object_name, etag, _, size) in enumerate(manifest.entries):
+            header_start = layout.header_offsets[index]
+            if header_start > end:
+                break
+            data_start = layout.data_offsets[index]
+            descriptor_start = layout.descriptor_offset(index)
+            in_descriptor = (
+                start < layout.entry_end(index) and end >= descriptor_start
+            )
+            crc_needed = index not in crcs and (needs_central or in_descriptor)
+            low, high = max(start, data_start), min(end + 1, data_start + size)
+            whole = low == data_start and high == data_start + size
+
+            chunk = _clip(layout.local_header(index), header_start, start, end)
+            if chunk:
+                yield chunk
+
+            info = ObjectInfo(size, etag, None, None)
+            if crc_needed or (whole and index not in crcs):
+                crc, position = 0, data_start
+                async for chunk in storage.stream(object_name, info=info):
+                    crc = zlib.crc32(chunk, crc)
+                    part = _clip(chunk, position, start, end)
+                    position += len(chunk)
+                    if part:
+                        yield part
+                crcs[index] = computed[index] = crc
+            elif low < high:
+                async for chunk in storage.stream(
+                    object_name, offset=low - data_start, length=high - low, info=info
+                ):
+                    yield chunk
+
+            if in_descriptor:
+                yield _clip(
+                    layout.descriptor(index, crcs[index]), descriptor_start, start, end
+                )
+
+        if needs_central:
+            central = layout.central_directory(
+                [crcs[index] for index in range(len(manifest.entries))]
+            )
+            yield _clip(central, layout.central_offset, start, end)
+    finally:
+        if computed:
+            _save_crcs(manifest.id, computed)
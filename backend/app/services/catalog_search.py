@@ -0,0 +1,145 @@
+from sqlalchemy import bindparam
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import (
+    Archive,
+    ArchiveSearchHit,
+    Course,
+    CourseRead,
+    SearchResults,
+)
+from app.utils.search import (
+    SEARCH_CONFIG,
+    build_tsquery,
+    search_document,
+    weighted_vector,
+)
+
+SEARCH_COURSE_LIMIT = 10
+# Archives whose course matches rank below archives matching directly.
+COURSE_MATCH_WEIGHT = 0.5
+BACKFILL_BATCH_SIZE = 500
+
+
+async def search_catalog(
+    db: AsyncSession, query: str, *, limit: int, offset: int
+) -> SearchResults:
+    """
+    Ranked search over course names, archive names and professors.
+
+    Archives match on their own vector or through their course's; both
+    lookups go through GIN indexes. Every matching archive is ranked to
+    order the results before the page is cut with OFFSET/LIMIT, so the cost
+    grows with the number of matches and with the offset, not the page size.
+    """
+    tsquery_text = build_tsquery(query)
+    if tsquery_text is None:
+        return SearchResults(query=query)
+    tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+
+    course_matches = select(Course.id).where(
+        Course.deleted_at.is_(None), Course.search_vector.bool_op("@@")(tsquery)
+    )
+    rank = func.ts_rank(Archive.search_vector, tsquery) + COURSE_MATCH_WEIGHT * (
+        func.ts_rank(Course.search_vector, tsquery)
+    )
+    archive_query = (
+        select(Archive, Course.name, Course.category)
+        .join(Course, Course.id == Archive.course_id)
+        .where(
+            Archive.deleted_at.is_(None),
+            Course.deleted_at.is_(None),
+            Archive.search_vector.bool_op("@@")(tsquery)
+            | Archive.course_id.in_(course_matches),
+        )
+        .order_by(rank.desc(), Archive.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(archive_query)).all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    archives = [
+        ArchiveSearchHit(
+            id=archive.id,
+            name=archive.name,
+            professor=archive.professor,
+            academic_year=archive.academic_year,
+            archive_type=archive.archive_type,
+            has_answers=archive.has_answers,
+            course_id=archive.course_id,
+            course_name=course_name,
+            course_category=course_category,
+        )
+        for archive, course_name, course_category in rows
+    ]
+
+    courses = []
+    if offset == 0:
+        result = await db.execute(
+            select(Course)
+            .where(
+                Course.deleted_at.is_(None),
+                Course.search_vector.bool_op("@@")(tsquery),
+            )
+            .order_by(func.ts_rank(Course.search_vector, tsquery).desc(), Course.name)
+            .limit(SEARCH_COURSE_LIMIT)
+        )
+        courses = [CourseRead.model_validate(course) for course in result.scalars()]
+
+    return SearchResults(
+        query=query, courses=courses, archives=archives, next_offset=next_offset
+    )
+
+
+async def backfill_search_vectors(db: AsyncSession) -> int:
+    """
+    Fill search_vector for rows written before it existed, or by paths that
+    bypass the ORM hooks (seeding, raw SQL). Each batch is one executemany.
+    Returns the rows updated.
+    """
+    courses, archives = Course.__table__, Archive.__table__
+    jobs = (
+        (
+            courses,
+            (courses.c.name,),
+            weighted_vector(bindparam("doc_a"), "A"),
+        ),
+        (
+            archives,
+            (archives.c.name, archives.c.professor),
+            weighted_vector(bindparam("doc_a"), "A").op("||")(
+                weighted_vector(bindparam("doc_b"), "B")
+            ),
+        ),
+    )
+
+    updated = 0
+    for table, columns, vector in jobs:
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam("row_id"))
+            .values(search_vector=vector)
+        )
+        while True:
+            result = await db.execute(
+                select(table.c.id, *columns)
+                .where(table.c.search_vector.is_(None))
+                .limit(BACKFILL_BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            params = []
+            for row_id, *values in rows:
+                documents = dict(zip(("doc_a", "doc_b"), map(search_document, values)))
+                params.append({"row_id": row_id, **documents})
+            await db.execute(statement, params)
+            await db.commit()
+            updated += len(rows)
+    return updated
@@ -0,0 +1,87 @@
+from sqlalchemy import case, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.models import Archive, Course, SystemCounter, User
+
+USERS = "users"
+COURSES = "courses"
+ARCHIVES = "archives"
+DOWNLOADS = "downloads"
+
+COUNTER_NAMES = (USERS, COURSES, ARCHIVES, DOWNLOADS)
+
+
+async def bump_counters(db: AsyncSession, **deltas: int):
+    """
+    Add deltas to the system counters in the caller's transaction.
+
+    Call before the commit that persists the change being counted, so the
+    counters and the data move together or not at all.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await db.execute(
+        update(SystemCounter)
+        .where(SystemCounter.name.in_(list(deltas)))
+        .values(
+            value=SystemCounter.value
+            + case(deltas, value=SystemCounter.name, else_=0)
+        )
+    )
+
+
+async def count_system_totals(db: AsyncSession) -> dict[str, int]:
+    """Recount every counter from the source tables in one round trip."""
+    user_totals = select(
+        func.count(User.id).filter(User.deleted_at.is_(None)).label(USERS)
+    ).subquery()
+    course_totals = select(
+        func.count(Course.id).filter(Course.deleted_at.is_(None)).label(COURSES)
+    ).subquery()
+    archive_totals = select(
+        func.count(Archive.id).filter(Archive.deleted_at.is_(None)).label(ARCHIVES),
+        func.coalesce(
+            func.sum(Archive.download_count).filter(Archive.deleted_at.is_(None)),
+            0,
+        ).label(DOWNLOADS),
+    ).subquery()
+
+    result = await db.execute(
+        select(user_totals, course_totals, archive_totals).select_from(
+            user_totals.join(course_totals, true()).join(archive_totals, true())
+        )
+    )
+    row = result.one()
+    return {name: int(getattr(row, name)) for name in COUNTER_NAMES}
+
+
+async def reconcile_counters(db: AsyncSession) -> dict[str, int]:
+    """
+    Overwrite the counters with freshly counted totals.
+
+    The counter rows are locked before recounting, so writers that commit
+    meanwhile apply their deltas on top of the new totals instead of being
+    lost. Returns the drift that was corrected (actual - stored).
+    """
+    result = await db.execute(
+        select(SystemCounter.name, SystemCounter.value).with_for_update()
+    )
+    stored = dict(result.all())
+
+    actual = await count_system_totals(db)
+
+    stmt = insert(SystemCounter).values(
+        [{"name": name, "value": value} for name, value in actual.items()]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SystemCounter.name],
+            set_={"value": stmt.excluded.value},
+        )
+    )
+    await db.commit()
+
+    return {name: actual[name] - stored.get(name, 0) for name in COUNTER_NAMES}
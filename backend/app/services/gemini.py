@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import random
+import time
+from enum import Enum
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from google import genai
+
+T = TypeVar("T")
+
+
+class GeminiErrorKind(str, Enum):
+    RATE_LIMITED = "rate_limited"
+    SERVER_ERROR = "server_error"
+    TIMEOUT = "timeout"
+    INVALID_KEY = "invalid_key"
+    OTHER = "other"
+
+
+RETRYABLE_ERROR_KINDS = {
+    GeminiErrorKind.RATE_LIMITED,
+    GeminiErrorKind.SERVER_ERROR,
+    GeminiErrorKind.TIMEOUT,
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while a key's circuit is open."""
+
+
+class InvalidApiKeyError(Exception):
+    """Raised when Gemini rejects an API key."""
+
+
+def create_gemini_client(api_key: str) -> "genai.Client":
+    """
+    Build a Gemini client, pointing it at GEMINI_BASE_URL when configured
+    (used to stand in a local fake server).
+
+    The SDK is imported here rather than at module load: it is the single
+    slowest import of the worker and only AI exam jobs need it.
+    """
+    from google import genai
+    from google.genai.types import HttpOptions
+
+    if settings.GEMINI_BASE_URL:
+        return genai.Client(
+            api_key=api_key,
+            http_options=HttpOptions(base_url=settings.GEMINI_BASE_URL),
+        )
+    return genai.Client(api_key=api_key)
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def classify_gemini_error(exc: BaseException) -> GeminiErrorKind:
+    import httpx
+    from google.genai import errors as genai_errors
+
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return GeminiErrorKind.TIMEOUT
+
+    if isinstance(exc, genai_errors.APIError):
+        code = exc.code or 0
+        message = f"{exc.status or ''} {exc.message or ''}".lower()
+        if code == 429:
+            return GeminiErrorKind.RATE_LIMITED
+        if code >= 500:
+            return GeminiErrorKind.SERVER_ERROR
+        if code in (401, 403) or "api key" in message or "api_key" in message:
+            return GeminiErrorKind.INVALID_KEY
+        return GeminiErrorKind.OTHER
+
+    if isinstance(exc, httpx.TransportError):
+        return GeminiErrorKind.SERVER_ERROR
+
+    return GeminiErrorKind.OTHER
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` upstream failures in a row the circuit opens and
+    calls fail fast for `reset_seconds`. It then half-opens: one call is let
+    through as a probe while the others keep failing fast. Success closes the
+    circuit, failure re-opens it. A probe that reports neither, because it
+    was cancelled or failed for an unrelated reason, frees the slot for a
+    new probe after `reset_seconds`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+
+    def _waiting(self, since: Optional[float]) -> bool:
+        return since is not None and self._clock() - since < self.reset_seconds
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls fail fast, including behind an in-flight probe."""
+        return self._waiting(self._opened_at) or self._waiting(
+            self._probe_started_at
+        )
+
+    def before_call(self):
+        if self.is_open:
+            raise CircuitOpenError(
+                "Gemini API is temporarily unavailable, please try again later"
+            )
+        if self._opened_at is not None:
+            self._probe_started_at = self._clock()
+
+    def release_probe(self):
+        """End a probe whose outcome says nothing about upstream health."""
+        self._probe_started_at = None
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+        self._probe_started_at = None
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(api_key: str) -> CircuitBreaker:
+    fingerprint = api_key_fingerprint(api_key)
+    breaker = _breakers.get(fingerprint)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.GEMINI_CIRCUIT_RESET_SECONDS,
+        )
+        _breakers[fingerprint] = breaker
+    return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt."""
+    ceiling = min(
+        settings.GEMINI_RETRY_MAX_DELAY_SECONDS,
+        settings.GEMINI_RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)),
+    )
+    return random.uniform(0, ceiling)
+
+
+async def call_with_retry(
+    operation: Callable[[], Awaitable[T]],
+    *,
+    api_key: str,
+    timeout: Optional[float] = None,
+    can_retry: Optional[Callable[[], bool]] = None,
+) -> T:
+    """
+    Run a Gemini operation with jittered retries behind the key's circuit breaker.
+
+    Only rate limits, 5xx and timeouts are retried. `can_retry` lets callers
+    veto a retry, for example once streamed output has reached the client.
+    """
+    breaker = get_circuit_breaker(api_key)
+    attempts = max(1, settings.GEMINI_MAX_ATTEMPTS)
+
+    for attempt in range(1, attempts + 1):
+        breaker.before_call()
+        try:
+            if timeout is None:
+                result = await operation()
+            else:
+                result = await asyncio.wait_for(operation(), timeout=timeout)
+        except Exception as exc:
+            kind = classify_gemini_error(exc)
+            if kind not in RETRYABLE_ERROR_KINDS:
+                breaker.release_probe()
+                raise
+            breaker.record_failure()
+            if attempt == attempts or (can_retry and not can_retry()):
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        breaker.record_success()
+        return result
+
+
+# fingerprint -> (expires_at, error message or None when the key is valid)
+_key_validations: dict[str, tuple[float, Optional[str]]] = {}
+
+
+def get_cached_key_validation(api_key: str) -> Optional[tuple[bool, Optional[str]]]:
+    """Return (is_valid, error) for a recently validated key, or None."""
+    fingerprint = api_key_fingerprint(api_key)
+    entry = _key_validations.get(fingerprint)
+    if entry is None:
+        return None
+    expires_at, error = entry
+    if expires_at <= time.monotonic():
+        _key_validations.pop(fingerprint, None)
+        return None
+    return error is None, error
+
+
+def _cache_key_validation(api_key: str, error: Optional[str]):
+    ttl = (
+        settings.GEMINI_KEY_VALIDATION_CACHE_SECONDS
+        if error is None
+        else settings.GEMINI_KEY_VALIDATION_NEGATIVE_CACHE_SECONDS
+    )
+    if ttl <= 0:
+        return
+    _key_validations[api_key_fingerprint(api_key)] = (time.monotonic() + ttl, error)
+
+
+async def validate_api_key(api_key: str):
+    """
+    Check a key with a metadata lookup of GEMINI_MODEL instead of a generation.
+
+    Raises InvalidApiKeyError when Gemini rejects the key. Timeouts and
+    upstream failures propagate unchanged and are not cached.
+    """
+    cached = get_cached_key_validation(api_key)
+    if cached is not None:
+        is_valid, error = cached
+        if is_valid:
+            return
+        raise InvalidApiKeyError(error)
+
+    client = create_gemini_client(api_key)
+    try:
+        await asyncio.wait_for(
+            client.aio.models.get(model=settings.GEMINI_MODEL),
+            timeout=settings.GEMINI_KEY_VALIDATION_TIMEOUT_SECONDS,
+        )
+    except Exception as exc:
+        if classify_gemini_error(exc) != GeminiErrorKind.INVALID_KEY:
+            raise
+        error = getattr(exc, "message", None) or str(exc)
+        _cache_key_validation(api_key, error)
+        raise InvalidApiKeyError(error) from exc
+
+    _cache_key_validation(api_key, None)
@@ -0,0 +1,118 @@
+import random
+from typing import Optional
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Meme, MemeRead
+from app.utils.cache import SingleFlightCache
+
+
+class MemeCorpus:
+    """
+    Immutable snapshot of the memes table, indexed by language.
+
+    `signature` is (row count, max id); memes only change when seeded, so a
+    matching signature means the snapshot is still current. `memes` is None
+    when the table is too large to hold in memory.
+    """
+
+    def __init__(
+        self,
+        signature: tuple[int, Optional[int]],
+        memes: Optional[tuple[MemeRead, ...]],
+    ):
+        self.signature = signature
+        self.memes = memes
+        self.by_language: dict[str, tuple[MemeRead, ...]] = {}
+        if memes is not None:
+            grouped: dict[str, list[MemeRead]] = {}
+            for meme in memes:
+                grouped.setdefault(meme.language, []).append(meme)
+            self.by_language = {
+                language: tuple(items) for language, items in grouped.items()
+            }
+
+    def pick(self, language: Optional[str] = None) -> Optional[MemeRead]:
+        candidates = self.memes if language is None else self.by_language.get(language)
+        return random.choice(candidates) if candidates else None
+
+
+meme_cache: SingleFlightCache[MemeCorpus] = SingleFlightCache(
+    settings.MEME_CACHE_TTL_SECONDS
+)
+
+
+async def _corpus_signature(db: AsyncSession) -> tuple[int, Optional[int]]:
+    result = await db.execute(select(func.count(Meme.id), func.max(Meme.id)))
+    count, max_id = result.one()
+    return int(count), max_id
+
+
+async def load_meme_corpus(
+    db: AsyncSession, current: Optional[MemeCorpus] = None
+) -> MemeCorpus:
+    """
+    Build a corpus snapshot, reusing `current` when the table is unchanged
+    so revalidation costs one aggregate over the primary key.
+    """
+    signature = await _corpus_signature(db)
+    if current is not None and current.signature == signature:
+        return current
+
+    count, _ = signature
+    if count > settings.MEME_CACHE_MAX_ITEMS:
+        return MemeCorpus(signature, None)
+
+    result = await db.execute(select(Meme).order_by(Meme.id))
+    memes = tuple(MemeRead.model_validate(meme) for meme in result.scalars().all())
+    return MemeCorpus(signature, memes)
+
+
+async def warm_meme_cache():
+    """Load the corpus at startup so the first request does not pay for it."""
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        meme_cache.set(await load_meme_corpus(db, meme_cache.value))
+
+
+async def _pick_from_table(
+    db: AsyncSession, language: Optional[str] = None
+) -> Optional[Meme]:
+    """
+    Pick a meme by seeking to a random point in the id range.
+
+    Two index lookups instead of a sort over the whole table; gaps in the id
+    sequence make the choice slightly uneven, which is fine for memes.
+    """
+    filters = [Meme.language == language] if language is not None else []
+    result = await db.execute(
+        select(func.min(Meme.id), func.max(Meme.id)).where(*filters)
+    )
+    min_id, max_id = result.one()
+    if min_id is None:
+        return None
+
+    pivot = random.randint(min_id, max_id)
+    result = await db.execute(
+        select(Meme).where(Meme.id >= pivot, *filters).order_by(Meme.id).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def pick_random_meme(
+    db: AsyncSession, language: Optional[str] = None
+) -> Optional[MemeRead]:
+    """
+    Serve a random meme from the in-process corpus, revalidated against the
+    table every MEME_CACHE_TTL_SECONDS; fall back to an indexed random seek
+    when the table is too large to cache.
+    """
+    corpus = await meme_cache.get(lambda: load_meme_corpus(db, meme_cache.value))
+    if corpus.memes is not None:
+        return corpus.pick(language)
+
+    meme = await _pick_from_table(db, language)
+    return MemeRead.model_validate(meme) if meme is not None else None
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Durable, trimmed log of events used to resume clients by Last-Event-ID.
+NOTIFICATION_EVENTS_STREAM = "notifications:events"
+# Live fan-out to every API process.
+NOTIFICATION_EVENTS_CHANNEL = "notifications:events:live"
+
+# Queued to subscribers when the Pub/Sub connection was re-established and
+# live messages may have been missed; they replay from the stream instead.
+RESYNC = {"type": "resync"}
+
+
+def parse_event_id(event_id: str) -> Optional[tuple[int, int]]:
+    try:
+        ms, seq = str(event_id).split("-", 1)
+        return int(ms), int(seq)
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _event_from_entry(entry_id, fields: dict) -> dict:
+    fields = {_decode(key): _decode(value) for key, value in fields.items()}
+    return {
+        "id": _decode(entry_id),
+        "type": fields.get("type"),
+        "notification_id": int(fields["notification_id"]),
+        "notification": json.loads(fields.get("notification") or "null"),
+    }
+
+
+def publish_notification_event(
+    redis_client,
+    event_type: str,
+    notification_id: int,
+    notification: Optional[dict] = None,
+):
+    """
+    Record a notification change in the event stream and broadcast it.
+
+    `notification` must already be JSON-compatible. Uses the synchronous
+    client, like the other admin-side Redis writes.
+    """
+    fields = {
+        "type": event_type,
+        "notification_id": str(notification_id),
+        "notification": json.dumps(notification),
+    }
+    entry_id = redis_client.xadd(
+        NOTIFICATION_EVENTS_STREAM,
+        fields,
+        maxlen=settings.NOTIFICATION_EVENTS_MAXLEN,
+        approximate=True,
+    )
+    event = _event_from_entry(entry_id, fields)
+    redis_client.publish(NOTIFICATION_EVENTS_CHANNEL, json.dumps(event))
+    return event
+
+
+class Subscription:
+    def __init__(self, max_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        # Set when the client fell behind; it should reconnect and resume.
+        self.overflowed = False
+
+
+class NotificationBroadcaster:
+    """
+    Per-process fan-out of notification events.
+
+    A single Pub/Sub subscription per process feeds in-memory queues, one per
+    connected client, so open tabs cost no Redis connections of their own.
+    """
+
+    def __init__(self, redis_url: str):
+        self._redis_url = redis_url
+        self._redis: Optional[aioredis.Redis] = None
+        self._subscriptions: set[Subscription] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.from_url(self._redis_url)
+        return self._redis
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        self._subscriptions.add(subscription)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    def dispatch(self, event: dict):
+        for subscription in list(self._subscriptions):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self._subscriptions.discard(subscription)
+
+    async def _listen(self):
+        connected_before = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(NOTIFICATION_EVENTS_CHANNEL)
+                if connected_before:
+                    self.dispatch(RESYNC)
+                connected_before = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification event subscription failed")
+            finally:
+                # Give the connection back before the next attempt opens one.
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    logger.exception("Failed to close notification subscription")
+            await asyncio.sleep(1)
+
+    async def latest_event_id(self) -> str:
+        entries = await self.redis.xrevrange(NOTIFICATION_EVENTS_STREAM, count=1)
+        return _decode(entries[0][0]) if entries else "0-0"
+
+    async def replay(self, last_event_id: str) -> Optional[list[dict]]:
+        """
+        Events after `last_event_id`, or None when the client cannot be
+        resumed (unparsable id, or older than anything still retained).
+        """
+        last = parse_event_id(last_event_id)
+        if last is None:
+            return None
+
+        oldest = await self.redis.xrange(NOTIFICATION_EVENTS_STREAM, count=1)
+        if oldest and last < parse_event_id(_decode(oldest[0][0])):
+            return None
+
+        entries = await self.redis.xrange(NOTIFICATION_EVENTS_STREAM, min=last_event_id)
+        return [
+            _event_from_entry(entry_id, fields)
+            for entry_id, fields in entries
+            if parse_event_id(_decode(entry_id)) > last
+        ]
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def format_sse(event: str, event_id: str, data) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _catch_up(
+    broadcaster: NotificationBroadcaster, from_id: str
+) -> tuple[str, list[str]]:
+    events = await broadcaster.replay(from_id)
+    if events is None:
+        latest = await broadcaster.latest_event_id()
+        return latest, [format_sse("reset", latest, {})]
+    chunks = [format_sse("notification", event["id"], event) for event in events]
+    return (events[-1]["id"] if events else from_id), chunks
+
+
+async def notification_event_stream(
+    broadcaster: NotificationBroadcaster,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    last_event_id: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for notification changes.
+
+    Emits `ready` on a fresh connection, replays missed events when resuming
+    with Last-Event-ID, and emits `reset` when the gap cannot be replayed so
+    the client refetches the active list.
+    """
+    subscription = broadcaster.subscribe()
+    try:
+        if last_event_id:
+            last_id, chunks = await _catch_up(broadcaster, last_event_id)
+            for chunk in chunks:
+                yield chunk
+        else:
+            last_id = await broadcaster.latest_event_id()
+            yield format_sse("ready", last_id, {})
+        cursor = parse_event_id(last_id)
+
+        while True:
+            if await is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.NOTIFICATION_STREAM_KEEPALIVE_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                if subscription.overflowed:
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            if event is RESYNC:
+                last_id, chunks = await _catch_up(broadcaster, last_id)
+                for chunk in chunks:
+                    yield chunk
+                cursor = parse_event_id(last_id)
+                continue
+
+            event_cursor = parse_event_id(event.get("id"))
+            if event_cursor is None or (cursor is not None and event_cursor <= cursor):
+                continue
+            yield format_sse("notification", event["id"], event)
+            last_id, cursor = event["id"], event_cursor
+
+            if subscription.overflowed and subscription.queue.empty():
+                return
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+broadcaster = NotificationBroadcaster(settings.REDIS_URL)
@@ -0,0 +1,96 @@
+from typing import Optional
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.models import Archive, ProfessorSuggestion
+from app.utils.cache import SingleFlightCache
+from app.utils.professors import ProfessorIndex
+
+# Suggestions kept per trie node; requests cannot ask for more than this.
+PROFESSOR_SUGGESTIONS_MAX = 20
+
+
+class ProfessorSnapshot:
+    """
+    Professor index plus the archives signature it was built from.
+
+    `signature` is (live archives, max id, max updated_at, max deleted_at),
+    which moves on every insert, edit, soft delete and restore.
+    """
+
+    def __init__(self, signature: tuple, index: ProfessorIndex):
+        self.signature = signature
+        self.index = index
+
+
+professor_cache: SingleFlightCache[ProfessorSnapshot] = SingleFlightCache(
+    settings.PROFESSOR_INDEX_TTL_SECONDS
+)
+
+
+async def _archives_signature(db: AsyncSession) -> tuple:
+    result = await db.execute(
+        select(
+            func.count(Archive.id).filter(Archive.deleted_at.is_(None)),
+            func.max(Archive.id),
+            func.max(Archive.updated_at),
+            func.max(Archive.deleted_at),
+        )
+    )
+    return tuple(result.one())
+
+
+async def load_professor_index(
+    db: AsyncSession, current: Optional[ProfessorSnapshot] = None
+) -> ProfessorSnapshot:
+    """
+    Rebuild the index from the distinct (professor, course) pairs of live
+    archives, reusing `current` when the signature has not moved.
+    """
+    signature = await _archives_signature(db)
+    if current is not None and current.signature == signature:
+        return current
+
+    result = await db.execute(
+        select(Archive.professor, Archive.course_id, func.count(Archive.id))
+        .where(Archive.deleted_at.is_(None))
+        .group_by(Archive.professor, Archive.course_id)
+    )
+    index = ProfessorIndex(result.all(), top_k=PROFESSOR_SUGGESTIONS_MAX)
+    return ProfessorSnapshot(signature, index)
+
+
+async def get_professor_index(db: AsyncSession) -> ProfessorIndex:
+    snapshot = await professor_cache.get(
+        lambda: load_professor_index(db, professor_cache.value)
+    )
+    return snapshot.index
+
+
+def invalidate_professor_index():
+    """Make the next lookup revalidate; call after writing archives."""
+    professor_cache.expire()
+
+
+async def suggest_professors(
+    db: AsyncSession,
+    q: str = "",
+    course_id: Optional[int] = None,
+    limit: int = 10,
+) -> list[ProfessorSuggestion]:
+    index = await get_professor_index(db)
+    return [
+        ProfessorSuggestion(name=name, archive_count=count)
+        for name, count in index.suggest(q, course_id=course_id, limit=limit)
+    ]
+
+
+async def canonical_professor_name(db: AsyncSession, name: str) -> str:
+    """
+    Normalize `name` and snap it to the established spelling when one
+    differs only in case or spacing, so new archives do not fork a professor.
+    """
+    index = await get_professor_index(db)
+    return index.canonical_name(name)
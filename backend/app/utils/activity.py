@@ -0,0 +1,78 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ONLINE_USERS_KEY = "activity:online"
+
+# user_id -> monotonic time of the last write, so a busy client costs one
+# Redis round trip per USER_ACTIVITY_WRITE_INTERVAL_SECONDS.
+_last_recorded: dict[int, float] = {}
+
+
+def daily_active_key(day: datetime) -> str:
+    return f"activity:dau:{day.astimezone(timezone.utc):%Y-%m-%d}"
+
+
+def _should_record(user_id: int, now: float) -> bool:
+    interval = settings.USER_ACTIVITY_WRITE_INTERVAL_SECONDS
+    last = _last_recorded.get(user_id)
+    if last is not None and now - last < interval:
+        return False
+
+    if len(_last_recorded) >= settings.USER_ACTIVITY_THROTTLE_MAX_ENTRIES:
+        stale = [uid for uid, ts in _last_recorded.items() if now - ts >= interval]
+        for uid in stale:
+            del _last_recorded[uid]
+        if len(_last_recorded) >= settings.USER_ACTIVITY_THROTTLE_MAX_ENTRIES:
+            _last_recorded.clear()
+
+    _last_recorded[user_id] = now
+    return True
+
+
+def record_user_activity(redis_client, user_id: int):
+    """
+    Mark a user as seen: a timestamped ZADD for the online window and a
+    PFADD into today's HyperLogLog. Best-effort; failures are logged.
+    """
+    if not _should_record(user_id, time.monotonic()):
+        return
+
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(minutes=settings.ONLINE_USER_WINDOW_MINUTES)
+    dau_key = daily_active_key(now)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zadd(ONLINE_USERS_KEY, {str(user_id): now.timestamp()})
+        pipe.zremrangebyscore(ONLINE_USERS_KEY, "-inf", window_start.timestamp())
+        pipe.pfadd(dau_key, str(user_id))
+        pipe.expire(dau_key, int(timedelta(days=2).total_seconds()))
+        pipe.execute()
+    except Exception:
+        _last_recorded.pop(user_id, None)
+        logger.exception("Failed to record activity for user %s", user_id)
+
+
+def clear_user_activity(redis_client, user_id: int):
+    """Drop a user from the online window, e.g. on logout."""
+    _last_recorded.pop(user_id, None)
+    try:
+        redis_client.zrem(ONLINE_USERS_KEY, str(user_id))
+    except Exception:
+        logger.exception("Failed to clear activity for user %s", user_id)
+
+
+def get_activity_counts(redis_client) -> tuple[int, int]:
+    """Return (users active in the online window, distinct users today)."""
+    now = datetime.now(timezone.utc)
+    window_start = now - timedelta(minutes=settings.ONLINE_USER_WINDOW_MINUTES)
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zcount(ONLINE_USERS_KEY, window_start.timestamp(), "+inf")
+    pipe.pfcount(daily_active_key(now))
+    online_users, active_today = pipe.execute()
+    return int(online_users), int(active_today)
@@ -1,38 +1,67 @@
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import redis
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.resources import resources
 from app.db.session import get_session
 from app.models.models import User, UserRoles
-
-pwd_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated=["bcrypt"])
-redis_client = redis.from_url(settings.REDIS_URL)
+from app.utils.activity import clear_user_activity, record_user_activity
 
 oauth2_scheme = HTTPBearer()
 
 
+def __getattr__(name: str):
+    # `redis_client` is the shared client from app.core.resources, looked up
+    # on access rather than bound at import. Tests set the attribute to
+    # replace it with a fake.
+    if name == "redis_client":
+        return resources.redis
+    # jose is imported on first use; `jwt` and `JWTError` stay reachable
+    # here as they were when this module imported them at load time.
+    if name in ("jwt", "JWTError"):
+        from jose import JWTError, jwt
+
+        return {"jwt": jwt, "JWTError": JWTError}[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _redis() -> redis.Redis:
+    client = globals().get("redis_client")
+    return client if client is not None else resources.redis
+
+
+@lru_cache(maxsize=1)
+def _password_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated=["bcrypt"])
+
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _password_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _password_context().verify(plain_password, hashed_password)
+
+
+def clear_current_user_activity(user_id: int):
+    clear_user_activity(_redis(), user_id)
 
 
 def blacklist_token(token: str, expire_seconds: int = 7200):
-    redis_client.setex(f"blacklist:{token}", expire_seconds, "1")
+    _redis().setex(f"blacklist:{token}", expire_seconds, "1")
 
 
 def is_token_blacklisted(token: str) -> bool:
-    result = redis_client.get(f"blacklist:{token}")
+    result = _redis().get(f"blacklist:{token}")
     return result is not None
 
 
@@ -77,6 +106,8 @@ async def get_current_user(
         detail="Cannot validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token.credentials,
@@ -103,6 +134,8 @@ async def get_current_user(
         if not user:
             raise credentials_exception
 
+        record_user_activity(_redis(), user_id)
+
         return UserRoles(user_id=user_id, is_admin=user.is_admin)
     except JWTError:
         raise credentials_exception
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightCache(Generic[T]):
+    """
+    Cache a single value in process for `ttl_seconds`.
+
+    When the value is missing or stale, concurrent callers wait on one
+    computation instead of each running their own. Failed computations are
+    not cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._value: Optional[T] = None
+        self._expires_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._expires_at is not None and self._clock() < self._expires_at
+
+    @property
+    def value(self) -> Optional[T]:
+        """The last computed value, even if stale."""
+        return self._value
+
+    def set(self, value: T):
+        self._value = value
+        self._expires_at = self._clock() + self.ttl_seconds
+
+    def clear(self):
+        self._value = None
+        self._expires_at = None
+
+    def expire(self):
+        """Mark the value stale, keeping it available through `value`."""
+        self._expires_at = None
+
+    async def get(self, compute: Callable[[], Awaitable[T]]) -> T:
+        if self._fresh():
+            return self._value
+
+        async with self._lock:
+            # Another caller may have refreshed the value while we waited.
+            if self._fresh():
+                return self._value
+            value = await compute()
+            self.set(value)
+            return value
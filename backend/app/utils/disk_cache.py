@@ -0,0 +1,109 @@
+import hashlib
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+_TEMP_PREFIX = ".tmp-"
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk cache of storage objects, least recently used first
+    out.
+
+    Entries are keyed by object name and ETag, so an overwritten object
+    simply misses. Files are written to a temporary name and renamed into
+    place, so readers never see a partial entry, and a file's mtime is its
+    last use. The directory itself is the index: several processes on one
+    host can share it, and eviction rescans it rather than trusting a
+    per-process view.
+    """
+
+    def __init__(self, directory: str, capacity_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity_bytes = capacity_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key: str, etag: str) -> Path:
+        digest = hashlib.sha256(f"{key}\0{etag}".encode()).hexdigest()
+        return self.directory / digest
+
+    def open(self, key: str, etag: str) -> Optional[mmap.mmap]:
+        """A read-only map of the entry, or None on a miss. Close it after use."""
+        path = self._path(key, etag)
+        try:
+            with open(path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            # ValueError: an empty file, which put never writes.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return mapped
+
+    def read(self, key: str, etag: str) -> Optional[bytes]:
+        mapped = self.open(key, etag)
+        if mapped is None:
+            return None
+        with mapped:
+            return mapped[:]
+
+    def put(self, key: str, etag: str, data: bytes) -> bool:
+        """Store an entry, then evict old ones; False if it cannot fit."""
+        if not data or len(data) > self.capacity_bytes:
+            return False
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=_TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self._path(key, etag))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self.writes += 1
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its capacity."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.startswith(_TEMP_PREFIX) or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.capacity_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Another process evicted it first.
+                pass
+            else:
+                self.evictions += 1
+            total -= size
+
+    def stats(self) -> dict[str, int]:
+        """Counters since this process started; each process keeps its own."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,163 @@
+"""
+Import-time profile of the service entry points.
+
+Usage:
+  python -m app.utils.importtime                      # app.main and app.worker
+  python -m app.utils.importtime app.worker --top 30  # longer breakdown
+  python -m app.utils.importtime --budget-ms 2000     # override the budgets
+
+Each module is imported in a fresh interpreter under `-X importtime`. The
+command prints where the time goes, per top-level package, and exits with
+status 1 when an entry point is over its budget or loads a dependency that
+should only be imported on first use.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import time allowed per entry point, in milliseconds. Startup
+# speed matters for autoscaling, test runs and ARQ worker restarts.
+IMPORT_BUDGETS_MS = {
+    "app.main": 2500,
+    "app.worker": 1500,
+}
+
+# Heavy dependencies the entry points must leave to first use.
+_OPTIONAL_MODULES = (
+    "google.genai",
+    "pikepdf",
+    "pypdfium2",
+    "pypdf",
+    "PIL",
+    "minio",
+    "alembic",
+    "yaml",
+    "passlib",
+)
+DEFERRED_MODULES = {
+    "app.main": _OPTIONAL_MODULES,
+    "app.worker": _OPTIONAL_MODULES + ("jose", "httpx"),
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Records of `-X importtime` output; other stderr lines are skipped."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(
+                    module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2
+                )
+            )
+    return records
+
+
+def profile_imports(module: str) -> list[ImportRecord]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: Sequence[ImportRecord], module: str) -> float:
+    for record in reversed(records):
+        if record.module == module:
+            return record.cumulative_us / 1000
+    raise ValueError(f"{module} is not in the profile")
+
+
+def package_breakdown(records: Sequence[ImportRecord]) -> list[tuple[str, float]]:
+    """Self time summed per top-level package, slowest first, in ms."""
+    totals: dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.partition(".")[0]] += record.self_us
+    return sorted(
+        ((package, us / 1000) for package, us in totals.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def deferred_imports(
+    records: Sequence[ImportRecord], deferred: Sequence[str]
+) -> list[str]:
+    """The entries of `deferred` that were imported, themselves or a submodule."""
+    loaded = {record.module for record in records}
+    return [
+        name
+        for name in deferred
+        if any(module == name or module.startswith(f"{name}.") for module in loaded)
+    ]
+
+
+def check_entry_point(
+    module: str, records: Sequence[ImportRecord], budget_ms: Optional[float]
+) -> list[str]:
+    """Problems with an entry point's profile; empty when it is within bounds."""
+    problems = []
+    elapsed = total_ms(records, module)
+    if budget_ms is not None and elapsed > budget_ms:
+        problems.append(
+            f"{module} took {elapsed:.0f} ms to import, over its {budget_ms:.0f} ms budget"
+        )
+    for name in deferred_imports(records, DEFERRED_MODULES.get(module, ())):
+        problems.append(f"{module} imports {name} at load time")
+    return problems
+
+
+def format_report(module: str, records: Sequence[ImportRecord], top: int) -> str:
+    lines = [f"{module}: {total_ms(records, module):.1f} ms"]
+    for package, elapsed in package_breakdown(records)[:top]:
+        lines.append(f"  {elapsed:9.1f} ms  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules:
+        records = profile_imports(module)
+        print(format_report(module, records, args.top))
+        budget = (
+            args.budget_ms
+            if args.budget_ms is not None
+            else IMPORT_BUDGETS_MS.get(module)
+        )
+        problems.extend(check_entry_point(module, records, budget))
+
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
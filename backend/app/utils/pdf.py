@@ -0,0 +1,231 @@
+import hashlib
+import io
+import math
+import re
+
+# The PDF and imaging libraries are imported by the functions that use them:
+# they are heavy, and only worker jobs that process a PDF need them.
+
+# A page with no text, no images and less drawing than this is treated as blank.
+BLANK_PAGE_MAX_CONTENT_BYTES = 128
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _page_content(page) -> bytes:
+    try:
+        contents = page.get_contents()
+        return contents.get_data() if contents is not None else b""
+    except Exception:
+        return b""
+
+
+def _page_xobject_digests(page) -> list[str]:
+    digests = []
+    try:
+        xobjects = page.get("/Resources", {}).get_object().get("/XObject")
+    except Exception:
+        xobjects = None
+    if not xobjects:
+        return digests
+
+    for name, ref in xobjects.get_object().items():
+        xobject = ref.get_object()
+        try:
+            data = xobject.get_data()
+        except Exception:
+            data = b""
+        digest = hashlib.sha256(data).hexdigest()
+        size = f"{xobject.get('/Width')}x{xobject.get('/Height')}"
+        digests.append(f"{name}:{size}:{digest}")
+    return sorted(digests)
+
+
+def _page_text(page) -> str:
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        text = ""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def compact_pdf(pdf_data: bytes) -> dict | None:
+    """
+    Drop blank and repeated pages and rewrite the PDF with shared objects
+    deduplicated and content streams compressed.
+
+    Returns None when the result would not be smaller than the input, so the
+    caller can keep using the original.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(io.BytesIO(pdf_data))
+    writer = PdfWriter()
+    seen: set[str] = set()
+    pages_total = len(reader.pages)
+
+    for page in reader.pages:
+        text = _page_text(page)
+        xobjects = _page_xobject_digests(page)
+        content = _page_content(page)
+
+        if (
+            not text
+            and not xobjects
+            and len(content.strip()) < BLANK_PAGE_MAX_CONTENT_BYTES
+        ):
+            continue
+
+        fingerprint = hashlib.sha256(
+            "\n".join([text, *xobjects]).encode("utf-8")
+            + hashlib.sha256(content).digest()
+        ).hexdigest()
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        writer.add_page(page)
+
+    pages_kept = len(writer.pages)
+    if pages_kept == 0:
+        return None
+
+    for page in writer.pages:
+        page.compress_content_streams()
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
+    output = io.BytesIO()
+    writer.write(output)
+    data = output.getvalue()
+
+    if len(data) >= len(pdf_data):
+        return None
+
+    return {"data": data, "pages_total": pages_total, "pages_kept": pages_kept}
+
+
+_JPEG_COLORSPACES = {"/DeviceRGB": "RGB", "/DeviceGray": "L"}
+
+
+def _recompress_image(raw, max_width: int, max_height: int, quality: int) -> bool:
+    """
+    Re-encode one image XObject as JPEG, downsampled to fit the given size.
+
+    Only 8-bit RGB and grayscale images without masks or decode arrays are
+    touched. Lossless images that already fit are left alone so line art
+    keeps its edges. Returns whether the image was replaced.
+    """
+    colorspace = str(raw.get("/ColorSpace", ""))
+    if (
+        colorspace not in _JPEG_COLORSPACES
+        or raw.get("/BitsPerComponent") != 8
+        or raw.get("/ImageMask", False)
+        or "/SMask" in raw
+        or "/Mask" in raw
+        or "/Decode" in raw
+    ):
+        return False
+
+    import pikepdf
+    from PIL import Image
+
+    image = pikepdf.PdfImage(raw)
+    oversized = image.width > max_width or image.height > max_height
+    is_jpeg = [str(name) for name in image.filters] == ["/DCTDecode"]
+    if not oversized and not is_jpeg:
+        return False
+
+    pil_image = image.as_pil_image().convert(_JPEG_COLORSPACES[colorspace])
+    if oversized:
+        pil_image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    pil_image.save(output, format="JPEG", quality=quality, optimize=True)
+    data = output.getvalue()
+    if len(data) >= len(raw.read_raw_bytes()):
+        return False
+
+    raw.write(data, filter=pikepdf.Name.DCTDecode)
+    raw.Width, raw.Height = pil_image.size
+    if "/DecodeParms" in raw:
+        del raw.DecodeParms
+    return True
+
+
+def optimize_pdf(pdf_data: bytes, max_dpi: int = 150, quality: int = 75) -> bytes | None:
+    """
+    Rewrite a PDF for serving: images downsampled to at most `max_dpi` at
+    page size and recompressed as JPEG, streams recompressed, objects packed
+    into object streams, and the file linearized so viewers can show the
+    first page before the rest arrives.
+
+    Returns None when the input is already linearized and the rewrite would
+    not be smaller, so the caller keeps serving the original.
+    """
+    import pikepdf
+
+    with pikepdf.open(io.BytesIO(pdf_data)) as pdf:
+        already_linearized = pdf.is_linearized
+        seen = set()
+        for page in pdf.pages:
+            left, bottom, right, top = (float(value) for value in page.mediabox)
+            max_width = math.ceil(abs(right - left) / 72 * max_dpi)
+            max_height = math.ceil(abs(top - bottom) / 72 * max_dpi)
+            for raw in page.get_images().values():
+                if raw.objgen in seen:
+                    continue
+                seen.add(raw.objgen)
+                try:
+                    _recompress_image(raw, max_width, max_height, quality)
+                except Exception:
+                    # Unsupported encodings stay as they are.
+                    continue
+
+        output = io.BytesIO()
+        pdf.save(
+            output,
+            linearize=True,
+            compress_streams=True,
+            recompress_flate=True,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+        )
+
+    data = output.getvalue()
+    if already_linearized and len(data) >= len(pdf_data):
+        return None
+    return data
+
+
+def render_first_page(
+    pdf_data: bytes, widths: dict[str, int], quality: int = 70
+) -> dict[str, bytes]:
+    """
+    Render the first page once, at the largest requested width, and encode a
+    WebP image per entry of `widths` (variant -> pixel width).
+
+    Pages taller than twice their width are capped at that height, so an
+    odd page size cannot produce a huge bitmap.
+    """
+    import pypdfium2
+    from PIL import Image
+
+    document = pypdfium2.PdfDocument(pdf_data)
+    try:
+        page = document[0]
+        page_width, page_height = page.get_size()
+        largest = max(widths.values())
+        scale = min(largest / page_width, 2 * largest / page_height)
+        image = page.render(scale=scale).to_pil().convert("RGB")
+        page.close()
+    finally:
+        document.close()
+
+    images = {}
+    for variant, width in widths.items():
+        resized = image
+        if width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, format="WEBP", quality=quality, method=4)
+        images[variant] = output.getvalue()
+    return images
@@ -0,0 +1,135 @@
+import difflib
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_professor_name(name: str) -> str:
+    """NFKC-normalize and collapse whitespace, as stored in archives."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", name or "")).strip()
+
+
+def professor_key(name: str) -> str:
+    """Matching key: spellings that differ only in case or spacing share it."""
+    return _WHITESPACE.sub("", normalize_professor_name(name)).casefold()
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.top: list[str] = []
+
+
+class ProfessorTrie:
+    """
+    Prefix index over professor keys.
+
+    Every node keeps the best `top_k` keys below it, so a lookup is a walk
+    down the query's characters with no traversal of the subtree.
+    """
+
+    def __init__(self, ranked_keys: Iterable[str], top_k: int):
+        self.root = _TrieNode()
+        self.keys: list[str] = []
+        for key in ranked_keys:
+            self.keys.append(key)
+            node = self.root
+            if len(node.top) < top_k:
+                node.top.append(key)
+            for char in key:
+                node = node.children.setdefault(char, _TrieNode())
+                if len(node.top) < top_k:
+                    node.top.append(key)
+
+    def prefix(self, key_prefix: str) -> list[str]:
+        node = self.root
+        for char in key_prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top
+
+
+class ProfessorIndex:
+    """
+    Immutable snapshot of professors, ranked by how many archives use them.
+
+    `counts` holds (professor, course_id, archives) rows. Spellings sharing a
+    key are merged and shown as their most common form.
+    """
+
+    def __init__(self, counts: Iterable[tuple[str, int, int]], top_k: int = 10):
+        spellings: dict[str, dict[str, int]] = {}
+        totals: dict[str, int] = {}
+        course_totals: dict[int, dict[str, int]] = {}
+        for professor, course_id, count in counts:
+            key = professor_key(professor)
+            if not key:
+                continue
+            forms = spellings.setdefault(key, {})
+            name = normalize_professor_name(professor)
+            forms[name] = forms.get(name, 0) + count
+            totals[key] = totals.get(key, 0) + count
+            per_course = course_totals.setdefault(course_id, {})
+            per_course[key] = per_course.get(key, 0) + count
+
+        self.names = {
+            key: max(forms, key=lambda form: (forms[form], form))
+            for key, forms in spellings.items()
+        }
+        self.totals = totals
+        self.course_totals = course_totals
+        self.top_k = top_k
+        self.trie = ProfessorTrie(self._ranked(totals), top_k)
+        self.course_tries = {
+            course_id: ProfessorTrie(self._ranked(per_course), top_k)
+            for course_id, per_course in course_totals.items()
+        }
+
+    def _ranked(self, totals: dict[str, int]) -> list[str]:
+        return sorted(totals, key=lambda key: (-totals[key], self.names[key]))
+
+    def canonical_name(self, name: str) -> str:
+        """The established spelling for `name`, or `name` normalized."""
+        return self.names.get(professor_key(name), normalize_professor_name(name))
+
+    def suggest(
+        self, query: str, course_id: Optional[int] = None, limit: int = 10
+    ) -> list[tuple[str, int]]:
+        """
+        Up to `limit` (name, archive count) pairs: prefix matches first,
+        then keys containing the query, then close misspellings.
+        """
+        if course_id is not None:
+            trie = self.course_tries.get(course_id)
+            if trie is None:
+                return []
+            totals = self.course_totals[course_id]
+        else:
+            trie, totals = self.trie, self.totals
+
+        key = professor_key(query)
+        matches = list(trie.prefix(key)[:limit])
+        if key and len(matches) < limit:
+            seen = set(matches)
+            for candidate in trie.keys:
+                if len(matches) >= limit:
+                    break
+                if candidate not in seen and key in candidate:
+                    matches.append(candidate)
+                    seen.add(candidate)
+            if len(matches) < limit:
+                for candidate in difflib.get_close_matches(
+                    key, trie.keys, n=limit, cutoff=0.6
+                ):
+                    if len(matches) >= limit:
+                        break
+                    if candidate not in seen:
+                        matches.append(candidate)
+                        seen.add(candidate)
+
+        return [(self.names[match], totals[match]) for match in matches]
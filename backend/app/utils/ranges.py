@@ -0,0 +1,68 @@
+from typing import NamedTuple, Optional
+
+
+class ByteRange(NamedTuple):
+    start: int
+    end: int  # inclusive, as in Content-Range
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.end}/{size}"
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header is well-formed but selects no byte of the object."""
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[ByteRange]:
+    """
+    The single byte range a Range header asks for, clamped to `size`.
+
+    Returns None when the whole object should be sent: no header, a unit
+    other than bytes, a malformed value or several ranges, which a server
+    may ignore. Raises RangeNotSatisfiable when the range starts past the
+    end of the object.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    first, last = first.strip(), last.strip()
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes.
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return ByteRange(max(size - suffix, 0), size - 1)
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = min(int(last), size - 1) if last else size - 1
+    return ByteRange(start, end)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match value lists `etag` (weak comparison)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (
+        candidate.strip().removeprefix("W/") for candidate in header.split(",")
+    )
+    return etag.removeprefix("W/") in candidates
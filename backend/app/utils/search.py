@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import func, literal_column
+
+# Han, kana and Hangul runs are split into overlapping bigrams, since
+# PostgreSQL's parsers do not segment them into words.
+_CJK_RUN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+)
+_WORD = re.compile(r"[^\W_]+")
+
+# Tokens are prepared here, so PostgreSQL only needs to split on spaces.
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _cjk_bigrams(run: str) -> list[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[index : index + 2] for index in range(len(run) - 1)]
+
+
+def search_tokens(text: str) -> list[str]:
+    """
+    Split text into search tokens: NFKC-normalized, lowercased words, with
+    CJK runs turned into bigrams ("微積分" -> "微積", "積分").
+    """
+    tokens = []
+    for word in _WORD.findall(_normalize(text)):
+        position = 0
+        for match in _CJK_RUN.finditer(word):
+            if match.start() > position:
+                tokens.append(word[position : match.start()])
+            tokens.extend(_cjk_bigrams(match.group()))
+            position = match.end()
+        if position < len(word):
+            tokens.append(word[position:])
+    return tokens
+
+
+def search_document(text: str) -> str:
+    """Space-joined tokens, ready for to_tsvector('simple', ...)."""
+    return " ".join(search_tokens(text))
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Turn user input into a to_tsquery('simple', ...) expression requiring
+    every token. The last token, and lone CJK characters, match as prefixes
+    so results appear while the user is still typing.
+    """
+    tokens = search_tokens(query)
+    if not tokens:
+        return None
+
+    terms = []
+    for index, token in enumerate(tokens):
+        is_last = index == len(tokens) - 1
+        lone_cjk = len(token) == 1 and _CJK_RUN.fullmatch(token)
+        terms.append(f"{token}:*" if is_last or lone_cjk else token)
+    return " & ".join(terms)
+
+
+def weighted_vector(document, weight: str):
+    """setweight(to_tsvector('simple', document), weight) for a prepared document."""
+    return func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, document), literal_column(f"'{weight}'")
+    )
+
+
+def course_search_vector(name: str):
+    """SQL expression for courses.search_vector."""
+    return weighted_vector(search_document(name), "A")
+
+
+def archive_search_vector(name: str, professor: str):
+    """SQL expression for archives.search_vector: name ranks above professor."""
+    return weighted_vector(search_document(name), "A").op("||")(
+        weighted_vector(search_document(professor), "B")
+    )
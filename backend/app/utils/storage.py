@@ -1,22 +1,293 @@
-from minio import Minio
-from datetime import timedelta
+import asyncio
+import functools
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, AsyncIterator, NamedTuple, Optional
+
+import urllib3
+
 from app.core.config import settings
+from app.utils.disk_cache import DiskCache
+
+if TYPE_CHECKING:
+    from minio import Minio
+
+logger = logging.getLogger(__name__)
+
 
-_minio_client = None
+class ObjectNotFound(Exception):
+    pass
 
 
-def get_minio_client() -> Minio:
-    global _minio_client
-    if _minio_client is None:
-        _minio_client = Minio(
-            endpoint=settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ROOT_USER,
-            secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=False,
+class ObjectInfo(NamedTuple):
+    size: int
+    etag: str
+    content_type: Optional[str]
+    last_modified: Optional[datetime]
+
+
+def _build_http_client() -> urllib3.PoolManager:
+    """
+    HTTP pool shared by every storage call. `maxsize` bounds the connections
+    kept open to MinIO; it matches the executor so no worker waits on a
+    connection another one holds.
+    """
+    timeout = settings.MINIO_TIMEOUT_SECONDS
+    return urllib3.PoolManager(
+        maxsize=settings.MINIO_MAX_POOL_CONNECTIONS,
+        block=True,
+        timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        retries=urllib3.Retry(
+            total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
+
+
+def create_minio_client() -> "Minio":
+    # The SDK takes longer to import than the rest of this module.
+    from minio import Minio
+
+    return Minio(
+        endpoint=settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        secure=False,
+        # A fixed region keeps presigning free of a bucket-location lookup.
+        region=settings.MINIO_REGION,
+        http_client=_build_http_client(),
+    )
+
+
+class ObjectStorage:
+    """
+    Async facade over the synchronous MinIO client.
+
+    Blocking calls run on a dedicated, bounded thread pool, so slow storage
+    cannot use up the default executor or stall the event loop. With a
+    `cache`, reads are served from local disk while the object's ETag is
+    unchanged.
+    """
+
+    def __init__(
+        self,
+        client: "Minio",
+        bucket_name: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        cache: Optional[DiskCache] = None,
+    ):
+        self.client = client
+        self.bucket_name = bucket_name or settings.MINIO_BUCKET_NAME
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.MINIO_EXECUTOR_WORKERS,
+            thread_name_prefix="storage",
+        )
+        self._fills: dict[str, asyncio.Task] = {}
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def ensure_bucket(self):
+        if not await self._run(self.client.bucket_exists, self.bucket_name):
+            await self._run(self.client.make_bucket, self.bucket_name)
+
+    async def put(
+        self, object_name: str, data: bytes, content_type: str = "application/pdf"
+    ):
+        await self._run(
+            self.client.put_object,
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            data=io.BytesIO(data),
+            length=len(data),
+            content_type=content_type,
         )
-        if not _minio_client.bucket_exists(settings.MINIO_BUCKET_NAME):
-            _minio_client.make_bucket(settings.MINIO_BUCKET_NAME)
-    return _minio_client
+
+    def _read(self, object_name: str) -> bytes:
+        response = self.client.get_object(
+            bucket_name=self.bucket_name, object_name=object_name
+        )
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def get(self, object_name: str) -> bytes:
+        """The whole object; use `stream` for anything large."""
+        if self.cache is None:
+            return await self._run(self._read, object_name)
+
+        info = await self.stat(object_name)
+        data = await self._run(self.cache.read, object_name, info.etag)
+        if data is None:
+            data = await self._run(self._read, object_name)
+            await self._run(self.cache.put, object_name, info.etag, data)
+        return data
+
+    def _fill_cache(self, object_name: str, info: ObjectInfo):
+        """Copy an object into the cache in the background, once at a time."""
+        if object_name in self._fills or info.size > self.cache.capacity_bytes:
+            return
+
+        async def fill():
+            try:
+                await self.get(object_name)
+            except Exception:
+                logger.exception("Failed to cache %s", object_name)
+            finally:
+                self._fills.pop(object_name, None)
+
+        self._fills[object_name] = asyncio.create_task(fill())
+
+    async def stream(
+        self,
+        object_name: str,
+        offset: int = 0,
+        length: int = 0,
+        chunk_size: Optional[int] = None,
+        info: Optional[ObjectInfo] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the object (or `length` bytes from `offset`; 0 means to the end)
+        in chunks, holding one pooled connection until the iterator closes.
+
+        Given the object's `info`, a cached copy is read from disk instead,
+        and a miss queues the object to be cached for later requests.
+        """
+        chunk_size = chunk_size or settings.STORAGE_STREAM_CHUNK_SIZE
+        if self.cache is not None and info is not None:
+            mapped = await self._run(self.cache.open, object_name, info.etag)
+            if mapped is not None:
+                try:
+                    end = offset + length if length else len(mapped)
+                    for start in range(offset, end, chunk_size):
+                        stop = min(start + chunk_size, end)
+                        yield await self._run(mapped.__getitem__, slice(start, stop))
+                finally:
+                    mapped.close()
+                return
+            self._fill_cache(object_name, info)
+
+        response = await self._run(
+            self.client.get_object,
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            offset=offset,
+            length=length,
+        )
+        try:
+            while True:
+                chunk = await self._run(response.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def stat(self, object_name: str) -> ObjectInfo:
+        """Size and ETag of an object; raises ObjectNotFound if missing."""
+        try:
+            result = await self._run(
+                self.client.stat_object,
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+            )
+        except Exception as exc:
+            # Only imported on failure, when a real client has loaded the SDK.
+            from minio.error import S3Error
+
+            if isinstance(exc, S3Error) and exc.code in ("NoSuchKey", "NoSuchObject"):
+                raise ObjectNotFound(object_name) from exc
+            raise
+        return ObjectInfo(
+            size=result.size,
+            etag=result.etag,
+            content_type=result.content_type,
+            last_modified=result.last_modified,
+        )
+
+    async def delete(self, object_name: str):
+        await self._run(
+            self.client.remove_object,
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+        )
+
+    def presign_get(
+        self, object_name: str, expires: timedelta = timedelta(hours=1)
+    ) -> str:
+        """
+        Presigned GET URL on the external endpoint. Signing is local
+        computation (the region is configured), so this does not block.
+        """
+        presigned_url = self.client.presigned_get_object(
+            bucket_name=self.bucket_name,
+            object_name=object_name,
+            expires=expires,
+        )
+        return presigned_url.replace(
+            f"http://{settings.MINIO_ENDPOINT}",
+            f"{settings.EXTERNAL_ENDPOINT}",
+            1,
+        )
+
+    def close(self):
+        for task in self._fills.values():
+            task.cancel()
+        if self.cache is not None:
+            logger.info("Storage cache stats: %s", self.cache.stats())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        http_client = getattr(self.client, "_http", None)
+        if http_client is not None:
+            http_client.clear()
+
+
+def _build_cache() -> Optional[DiskCache]:
+    if not settings.STORAGE_CACHE_DIR or settings.STORAGE_CACHE_MAX_BYTES <= 0:
+        return None
+    return DiskCache(settings.STORAGE_CACHE_DIR, settings.STORAGE_CACHE_MAX_BYTES)
+
+
+def build_storage() -> ObjectStorage:
+    return ObjectStorage(create_minio_client(), cache=_build_cache())
+
+
+def get_storage() -> ObjectStorage:
+    """The process-wide storage, owned by app.core.resources."""
+    from app.core.resources import resources
+
+    return resources.storage
+
+
+def derived_object_name(
+    object_name: str, tag: str, extension: Optional[str] = None
+) -> str:
+    """
+    Name of an artifact derived from an object, stored next to the original
+    (e.g. archives/1/abc.pdf -> archives/1/abc.compact.pdf). `extension`
+    replaces the original one for artifacts of another type.
+    """
+    stem, dot, original_extension = object_name.rpartition(".")
+    if not dot or "/" in original_extension:
+        stem, original_extension = object_name, ""
+    extension = extension or original_extension
+    return f"{stem}.{tag}.{extension}" if extension else f"{stem}.{tag}"
+
+
+# First-page images rendered per archive: a list thumbnail and a larger page.
+ARCHIVE_PREVIEW_VARIANTS = ("thumb", "page")
+
+
+def preview_object_name(object_name: str, variant: str) -> str:
+    """Where a preview image of `object_name` is stored (WebP)."""
+    return derived_object_name(object_name, f"preview-{variant}", "webp")
 
 
 def presigned_get_url(
@@ -25,17 +296,4 @@ def presigned_get_url(
     """
     Get a presigned GET URL for frontend to download/preview PDF files.
     """
-    client = get_minio_client()
-    presigned_url = client.presigned_get_object(
-        bucket_name=settings.MINIO_BUCKET_NAME,
-        object_name=object_name,
-        expires=expires
-    )
-
-    presigned_url = presigned_url.replace(
-        f"http://{settings.MINIO_ENDPOINT}",
-        f"{settings.EXTERNAL_ENDPOINT}",
-        1
-    )
-
-    return presigned_url
+    return get_storage().presign_get(object_name, expires=expires)
@@ -0,0 +1,103 @@
+import struct
+from datetime import datetime
+from typing import NamedTuple, Sequence
+
+# Stored (uncompressed) entries whose CRC follows the data in a descriptor,
+# so the archive can be streamed while its exact layout is known upfront.
+_FLAGS = 0x0808  # data descriptor + UTF-8 names
+_VERSION = 20
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_DESCRIPTOR = struct.Struct("<IIII")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+
+# Without ZIP64 records, offsets and sizes must fit in 32 bits.
+ZIP_MAX_BYTES = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    size: int
+
+
+def _dos_datetime(value: datetime) -> tuple[int, int]:
+    year = min(max(value.year, 1980), 2107)
+    date = ((year - 1980) << 9) | (value.month << 5) | value.day
+    time = (value.hour << 11) | (value.minute << 5) | (value.second // 2)
+    return time, date
+
+
+class ZipLayout:
+    """
+    Byte layout of a stored zip archive built from entry names and sizes.
+
+    Every offset is computed before any data is read, so the total size is
+    known for Content-Length and any byte range can be produced on its own.
+    Only CRCs depend on the data: they appear in each entry's descriptor and
+    in the central directory.
+    """
+
+    def __init__(self, entries: Sequence[ZipEntry], modified: datetime):
+        if len(entries) > ZIP_MAX_ENTRIES:
+            raise ValueError("Too many zip entries")
+        self.entries = list(entries)
+        self.names = [entry.name.encode("utf-8") for entry in self.entries]
+        self.time, self.date = _dos_datetime(modified)
+
+        self.header_offsets = []
+        self.data_offsets = []
+        offset = 0
+        for name, entry in zip(self.names, self.entries):
+            self.header_offsets.append(offset)
+            offset += _LOCAL_HEADER.size + len(name)
+            self.data_offsets.append(offset)
+            offset += entry.size + _DESCRIPTOR.size
+        self.central_offset = offset
+        self.central_size = sum(_CENTRAL_HEADER.size + len(name) for name in self.names)
+        self.total_size = self.central_offset + self.central_size + _END_RECORD.size
+        if self.total_size > ZIP_MAX_BYTES:
+            raise ValueError("Zip archive too large")
+
+    def descriptor_offset(self, index: int) -> int:
+        return self.data_offsets[index] + self.entries[index].size
+
+    def entry_end(self, index: int) -> int:
+        """Offset just past the entry's descriptor."""
+        return self.descriptor_offset(index) + _DESCRIPTOR.size
+
+    def local_header(self, index: int) -> bytes:
+        name = self.names[index]
+        return (
+            _LOCAL_HEADER.pack(
+                0x04034B50, _VERSION, _FLAGS, 0, self.time, self.date,
+                0, 0, 0, len(name), 0,
+            )
+            + name
+        )
+
+    def descriptor(self, index: int, crc: int) -> bytes:
+        size = self.entries[index].size
+        return _DESCRIPTOR.pack(0x08074B50, crc, size, size)
+
+    def central_directory(self, crcs: Sequence[int]) -> bytes:
+        """Central directory and end record; needs the CRC of every entry."""
+        records = []
+        for index, name in enumerate(self.names):
+            size = self.entries[index].size
+            records.append(
+                _CENTRAL_HEADER.pack(
+                    0x02014B50, (3 << 8) | _VERSION, _VERSION, _FLAGS, 0,
+                    self.time, self.date, crcs[index], size, size, len(name),
+                    0, 0, 0, 0, 0o100644 << 16, self.header_offsets[index],
+                )
+                + name
+            )
+        count = len(self.entries)
+        records.append(
+            _END_RECORD.pack(
+                0x06054B50, 0, 0, count, count,
+                self.central_size, self.central_offset, 0,
+            )
+        )
+        return b"".join(records)
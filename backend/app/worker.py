@@ -1,21 +1,39 @@
+import asyncio
+import functools
 import io
 import logging
-from datetime import datetime
+import secrets
+from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional
 
-from arq import create_pool
+from arq import cron
 from arq.connections import RedisSettings
-from google import genai
-from google.genai.types import UploadFileConfig
-from sqlmodel import select
+from arq.constants import default_queue_name
+from sqlmodel import select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.db.init_db import engine
-from app.models.models import Archive, Course
-from app.utils.storage import get_minio_client
+from app.core.resources import resources
+from app.db.session import engine
+from app.models.models import Archive, Course, User
+from app.services.counters import reconcile_counters
+from app.services.gemini import (
+    CircuitOpenError,
+    GeminiErrorKind,
+    InvalidApiKeyError,
+    call_with_retry,
+    classify_gemini_error,
+    create_gemini_client,
+    validate_api_key,
+)
+from app.utils.pdf import compact_pdf, optimize_pdf, render_first_page
+from app.utils.storage import (
+    derived_object_name,
+    get_storage,
+    preview_object_name,
+)
 
 # logging.basicConfig(level=logging.INFO)
 # logger = logging.getLogger(__name__)
@@ -27,16 +45,324 @@ PROMPT_TEMPLATE_PATH = (
 )
 
 
+TASK_EVENT_STREAM_TTL = 86400
+
+# How long a submitted API key waits in Redis for its validation job. The
+# job args only carry a reference, since ARQ keeps them in arq:job:* and
+# arq:result:* where a plaintext key would outlive the request.
+PENDING_API_KEY_TTL = 600
+
+# The interactive queue keeps ARQ's default name so existing deployments and
+# already-enqueued jobs are picked up without changes.
+INTERACTIVE_QUEUE_NAME = default_queue_name
+BATCH_QUEUE_NAME = "arq:queue:batch"
+QUEUE_WAIT_SAMPLE_SIZE = 500
+
+DISCLAIMER_TEMPLATE = """⚠️ 注意事項 / NOTICE ⚠️
+此試題由 AI 自動生成，僅供參考練習使用。
+答案可能有誤，請務必自行確認正確性。
+This exam is AI-generated for reference and practice only.
+Answers may contain errors. Please verify the correctness yourself.
+
+{separator}
+
+"""
+
+
+def task_event_stream_key(task_id: str) -> str:
+    return f"ai_exam:task_events:{task_id}"
+
+
+async def publish_task_event(
+    redis,
+    task_id: str,
+    status: str,
+    *,
+    error: str | None = None,
+    chunk: str | None = None,
+):
+    """Append a status event to the task's stream read by the WebSocket."""
+    fields = {"status": status, "ts": datetime.utcnow().isoformat()}
+    if error:
+        fields["error"] = error
+    if chunk is not None:
+        fields["chunk"] = chunk
+    stream_key = task_event_stream_key(task_id)
+    await redis.xadd(stream_key, fields)
+    await redis.expire(stream_key, TASK_EVENT_STREAM_TTL)
+
+
+def _pending_api_key_key(key_ref: str) -> str:
+    return f"ai_exam:pending_api_key:{key_ref}"
+
+
+async def stash_pending_api_key(redis, api_key: str) -> str:
+    """Hold an API key for a validation job; returns the reference to pass."""
+    key_ref = secrets.token_urlsafe(16)
+    await redis.set(
+        _pending_api_key_key(key_ref), api_key, ex=PENDING_API_KEY_TTL
+    )
+    return key_ref
+
+
+async def take_pending_api_key(redis, key_ref: str) -> Optional[str]:
+    """Read and delete a held API key; None once it was taken or expired."""
+    value = await redis.getdel(_pending_api_key_key(key_ref))
+    if value is None:
+        return None
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+# Post-upload jobs run once per archive. Fixed job ids keep the upload and
+# the preview backfill from queueing the same work twice.
+ARCHIVE_JOB_ID_PREFIXES = {
+    "optimize_archive_task": "archive-optimize",
+    "generate_archive_previews_task": "archive-previews",
+    "preprocess_archive_task": "archive-preprocess",
+}
+
+
+def archive_job_id(function: str, archive_id: int) -> str:
+    return f"{ARCHIVE_JOB_ID_PREFIXES[function]}:{archive_id}"
+
+
+def _usage_key(user_id: int) -> str:
+    return f"ai_exam:usage:{user_id}"
+
+
+def _queue_wait_key(queue_name: str) -> str:
+    return f"ai_exam:queue_wait:{queue_name}"
+
+
+def _timestamp_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+async def plan_fair_enqueue(redis, user_id: int) -> tuple[str, datetime]:
+    """
+    Pick the queue and queue score for a user's next job.
+
+    Every submission inside the fair-share window counts against the user.
+    Users over the heavy-user threshold are routed to the batch queue so they
+    cannot occupy interactive slots. Within a queue, lighter users are scored
+    up to PRIORITY_HEADROOM ahead of heavier ones. The score is never in the
+    future, so no job is ever held back while a worker is idle.
+    """
+    usage_key = _usage_key(user_id)
+    usage = await redis.incr(usage_key)
+    if usage == 1:
+        await redis.expire(usage_key, settings.AI_EXAM_FAIR_SHARE_WINDOW_SECONDS)
+
+    threshold = max(1, settings.AI_EXAM_HEAVY_USER_THRESHOLD)
+    queue_name = INTERACTIVE_QUEUE_NAME if usage <= threshold else BATCH_QUEUE_NAME
+
+    headroom_ms = settings.AI_EXAM_PRIORITY_HEADROOM_SECONDS * 1000
+    penalty_ms = min(headroom_ms, (usage - 1) * headroom_ms // threshold)
+    score_ms = _timestamp_ms() - headroom_ms + penalty_ms
+
+    return queue_name, datetime.fromtimestamp(score_ms / 1000, tz=timezone.utc)
+
+
+def _percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def get_queue_stats(redis) -> List[dict]:
+    """
+    Depth and recent wait times for every AI exam queue.
+
+    Wait times are measured from enqueue to job start by the worker, so they
+    are not skewed by the fair-share score offset.
+    """
+    now_ms = _timestamp_ms()
+    stats = []
+    for queue_name, max_jobs in (
+        (INTERACTIVE_QUEUE_NAME, settings.AI_EXAM_INTERACTIVE_MAX_JOBS),
+        (BATCH_QUEUE_NAME, settings.AI_EXAM_BATCH_MAX_JOBS),
+    ):
+        depth = await redis.zcard(queue_name)
+        ready = await redis.zcount(queue_name, "-inf", now_ms)
+        samples = await redis.lrange(_queue_wait_key(queue_name), 0, -1)
+        waits = sorted(int(sample) for sample in samples)
+        stats.append(
+            {
+                "queue": queue_name,
+                "max_jobs": max_jobs,
+                "depth": depth,
+                "ready": ready,
+                "wait_ms_p50": _percentile(waits, 0.5),
+                "wait_ms_p95": _percentile(waits, 0.95),
+                "wait_samples": len(waits),
+            }
+        )
+    return stats
+
+
+async def _record_queue_wait(ctx: dict):
+    redis = ctx.get("redis")
+    enqueue_time = ctx.get("enqueue_time")
+    queue_name = ctx.get("queue_name")
+    if not redis or not enqueue_time or not queue_name:
+        return
+    try:
+        wait_ms = max(0, _timestamp_ms() - int(enqueue_time.timestamp() * 1000))
+        wait_key = _queue_wait_key(queue_name)
+        await redis.lpush(wait_key, wait_ms)
+        await redis.ltrim(wait_key, 0, QUEUE_WAIT_SAMPLE_SIZE - 1)
+    except Exception:
+        logger.exception("Failed to record queue wait (queue=%s)", queue_name)
+
+
+def _session() -> AsyncSession:
+    # Helpers such as store_compact_archive commit in the caller's session;
+    # expiring on commit would make the caller's next attribute read a lazy
+    # load, which fails outside the greenlet that async sessions need.
+    return AsyncSession(engine, expire_on_commit=False)
+
+
 @lru_cache(maxsize=1)
 def load_default_prompt_template() -> str:
     return PROMPT_TEMPLATE_PATH.read_text(encoding="utf-8")
 
 
+async def store_compact_archive(db, storage, archive, pdf_data: bytes):
+    """
+    Build the compact copy of an archive from `pdf_data`, its served copy,
+    store it next to the original and record it on the archive. Returns the
+    compact bytes, or None if the served copy is already as small as it
+    gets; the served copy is then recorded as the compact one, so the
+    archive is not compacted again.
+    """
+    compacted = await asyncio.to_thread(compact_pdf, pdf_data)
+    if compacted is None:
+        compact_name = served_object_name(archive)
+    else:
+        compact_name = derived_object_name(archive.object_name, "compact")
+        await storage.put(compact_name, compacted["data"])
+
+    await db.execute(
+        update(Archive)
+        .where(Archive.id == archive.id)
+        .values(compact_object_name=compact_name)
+    )
+    await db.commit()
+    archive.compact_object_name = compact_name
+    return compacted["data"] if compacted else None
+
+
+def served_object_name(archive) -> str:
+    """The copy of an archive to read: the optimized one when it exists."""
+    return archive.optimized_object_name or archive.object_name
+
+
+async def store_optimized_archive(db, storage, archive, pdf_data: bytes):
+    """
+    Build the linearized, recompressed copy of an archive, store it next to
+    the original and record it on the archive. The original is kept.
+    Returns the optimized bytes, or None if the original is kept for serving.
+    """
+    optimized = await asyncio.to_thread(
+        optimize_pdf,
+        pdf_data,
+        settings.ARCHIVE_OPTIMIZE_MAX_DPI,
+        settings.ARCHIVE_OPTIMIZE_JPEG_QUALITY,
+    )
+    if optimized is None:
+        return None
+
+    optimized_name = derived_object_name(archive.object_name, "optimized")
+    await storage.put(optimized_name, optimized)
+    await db.execute(
+        update(Archive)
+        .where(Archive.id == archive.id)
+        .values(optimized_object_name=optimized_name)
+    )
+    await db.commit()
+    archive.optimized_object_name = optimized_name
+    return optimized
+
+
+def _preview_widths() -> dict[str, int]:
+    return {
+        "thumb": settings.ARCHIVE_PREVIEW_THUMB_WIDTH,
+        "page": settings.ARCHIVE_PREVIEW_PAGE_WIDTH,
+    }
+
+
+async def store_archive_previews(db, storage, archive, pdf_data: bytes) -> dict:
+    """
+    Render the first page of an archive, store one WebP per preview variant
+    next to the original and mark the archive as having previews. Returns
+    the stored size of each variant. An archive whose page cannot be
+    rendered is marked with previews_failed_at instead, and the error raised.
+    """
+    try:
+        images = await asyncio.to_thread(
+            render_first_page,
+            pdf_data,
+            _preview_widths(),
+            settings.ARCHIVE_PREVIEW_QUALITY,
+        )
+    except Exception:
+        failed_at = datetime.now(timezone.utc)
+        await db.execute(
+            update(Archive)
+            .where(Archive.id == archive.id)
+            .values(previews_failed_at=failed_at)
+        )
+        await db.commit()
+        archive.previews_failed_at = failed_at
+        raise
+    for variant, data in images.items():
+        await storage.put(
+            preview_object_name(archive.object_name, variant),
+            data,
+            content_type="image/webp",
+        )
+
+    generated_at = datetime.now(timezone.utc)
+    await db.execute(
+        update(Archive)
+        .where(Archive.id == archive.id)
+        .values(previews_generated_at=generated_at)
+    )
+    await db.commit()
+    archive.previews_generated_at = generated_at
+    return {variant: len(data) for variant, data in images.items()}
+
+
+async def _load_exam_input(db, storage, archive) -> bytes:
+    if archive.compact_object_name:
+        try:
+            return await storage.get(archive.compact_object_name)
+        except Exception:
+            logger.exception(
+                "Compact copy unavailable, using original (archive_id=%s)",
+                archive.id,
+            )
+
+    pdf_data = await storage.get(served_object_name(archive))
+    if settings.AI_EXAM_PREPROCESS_PDFS:
+        try:
+            compact_data = await store_compact_archive(
+                db, storage, archive, pdf_data
+            )
+            if compact_data is not None:
+                return compact_data
+        except Exception:
+            logger.exception("Failed to preprocess archive %s", archive.id)
+    return pdf_data
+
+
 async def generate_exam_content(
     archive_ids: List[int],
     user_id: int,
     prompt: Optional[str] = None,
     temperature: float = 0.7,
+    on_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> dict:
     """
     Core AI exam generation logic
@@ -45,6 +371,7 @@ async def generate_exam_content(
         archive_ids: List of archive IDs
         prompt: Custom prompt (optional)
         temperature: Generation temperature
+        on_chunk: Awaited with each piece of generated text as it streams in
 
     Returns:
         dict: Generation result with success status, content, and archives used
@@ -54,10 +381,8 @@ async def generate_exam_content(
     #     f"user_id: {user_id}"
     # )
 
-    async with AsyncSession(engine) as db:
+    async with _session() as db:
         # Get user's API key
-        from app.models.models import User
-
         user_query = select(User).where(User.id == user_id, User.deleted_at.is_(None))
         user_result = await db.execute(user_query)
         user = user_result.scalar_one_or_none()
@@ -85,8 +410,11 @@ async def generate_exam_content(
         if not archives_with_courses:
             raise ValueError("Archives not found")
 
-        client = genai.Client(api_key=api_key)
-        minio_client = get_minio_client()
+        # Imported here like the rest of the SDK, see create_gemini_client.
+        from google.genai.types import UploadFileConfig
+
+        client = create_gemini_client(api_key)
+        storage = get_storage()
 
         uploaded_files = []
         archives_info = []
@@ -97,17 +425,17 @@ async def generate_exam_content(
             #     len(archives_with_courses),
             # )
             for idx, (archive, course) in enumerate(archives_with_courses, 1):
-                response = minio_client.get_object(
-                    bucket_name=settings.MINIO_BUCKET_NAME,
-                    object_name=archive.object_name,
-                )
-                pdf_data = response.read()
-                response.close()
-                response.release_conn()
+                pdf_data = await _load_exam_input(db, storage, archive)
 
                 upload_config = UploadFileConfig(mime_type="application/pdf")
-                uploaded_file = client.files.upload(
-                    file=io.BytesIO(pdf_data), config=upload_config
+
+                async def upload(pdf_data=pdf_data, upload_config=upload_config):
+                    return await upload_to_gemini(client, pdf_data, upload_config)
+
+                uploaded_file = await call_with_retry(
+                    upload,
+                    api_key=api_key,
+                    timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS,
                 )
                 uploaded_files.append(uploaded_file)
 
@@ -146,28 +474,44 @@ async def generate_exam_content(
             #     "[AI Exam] Calling Gemini API (temperature=%s)",
             #     temperature,
             # )
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=content,
-                config={"temperature": temperature},
+            # The final content is assembled from exactly the chunks that were
+            # streamed, so clients that render partial output end up with the
+            # same text as the stored result.
+            chunks: List[str] = []
+
+            async def emit(text: str):
+                chunks.append(text)
+                if on_chunk:
+                    await on_chunk(text)
+
+            await emit(DISCLAIMER_TEMPLATE.format(separator="=" * 80))
+            streamed_from_model = False
+
+            async def generate():
+                nonlocal streamed_from_model
+                stream = await client.aio.models.generate_content_stream(
+                    model=settings.GEMINI_MODEL,
+                    contents=content,
+                    config={"temperature": temperature},
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        streamed_from_model = True
+                        await emit(chunk.text)
+
+            # Retries reuse the uploaded files. Once model output has been
+            # streamed to the client a retry would duplicate it, so stop there.
+            await call_with_retry(
+                generate,
+                api_key=api_key,
+                can_retry=lambda: not streamed_from_model,
             )
 
             # logger.info(f"[AI Exam] Generation completed successfully")
 
-            for uploaded_file in uploaded_files:
-                client.files.delete(name=uploaded_file.name)
-
-            disclaimer = """⚠️ 注意事項 / NOTICE ⚠️
-此試題由 AI 自動生成，僅供參考練習使用。
-答案可能有誤，請務必自行確認正確性。
-This exam is AI-generated for reference and practice only.
-Answers may contain errors. Please verify the correctness yourself.
-
-{separator}
-
-"""
+            await _delete_gemini_files(client, uploaded_files)
 
-            generated_content = disclaimer.format(separator="=" * 80) + response.text
+            generated_content = "".join(chunks)
 
             return {
                 "success": True,
@@ -177,14 +521,71 @@ Answers may contain errors. Please verify the correctness yourself.
 
         except Exception:
             # logger.error(f"[AI Exam] Error: {type(e).__name__}: {str(e)}")
-            for uploaded_file in uploaded_files:
-                try:
-                    client.files.delete(name=uploaded_file.name)
-                except Exception:
-                    pass
+            await _delete_gemini_files(client, uploaded_files)
             raise
 
 
+def _delete_gemini_file(client, name: str):
+    try:
+        client.files.delete(name=name)
+    except Exception:
+        logger.exception("Failed to delete Gemini file %s", name)
+
+
+async def _delete_gemini_files(client, uploaded_files):
+    # The SDK call blocks; keep it off the loop that streams other jobs.
+    loop = asyncio.get_running_loop()
+    for uploaded_file in uploaded_files:
+        await loop.run_in_executor(
+            None, _delete_gemini_file, client, uploaded_file.name
+        )
+
+
+async def upload_to_gemini(client, pdf_data: bytes, config):
+    """
+    Upload a PDF from a worker thread.
+
+    The thread cannot be stopped, so when the caller stops waiting (a timeout
+    before a retry, or cancellation) the upload runs on and the file it
+    creates is deleted once it lands instead of being left orphaned.
+    """
+    loop = asyncio.get_running_loop()
+    upload = loop.run_in_executor(
+        None,
+        functools.partial(
+            client.files.upload, file=io.BytesIO(pdf_data), config=config
+        ),
+    )
+
+    def discard_late_upload(future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        name = future.result().name
+        logger.warning("Deleting Gemini file %s uploaded after a timeout", name)
+        loop.run_in_executor(None, _delete_gemini_file, client, name)
+
+    try:
+        return await asyncio.shield(upload)
+    except asyncio.CancelledError:
+        upload.add_done_callback(discard_late_upload)
+        raise
+
+
+def describe_task_error(exc: Exception) -> str:
+    if isinstance(exc, CircuitOpenError):
+        return str(exc)
+    if isinstance(exc, InvalidApiKeyError):
+        return f"Invalid Gemini API key: {exc}"
+    kind = classify_gemini_error(exc)
+    if kind == GeminiErrorKind.INVALID_KEY:
+        return f"Invalid Gemini API key: {exc}"
+    if kind == GeminiErrorKind.RATE_LIMITED:
+        return f"Gemini API rate limit exceeded, please try again later: {exc}"
+    if kind in (GeminiErrorKind.SERVER_ERROR, GeminiErrorKind.TIMEOUT):
+        return f"Gemini API is unavailable, please try again later: {exc}"
+    return str(exc)
+
+
 async def generate_ai_exam_task(ctx, task_data: dict):
     """
     ARQ worker task to generate exams with AI.
@@ -213,20 +614,25 @@ async def generate_ai_exam_task(ctx, task_data: dict):
         if isinstance(task_id, bytes):
             task_id = task_id.decode("utf-8", errors="ignore")
 
-    async def publish_event(status: str, *, error: str | None = None):
+    async def publish_event(
+        status: str, *, error: str | None = None, chunk: str | None = None
+    ):
         if not redis or not task_id:
             return
         try:
-            fields = {"status": status, "ts": datetime.utcnow().isoformat()}
-            if error:
-                fields["error"] = error
-            stream_key = f"ai_exam:task_events:{task_id}"
-            await redis.xadd(stream_key, fields)
-            await redis.expire(stream_key, 86400)
+            await publish_task_event(
+                redis, task_id, status, error=error, chunk=chunk
+            )
         except Exception:
             # Event streaming is best-effort; do not fail the job if Redis Streams is unavailable.
             logger.exception("Failed to publish ai_exam event (task_id=%s)", task_id)
 
+    async def publish_chunk(text: str):
+        await publish_event("in_progress", chunk=text)
+
+    if ctx is not None:
+        await _record_queue_wait(ctx)
+
     try:
         await publish_event("in_progress")
         result = await generate_exam_content(
@@ -234,6 +640,7 @@ async def generate_ai_exam_task(ctx, task_data: dict):
             user_id=task_data["user_id"],
             prompt=task_data.get("prompt"),
             temperature=task_data.get("temperature", 0.7),
+            on_chunk=publish_chunk,
         )
 
         # logger.info(f"[Worker] Task completed successfully")
@@ -241,22 +648,225 @@ async def generate_ai_exam_task(ctx, task_data: dict):
         return result
 
     except Exception as e:
-        await publish_event("failed", error=str(e))
+        await publish_event("failed", error=describe_task_error(e))
         # logger.error(f"[Worker] Task failed: {str(e)}")
         raise
 
 
+async def _on_interactive_startup(ctx):
+    ctx["queue_name"] = INTERACTIVE_QUEUE_NAME
+    # Jobs publish through ARQ's own connection, in ctx["redis"].
+    await resources.start(arq_pool=False)
+
+
+async def _on_batch_startup(ctx):
+    ctx["queue_name"] = BATCH_QUEUE_NAME
+    await resources.start(arq_pool=False)
+
+
+async def _on_shutdown(ctx):
+    await resources.close()
+
+
+async def preprocess_archive_task(ctx, archive_id: int):
+    """
+    ARQ worker task that stores the compact copy of a freshly uploaded archive.
+    """
+    async with _session() as db:
+        result = await db.execute(
+            select(Archive).where(Archive.id == archive_id, Archive.deleted_at.is_(None))
+        )
+        archive = result.scalar_one_or_none()
+        if not archive or archive.compact_object_name:
+            return None
+
+        storage = get_storage()
+        pdf_data = await storage.get(served_object_name(archive))
+        compact_data = await store_compact_archive(db, storage, archive, pdf_data)
+
+        return {
+            "archive_id": archive_id,
+            "compact_object_name": archive.compact_object_name,
+            "original_bytes": len(pdf_data),
+            "compact_bytes": len(compact_data) if compact_data else len(pdf_data),
+        }
+
+
+async def optimize_archive_task(ctx, archive_id: int):
+    """
+    ARQ worker task that stores the optimized copy of a freshly uploaded archive.
+    """
+    async with _session() as db:
+        result = await db.execute(
+            select(Archive).where(Archive.id == archive_id, Archive.deleted_at.is_(None))
+        )
+        archive = result.scalar_one_or_none()
+        if not archive or archive.optimized_object_name:
+            return None
+
+        storage = get_storage()
+        pdf_data = await storage.get(archive.object_name)
+        optimized = await store_optimized_archive(db, storage, archive, pdf_data)
+
+        return {
+            "archive_id": archive_id,
+            "optimized_object_name": archive.optimized_object_name,
+            "original_bytes": len(pdf_data),
+            "optimized_bytes": len(optimized) if optimized else len(pdf_data),
+        }
+
+
+async def generate_archive_previews_task(ctx, archive_id: int):
+    """
+    ARQ worker task that renders the preview images of an archive.
+    """
+    async with _session() as db:
+        result = await db.execute(
+            select(Archive).where(Archive.id == archive_id, Archive.deleted_at.is_(None))
+        )
+        archive = result.scalar_one_or_none()
+        if not archive or archive.previews_generated_at:
+            return None
+        if archive.previews_failed_at:
+            return None
+
+        storage = get_storage()
+        pdf_data = await storage.get(archive.object_name)
+        sizes = await store_archive_previews(db, storage, archive, pdf_data)
+
+        return {"archive_id": archive_id, "bytes": sizes}
+
+
+async def backfill_archive_previews_task(ctx):
+    """
+    ARQ cron task that queues preview rendering for archives without
+    previews, newest first, ARCHIVE_PREVIEW_BACKFILL_BATCH at a time.
+    Archives whose rendering failed are left out, so they cannot hold up
+    the batch.
+
+    Job ids are per archive, so a run overlapping a still-queued job does
+    not render the same archive twice.
+    """
+    if not settings.ARCHIVE_PREVIEWS_ENABLED:
+        return 0
+
+    async with _session() as db:
+        result = await db.execute(
+            select(Archive.id)
+            .where(
+                Archive.previews_generated_at.is_(None),
+                Archive.previews_failed_at.is_(None),
+                Archive.deleted_at.is_(None),
+            )
+            .order_by(Archive.id.desc())
+            .limit(settings.ARCHIVE_PREVIEW_BACKFILL_BATCH)
+        )
+        archive_ids = result.scalars().all()
+
+    redis = ctx["redis"]
+    for archive_id in archive_ids:
+        await redis.enqueue_job(
+            "generate_archive_previews_task",
+            archive_id,
+            _job_id=archive_job_id("generate_archive_previews_task", archive_id),
+            _queue_name=BATCH_QUEUE_NAME,
+        )
+    return len(archive_ids)
+
+
+async def validate_api_key_task(ctx, task_data: dict):
+    """
+    ARQ worker task that validates a Gemini API key and saves it on success.
+
+    Progress is reported through the task event stream, like exam generation.
+
+    Args:
+        ctx: ARQ context
+        task_data: requires user_id, key_ref (see stash_pending_api_key)
+    """
+    user_id = task_data["user_id"]
+    redis = ctx.get("redis")
+    task_id = ctx.get("job_id")
+
+    async def publish_event(status: str, *, error: str | None = None):
+        if not redis or not task_id:
+            return
+        try:
+            await publish_task_event(redis, task_id, status, error=error)
+        except Exception:
+            logger.exception("Failed to publish api key event (task_id=%s)", task_id)
+
+    try:
+        api_key = await take_pending_api_key(redis, task_data["key_ref"])
+        if api_key is None:
+            raise ValueError(
+                "The API key expired before it was validated, please submit it again"
+            )
+        await publish_event("in_progress")
+        await validate_api_key(api_key)
+
+        async with _session() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.deleted_at.is_(None))
+                .values(gemini_api_key=api_key)
+            )
+            await db.commit()
+    except Exception as e:
+        await publish_event("failed", error=describe_task_error(e))
+        raise
+
+    await publish_event("complete")
+    return {"has_api_key": True, "api_key_masked": f"****{api_key[-4:]}"}
+
+
+async def reconcile_counters_task(ctx):
+    """ARQ cron task that corrects drift in the statistics counters."""
+    async with _session() as db:
+        drift = await reconcile_counters(db)
+
+    if any(drift.values()):
+        logger.warning("Corrected system counter drift: %s", drift)
+    return drift
+
+
 class WorkerSettings:
-    """ARQ worker settings"""
+    """ARQ worker settings (interactive queue)"""
 
     redis_settings = RedisSettings.from_dsn(settings.REDIS_URL)
-    functions = [generate_ai_exam_task]
-
-    max_jobs = 5  # Max concurrent jobs
+    functions = [
+        generate_ai_exam_task,
+        preprocess_archive_task,
+        optimize_archive_task,
+        generate_archive_previews_task,
+        backfill_archive_previews_task,
+        validate_api_key_task,
+    ]
+    queue_name = INTERACTIVE_QUEUE_NAME
+    on_startup = _on_interactive_startup
+    on_shutdown = _on_shutdown
+    cron_jobs = [cron(reconcile_counters_task, minute=17)]
+
+    max_jobs = settings.AI_EXAM_INTERACTIVE_MAX_JOBS  # Max concurrent jobs
     job_timeout = 600  # Job timeout in seconds
     keep_result = 86400  # Keep results for 24 hours
 
 
+class BatchWorkerSettings(WorkerSettings):
+    """ARQ worker settings for heavy users (run with `arq app.worker.BatchWorkerSettings`)"""
+
+    queue_name = BATCH_QUEUE_NAME
+    on_startup = _on_batch_startup
+    cron_jobs = [cron(backfill_archive_previews_task, minute=47)]
+
+    max_jobs = settings.AI_EXAM_BATCH_MAX_JOBS
+
+
 async def get_redis_pool():
-    """Get Redis connection pool"""
-    return await create_pool(WorkerSettings.redis_settings)
+    """The process's shared ARQ pool, for enqueuing and inspecting jobs."""
+    return await resources.arq_pool()
+
+
+def get_task_event_redis():
+    """Client for blocking reads of task event streams, apart from the pool."""
+    return resources.task_events
@@ -6,15 +6,19 @@ from types import SimpleNamespace
 
 import pytest
 from fastapi.testclient import TestClient
+from google.genai import errors as genai_errors
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.dml import Update
 from starlette.websockets import WebSocketDisconnect
 
 from app.api.services.ai_exam import JobStatus
+from app.core.config import settings
 from app.main import app
 from app.models.models import User, UserRoles
+from app.services import gemini
 from app.utils.auth import get_current_user
+from app.worker import BATCH_QUEUE_NAME, INTERACTIVE_QUEUE_NAME, PENDING_API_KEY_TTL
 
 
 class FakeRedis:
@@ -22,6 +26,10 @@ class FakeRedis:
         self.metadata: dict[bytes, bytes] = {}
         self.expirations: dict[bytes, int | None] = {}
         self.enqueue_calls: list[tuple[str, dict]] = []
+        self.enqueue_options: list[dict] = []
+        self.counters: dict[str, int] = {}
+        self.queues: dict[str, dict[str, float]] = {}
+        self.lists: dict[str, list] = {}
         self.job_statuses: dict[str, JobStatus | None] = {}
         self.results: dict[str, dict] = {}
         self.streams: dict[str, list[tuple[str, dict[bytes, bytes]]]] = {}
@@ -54,12 +62,34 @@ class FakeRedis:
         self.expirations[key_bytes] = ex
         return True
 
-    async def enqueue_job(self, name: str, task_data: dict):
+    async def enqueue_job(self, name: str, task_data: dict, **options):
         job_id = f"job-{len(self.enqueue_calls) + 1}"
         self.enqueue_calls.append((name, task_data))
+        self.enqueue_options.append(options)
         self.job_statuses[job_id] = JobStatus.queued
         return SimpleNamespace(job_id=job_id)
 
+    async def incr(self, key: str):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def zcard(self, key: str):
+        return len(self.queues.get(key, {}))
+
+    async def zcount(self, key: str, _min, max_score):
+        return sum(
+            1 for score in self.queues.get(key, {}).values() if score <= max_score
+        )
+
+    async def lrange(self, key: str, start: int, end: int):
+        values = self.lists.get(key, [])
+        return values[start:] if end == -1 else values[start : end + 1]
+
+    async def getdel(self, key: str | bytes):
+        key_bytes = key if isinstance(key, bytes) else key.encode("utf-8")
+        self.expirations.pop(key_bytes, None)
+        return self.metadata.pop(key_bytes, None)
+
     async def delete(self, key: str | bytes):
         key_bytes = key if isinstance(key, bytes) else key.encode("utf-8")
         self.metadata.pop(key_bytes, None)
@@ -129,9 +159,10 @@ class FakeRedis:
 
 
 class FakeJob:
-    def __init__(self, job_id: str, redis: FakeRedis):
+    def __init__(self, job_id: str, redis: FakeRedis, _queue_name: str | None = None):
         self.job_id = job_id
         self.redis = redis
+        self.queue_name = _queue_name
 
     async def status(self):
         return self.redis.job_statuses.get(self.job_id)
@@ -148,6 +179,7 @@ def fake_redis(monkeypatch) -> FakeRedis:
         return redis
 
     monkeypatch.setattr("app.worker.get_redis_pool", get_pool)
+    monkeypatch.setattr("app.worker.get_task_event_redis", lambda: redis)
     monkeypatch.setattr("app.api.services.ai_exam.Job", FakeJob)
     monkeypatch.setattr("arq.jobs.Job", FakeJob)
     return redis
@@ -212,7 +244,78 @@ async def test_submit_generate_task_enqueues_job(
         assert metadata["user_id"] == user.id
         assert metadata["archive_ids"] == [1, 2]
         assert metadata["status"] == "pending"
+        assert metadata["queue"] == INTERACTIVE_QUEUE_NAME
         assert fake_redis.expirations[metadata_key] == 86400
+        assert fake_redis.enqueue_options[0]["_queue_name"] == INTERACTIVE_QUEUE_NAME
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_submit_generate_task_routes_heavy_users_to_batch_queue(
+    client: AsyncClient,
+    make_user,
+    fake_redis: FakeRedis,
+    monkeypatch,
+):
+    user = await make_user()
+    monkeypatch.setattr(settings, "AI_EXAM_HEAVY_USER_THRESHOLD", 1)
+    fake_redis.counters[f"ai_exam:usage:{user.id}"] = 1
+
+    async def fake_get_current_user():
+        return UserRoles(user_id=user.id, is_admin=False)
+
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+
+    try:
+        response = await client.post("/ai-exam/generate", json={"archive_ids": [1]})
+        assert response.status_code == 200
+        assert fake_redis.enqueue_options[0]["_queue_name"] == BATCH_QUEUE_NAME
+        metadata = json.loads(fake_redis.metadata[b"task_metadata:job-1"])
+        assert metadata["queue"] == BATCH_QUEUE_NAME
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_get_queue_stats_requires_admin(client: AsyncClient, fake_redis):
+    async def fake_get_current_user():
+        return UserRoles(user_id=1, is_admin=False)
+
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+    try:
+        response = await client.get("/ai-exam/admin/queues")
+        assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_get_queue_stats_reports_depth_and_wait(
+    client: AsyncClient, fake_redis: FakeRedis
+):
+    fake_redis.queues[INTERACTIVE_QUEUE_NAME] = {"job-a": 0, "job-b": 4102444800000}
+    fake_redis.lists[f"ai_exam:queue_wait:{INTERACTIVE_QUEUE_NAME}"] = [
+        b"100",
+        b"300",
+        b"200",
+    ]
+
+    async def fake_get_current_user():
+        return UserRoles(user_id=1, is_admin=True)
+
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+    try:
+        response = await client.get("/ai-exam/admin/queues")
+        assert response.status_code == 200
+        stats = {item["queue"]: item for item in response.json()}
+        interactive = stats[INTERACTIVE_QUEUE_NAME]
+        assert interactive["depth"] == 2
+        assert interactive["ready"] == 1
+        assert interactive["wait_ms_p50"] == 200
+        assert interactive["wait_ms_p95"] == 300
+        assert stats[BATCH_QUEUE_NAME]["depth"] == 0
+        assert stats[BATCH_QUEUE_NAME]["wait_ms_p50"] is None
     finally:
         app.dependency_overrides.pop(get_current_user, None)
 
@@ -407,6 +510,55 @@ async def test_task_status_stream_emits_in_progress_transition(
             assert final["result"]["generated_content"] == "Example"
 
 
+@pytest.mark.asyncio
+async def test_task_status_stream_forwards_chunks(
+    client: AsyncClient,
+    make_user,
+    fake_redis: FakeRedis,
+    monkeypatch,
+):
+    user = await make_user()
+
+    async def fake_ws_payload(websocket):
+        return {"uid": user.id, "exp": 4102444800}
+
+    monkeypatch.setattr(
+        "app.api.services.ai_exam.get_ws_token_payload", fake_ws_payload
+    )
+
+    task_id = "job-chunks"
+    await fake_redis.set(
+        f"task_metadata:{task_id}",
+        json.dumps({"user_id": user.id, "created_at": datetime.utcnow().isoformat()}),
+    )
+    fake_redis.job_statuses[task_id] = JobStatus.in_progress
+
+    stream_key = f"ai_exam:task_events:{task_id}"
+    await fake_redis.xadd(stream_key, {"status": "in_progress"})
+    await fake_redis.xadd(stream_key, {"status": "in_progress", "chunk": "Q1. "})
+    await fake_redis.xadd(stream_key, {"status": "in_progress", "chunk": "Q2."})
+
+    with TestClient(app) as ws_client:
+        with ws_client.websocket_connect(f"/ai-exam/ws/task/{task_id}") as ws:
+            first = ws.receive_json()
+            assert first["status"] == "in_progress"
+            assert first["chunk"] is None
+
+            chunk_frames = [ws.receive_json(), ws.receive_json()]
+            assert [frame["chunk"] for frame in chunk_frames] == ["Q1. ", "Q2."]
+            assert all(frame["status"] == "in_progress" for frame in chunk_frames)
+
+            fake_redis.job_statuses[task_id] = JobStatus.complete
+            fake_redis.results[task_id] = {
+                "success": True,
+                "generated_content": "Q1. Q2.",
+            }
+            await fake_redis.xadd(stream_key, {"status": "complete"})
+            final = ws.receive_json()
+            assert final["status"] == "complete"
+            assert final["result"]["generated_content"] == "Q1. Q2."
+
+
 @pytest.mark.asyncio
 async def test_get_task_status_handles_result_error(
     client: AsyncClient,
@@ -460,19 +612,20 @@ async def test_update_api_key_persists_value(
         def __init__(self):
             self.calls = []
 
-        def generate_content(self, **kwargs):
+        async def get(self, **kwargs):
             self.calls.append(kwargs)
-            return SimpleNamespace(text="ok")
+            return SimpleNamespace(name=kwargs["model"])
 
     class FakeClient:
         instances = []
 
         def __init__(self, api_key):
             self.api_key = api_key
-            self.models = FakeModels()
+            self.aio = SimpleNamespace(models=FakeModels())
             FakeClient.instances.append(self)
 
     monkeypatch.setattr("google.genai.Client", FakeClient)
+    monkeypatch.setattr(gemini, "_key_validations", {})
 
     try:
         new_key = "abc12345XYZ"
@@ -485,7 +638,9 @@ async def test_update_api_key_persists_value(
         assert body["has_api_key"] is True
         assert body["api_key_masked"] == f"****{new_key[-4:]}"
         assert FakeClient.instances and FakeClient.instances[0].api_key == new_key
-        assert FakeClient.instances[0].models.calls
+        assert FakeClient.instances[0].aio.models.calls == [
+            {"model": settings.GEMINI_MODEL}
+        ]
 
         async with session_maker() as session:
             refreshed = await session.get(User, user.id)
@@ -732,12 +887,22 @@ async def test_update_api_key_invalid_key(
     class ErrorClient:
         def __init__(self, api_key):
             self.api_key = api_key
-            self.models = self
+            self.aio = SimpleNamespace(models=self)
 
-        def generate_content(self, **kwargs):
-            raise ValueError("API key invalid")
+        async def get(self, **kwargs):
+            raise genai_errors.ClientError(
+                400,
+                {
+                    "error": {
+                        "code": 400,
+                        "status": "INVALID_ARGUMENT",
+                        "message": "API key not valid.",
+                    }
+                },
+            )
 
     monkeypatch.setattr("google.genai.Client", ErrorClient)
+    monkeypatch.setattr(gemini, "_key_validations", {})
 
     async def fake_get_current_user():
         return UserRoles(user_id=user.id, is_admin=False)
@@ -754,6 +919,58 @@ async def test_update_api_key_invalid_key(
         app.dependency_overrides.pop(get_current_user, None)
 
 
+@pytest.mark.asyncio
+async def test_update_api_key_defers_validation_to_worker(
+    client: AsyncClient,
+    make_user,
+    session_maker,
+    fake_redis: FakeRedis,
+    monkeypatch,
+):
+    user = await make_user(gemini_api_key="old-key-0000")
+    monkeypatch.setattr(gemini, "_key_validations", {})
+
+    def unexpected_client(api_key):
+        raise AssertionError("key must not be validated in the request")
+
+    monkeypatch.setattr("google.genai.Client", unexpected_client)
+
+    async def fake_get_current_user():
+        return UserRoles(user_id=user.id, is_admin=False)
+
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+    try:
+        response = await client.put(
+            "/ai-exam/api-key",
+            json={"gemini_api_key": "new-key-9999", "defer_validation": True},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body == {
+            "has_api_key": True,
+            "api_key_masked": "****0000",
+            "validation_task_id": "job-1",
+        }
+        [(name, task_data)] = fake_redis.enqueue_calls
+        assert name == "validate_api_key_task"
+        assert task_data == {"user_id": user.id, "key_ref": task_data["key_ref"]}
+        assert "new-key-9999" not in json.dumps(task_data)
+        pending_key = f"ai_exam:pending_api_key:{task_data['key_ref']}".encode()
+        assert fake_redis.metadata[pending_key] == b"new-key-9999"
+        assert fake_redis.expirations[pending_key] == PENDING_API_KEY_TTL
+        metadata = json.loads(
+            fake_redis.metadata[b"task_metadata:job-1"].decode("utf-8")
+        )
+        assert metadata["user_id"] == user.id
+        assert metadata["kind"] == "api_key_validation"
+
+        async with session_maker() as session:
+            refreshed = await session.get(User, user.id)
+            assert refreshed.gemini_api_key == "old-key-0000"
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
 @pytest.mark.asyncio
 async def test_update_api_key_handles_other_errors(
     client: AsyncClient,
@@ -765,10 +982,10 @@ async def test_update_api_key_handles_other_errors(
     class NoopClient:
         def __init__(self, api_key):
             self.api_key = api_key
-            self.models = self
+            self.aio = SimpleNamespace(models=self)
 
-        def generate_content(self, **kwargs):
-            return SimpleNamespace(text="ok")
+        async def get(self, **kwargs):
+            return SimpleNamespace(name=kwargs["model"])
 
     async def fake_get_current_user():
         return UserRoles(user_id=user.id, is_admin=False)
@@ -782,6 +999,7 @@ async def test_update_api_key_handles_other_errors(
 
     app.dependency_overrides[get_current_user] = fake_get_current_user
     monkeypatch.setattr("google.genai.Client", NoopClient)
+    monkeypatch.setattr(gemini, "_key_validations", {})
     monkeypatch.setattr(
         AsyncSession,
         "execute",
@@ -7,10 +7,90 @@ from httpx import AsyncClient
 from sqlalchemy import delete, select, func
 from starlette.datastructures import UploadFile
 
-from app.api.services.archives import upload_archive
+from app.api.services.archives import (
+    _enqueue_archive_jobs,
+    get_storage_cache_stats,
+    upload_archive,
+)
 from app.main import app
 from app.models.models import Archive, Course, CourseCategory, User, UserRoles
+from app.services.professors import professor_cache
 from app.utils.auth import get_current_user
+from app.utils.disk_cache import DiskCache
+from app.utils.storage import ObjectStorage
+from app.worker import BATCH_QUEUE_NAME
+
+
+@pytest.fixture(autouse=True)
+def enqueued_jobs(monkeypatch):
+    calls = []
+
+    async def fake_enqueue(archive_id, functions):
+        calls.append((archive_id, functions))
+
+    monkeypatch.setattr(
+        "app.api.services.archives._enqueue_archive_jobs", fake_enqueue
+    )
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_post_upload_jobs_share_job_ids_with_backfill(monkeypatch):
+    jobs = []
+
+    class FakeRedis:
+        async def enqueue_job(self, function, *args, **options):
+            jobs.append((function, args, options))
+
+    async def get_pool():
+        return FakeRedis()
+
+    monkeypatch.setattr("app.worker.get_redis_pool", get_pool)
+
+    await _enqueue_archive_jobs(
+        7, ["optimize_archive_task", "generate_archive_previews_task"]
+    )
+
+    assert jobs == [
+        (
+            "optimize_archive_task",
+            (7,),
+            {"_job_id": "archive-optimize:7", "_queue_name": BATCH_QUEUE_NAME},
+        ),
+        (
+            "generate_archive_previews_task",
+            (7,),
+            {"_job_id": "archive-previews:7", "_queue_name": BATCH_QUEUE_NAME},
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_storage_cache_stats_are_readable_while_running(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), capacity_bytes=1024)
+    storage = ObjectStorage(object(), cache=cache)
+    monkeypatch.setattr("app.api.services.archives.get_storage", lambda: storage)
+    admin = UserRoles(user_id=1, is_admin=True)
+
+    cache.put("a.pdf", "etag", b"data")
+    for key in ("a.pdf", "a.pdf", "a.pdf", "b.pdf"):
+        entry = cache.open(key, "etag")
+        if entry is not None:
+            entry.close()
+
+    stats = await get_storage_cache_stats(admin)
+    assert stats.enabled is True
+    assert (stats.hits, stats.misses, stats.writes) == (3, 1, 1)
+    assert stats.hit_rate == 0.75
+
+    storage.cache = None
+    stats = await get_storage_cache_stats(admin)
+    assert (stats.enabled, stats.hit_rate) == (False, None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_storage_cache_stats(UserRoles(user_id=2, is_admin=False))
+    assert exc_info.value.status_code == 403
+    storage.close()
 
 
 @pytest.mark.asyncio
@@ -19,6 +99,7 @@ async def test_upload_archive_creates_course_and_archive(
     session_maker,
     make_user,
     monkeypatch,
+    enqueued_jobs,
 ):
     unique = uuid.uuid4().hex[:8]
     user = await make_user()
@@ -37,8 +118,8 @@ async def test_upload_archive_creates_course_and_archive(
             return None
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: FakeMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(FakeMinio()),
     )
 
     try:
@@ -76,6 +157,10 @@ async def test_upload_archive_creates_course_and_archive(
             assert archive is not None
             assert archive.course_id == course.id
             assert archive.uploader_id == user_id
+
+        assert enqueued_jobs == [
+            (archive_data["id"], ["generate_archive_previews_task"])
+        ]
     finally:
         app.dependency_overrides.pop(get_current_user, None)
 
@@ -143,8 +228,8 @@ async def test_upload_archive_reuses_existing_course(
             return None
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: FakeMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(FakeMinio()),
     )
 
     async def fake_get_current_user():
@@ -208,8 +293,8 @@ async def test_upload_archive_rejects_large_file(
             raise AssertionError("should not upload oversized file")
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: FakeMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(FakeMinio()),
     )
 
     try:
@@ -263,8 +348,8 @@ async def test_upload_archive_handles_storage_failure(
             raise RuntimeError("minio unavailable")
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: FailingMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(FailingMinio()),
     )
 
     try:
@@ -318,8 +403,8 @@ async def test_upload_archive_function_covers_creation_and_reuse(
             self.calls.append(kwargs)
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: RecordingMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(RecordingMinio()),
     )
 
     async with session_maker() as session:
@@ -476,8 +561,8 @@ async def test_upload_archive_function_handles_storage_error(
             raise RuntimeError("storage down")
 
     monkeypatch.setattr(
-        "app.api.services.archives.get_minio_client",
-        lambda: FailingMinio(),
+        "app.api.services.archives.get_storage",
+        lambda: ObjectStorage(FailingMinio()),
     )
 
     upload = UploadFile(filename="fail.pdf", file=io.BytesIO(b"%PDF fail"))
@@ -497,3 +582,79 @@ async def test_upload_archive_function_handles_storage_error(
                 db=session,
             )
         assert exc.value.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_suggest_professors_prefix_course_scope_and_spelling(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    unique = uuid.uuid4().hex[:8]
+    user = await make_user()
+    user_id = user.id
+
+    async def fake_get_current_user():
+        return UserRoles(user_id=user_id, is_admin=False)
+
+    app.dependency_overrides[get_current_user] = fake_get_current_user
+    professor_cache.clear()
+
+    async with session_maker() as session:
+        first = Course(name=f"Prof Course A {unique}", category=CourseCategory.GENERAL)
+        second = Course(name=f"Prof Course B {unique}", category=CourseCategory.GENERAL)
+        session.add_all([first, second])
+        await session.commit()
+        await session.refresh(first)
+        await session.refresh(second)
+        course_ids = [first.id, second.id]
+
+        rows = [
+            (first.id, f"Zed{unique} Alpha"),
+            (first.id, f"Zed{unique} Alpha"),
+            (first.id, f"zed{unique}  alpha"),
+            (second.id, f"Zed{unique} Beta"),
+        ]
+        for index, (course_id, professor) in enumerate(rows):
+            session.add(
+                Archive(
+                    course_id=course_id,
+                    name=f"Exam {index}",
+                    professor=professor,
+                    archive_type="final",
+                    academic_year=2024,
+                    object_name=f"archives/{course_id}/{unique}-{index}.pdf",
+                )
+            )
+        await session.commit()
+
+    try:
+        response = await client.get(
+            "/archives/professors", params={"q": f"zed{unique}"}
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"name": f"Zed{unique} Alpha", "archive_count": 3},
+            {"name": f"Zed{unique} Beta", "archive_count": 1},
+        ]
+
+        response = await client.get(
+            "/archives/professors",
+            params={"q": f"zed{unique} b", "course_id": course_ids[0]},
+        )
+        assert response.json() == []
+
+        response = await client.get(
+            "/archives/professors",
+            params={"q": f"zed{unique}", "course_id": course_ids[1], "limit": 500},
+        )
+        assert response.json() == [{"name": f"Zed{unique} Beta", "archive_count": 1}]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        professor_cache.clear()
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.course_id.in_(course_ids))
+            )
+            await session.execute(delete(Course).where(Course.id.in_(course_ids)))
+            await session.commit()
@@ -1,4 +1,6 @@
+import io
 import uuid
+import zipfile
 from datetime import datetime, timezone
 
 import pytest
@@ -20,8 +22,10 @@ from app.api.services.courses import (
     update_course,
 )
 from app.main import app
+from app.core.config import settings
 from app.models.models import (
     Archive,
+    ArchiveDiscussionMessage,
     ArchiveType,
     ArchiveUpdateCourse,
     Course,
@@ -30,7 +34,9 @@ from app.models.models import (
     CourseUpdate,
     UserRoles,
 )
+from app.services import archive_access
 from app.utils.auth import get_current_user
+from app.utils.storage import ObjectInfo
 
 
 async def _create_course(
@@ -194,6 +200,203 @@ async def test_get_archive_preview_url_returns_presigned_link(
             await session.commit()
 
 
+@pytest.mark.asyncio
+async def test_archive_links_prefer_optimized_copy(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id
+    )
+    optimized_name = archive.object_name.replace(".pdf", ".optimized.pdf")
+    async with session_maker() as session:
+        stored = await session.get(Archive, archive.id)
+        stored.optimized_object_name = optimized_name
+        await session.commit()
+
+    signed = []
+
+    def fake_presigned(obj_name, *, expires):
+        signed.append(obj_name)
+        return "https://example.com/signed"
+
+    monkeypatch.setattr(
+        "app.api.services.courses.presigned_get_url", fake_presigned
+    )
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        base = f"/courses/{course.id}/archives/{archive.id}"
+        assert (await client.get(f"{base}/preview")).status_code == 200
+        assert (await client.get(f"{base}/download")).status_code == 200
+        assert signed == [optimized_name, optimized_name]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.id == archive.id)
+            )
+            await session.execute(
+                delete(Course).where(Course.id == course.id)
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_archive_preview_image_serves_cached_webp(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id
+    )
+    requested = []
+
+    class FakeStorage:
+        async def get(self, object_name):
+            requested.append(object_name)
+            return b"RIFF-webp"
+
+    monkeypatch.setattr("app.api.services.courses.get_storage", FakeStorage)
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    url = f"/courses/{course.id}/archives/{archive.id}/preview-image"
+    try:
+        response = await client.get(url)
+        assert response.status_code == 404
+
+        async with session_maker() as session:
+            stored = await session.get(Archive, archive.id)
+            stored.previews_generated_at = datetime.now(timezone.utc)
+            await session.commit()
+
+        response = await client.get(url, params={"variant": "page"})
+        assert response.status_code == 200
+        assert response.content == b"RIFF-webp"
+        assert response.headers["content-type"] == "image/webp"
+        assert "immutable" in response.headers["cache-control"]
+        assert requested == [archive.object_name.replace(".pdf", ".preview-page.webp")]
+
+        response = await client.get(
+            url,
+            params={"variant": "page"},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
+        etag = response.headers["etag"]
+        for if_none_match in (f"W/{etag}", f'"other", {etag}', "*"):
+            response = await client.get(
+                url,
+                params={"variant": "page"},
+                headers={"If-None-Match": if_none_match},
+            )
+            assert response.status_code == 304
+        assert len(requested) == 1
+
+        response = await client.get(url, params={"variant": "huge"})
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.id == archive.id)
+            )
+            await session.execute(
+                delete(Course).where(Course.id == course.id)
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_archive_content_serves_byte_ranges(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+    fake_activity_redis,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    archive = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id
+    )
+    content = b"%PDF-0123456789"
+    streamed = []
+
+    class FakeStorage:
+        async def stat(self, object_name):
+            assert object_name == archive.object_name
+            return ObjectInfo(len(content), "abc", "application/pdf", None)
+
+        async def stream(self, object_name, offset=0, length=0, info=None):
+            assert info.etag == "abc"
+            streamed.append((offset, length))
+            yield content[offset : offset + length]
+
+    monkeypatch.setattr("app.api.services.courses.get_storage", FakeStorage)
+    monkeypatch.setattr(settings, "ARCHIVE_CONTENT_PROXY_ENABLED", True)
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    url = f"/courses/{course.id}/archives/{archive.id}/content"
+    try:
+        response = await client.get(
+            f"/courses/{course.id}/archives/{archive.id}/preview"
+        )
+        assert response.json() == {"url": url, "proxied": True}
+
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.content == content
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == '"abc"'
+
+        response = await client.get(url, headers={"Range": "bytes=5-8"})
+        assert response.status_code == 206
+        assert response.content == b"0123"
+        assert response.headers["content-range"] == f"bytes 5-8/{len(content)}"
+        assert response.headers["content-length"] == "4"
+
+        response = await client.get(url, headers={"Range": "bytes=99-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+        response = await client.get(url, headers={"If-None-Match": '"abc"'})
+        assert response.status_code == 304
+
+        response = await client.get(
+            url, headers={"Range": "bytes=5-8", "If-Range": '"old"'}
+        )
+        assert response.status_code == 200
+
+        response = await client.head(url)
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(content))
+
+        assert streamed == [
+            (0, len(content)),
+            (5, 4),
+            (0, len(content)),
+        ]
+        assert archive_access.get_archive_access([archive.id]) == {
+            archive.id: (3, 2 * len(content) + 4)
+        }
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.id == archive.id)
+            )
+            await session.execute(
+                delete(Course).where(Course.id == course.id)
+            )
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_get_archive_download_url_increments_count(
     client: AsyncClient,
@@ -240,6 +443,79 @@ async def test_get_archive_download_url_increments_count(
             await session.commit()
 
 
+@pytest.mark.asyncio
+async def test_archive_bundle_counts_downloads_and_streams_zip(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+    fake_activity_redis,
+):
+    user = await make_user()
+    course = await _create_course(session_maker)
+    first = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id, name="A"
+    )
+    second = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=user.id, name="B"
+    )
+    contents = {first.object_name: b"%PDF-first", second.object_name: b"%PDF-2nd"}
+
+    class FakeStorage:
+        async def stat(self, object_name):
+            return ObjectInfo(len(contents[object_name]), "e", None, None)
+
+        async def stream(self, object_name, offset=0, length=0, info=None):
+            data = contents[object_name]
+            yield data[offset : offset + length] if length else data[offset:]
+
+    monkeypatch.setattr("app.api.services.courses.get_storage", FakeStorage)
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        response = await client.post(
+            f"/courses/{course.id}/bundles", json={"archive_ids": [first.id]}
+        )
+        assert response.status_code == 200
+        assert response.json()["archive_count"] == 1
+
+        response = await client.post(f"/courses/{course.id}/bundles", json={})
+        assert response.status_code == 200
+        bundle = response.json()
+        assert bundle["archive_count"] == 2
+
+        async with session_maker() as session:
+            assert (await session.get(Archive, first.id)).download_count == 2
+            assert (await session.get(Archive, second.id)).download_count == 1
+
+        app.dependency_overrides.pop(get_current_user, None)
+        response = await client.get(bundle["url"])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert len(response.content) == bundle["size"]
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive_zip:
+            names = archive_zip.namelist()
+            assert sorted(archive_zip.read(name) for name in names) == sorted(
+                contents.values()
+            )
+
+        response = await client.get(bundle["url"], headers={"Range": "bytes=10-"})
+        assert response.status_code == 206
+        assert len(response.content) == bundle["size"] - 10
+
+        response = await client.get(f"/courses/{course.id}/bundles/unknown")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(Archive).where(Archive.id.in_([first.id, second.id]))
+            )
+            await session.execute(
+                delete(Course).where(Course.id == course.id)
+            )
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_update_archive_requires_admin(
     client: AsyncClient,
@@ -371,6 +647,45 @@ async def test_admin_course_crud_flow(
                 await session.commit()
 
 
+@pytest.mark.asyncio
+async def test_admin_lists_archive_access_per_course(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    fake_activity_redis,
+):
+    admin = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    quiet = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id, name="Quiet"
+    )
+    busy = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id, name="Busy"
+    )
+    deleted = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id, deleted=True
+    )
+    for archive_id, bytes_sent in ((busy.id, 100), (busy.id, 50), (deleted.id, 9)):
+        archive_access.record_archive_access(archive_id, bytes_sent)
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+
+    try:
+        response = await client.get(
+            f"/courses/admin/courses/{course.id}/archive-access"
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"archive_id": busy.id, "name": "Busy", "requests": 2, "bytes_sent": 150},
+            {"archive_id": quiet.id, "name": "Quiet", "requests": 0, "bytes_sent": 0},
+        ]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.course_id == course.id))
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_admin_course_endpoints_require_admin(
     client: AsyncClient,
@@ -402,6 +717,11 @@ async def test_admin_course_endpoints_require_admin(
 
         response = await client.get("/courses/admin/courses")
         assert response.status_code == 403
+
+        response = await client.get(
+            f"/courses/admin/courses/{course.id}/archive-access"
+        )
+        assert response.status_code == 403
     finally:
         app.dependency_overrides.pop(get_current_user, None)
         async with session_maker() as session:
@@ -1047,6 +1367,7 @@ async def test_admin_delete_course_soft_deletes_archives(
         assert response.status_code == 200
         body = response.json()
         assert "1 associated archives" in body["message"]
+        assert body["archives_deleted"] == 1
 
         async with session_maker() as session:
             refreshed_course = await session.get(Course, course.id)
@@ -1084,3 +1405,149 @@ async def test_list_all_courses_direct_returns_courses(
         async with session_maker() as session:
             await session.execute(delete(Course).where(Course.id == course.id))
             await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_admin_bulk_archive_and_course_operations(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+):
+    admin = await make_user(is_admin=True)
+    source = await _create_course(session_maker)
+    target = await _create_course(session_maker)
+    archives = [
+        await _create_archive(
+            session_maker, course_id=source.id, uploader_id=admin.id
+        )
+        for _ in range(3)
+    ]
+    archive_ids = [archive.id for archive in archives]
+
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        response = await client.post(
+            "/courses/admin/archives/bulk-move",
+            json={"ids": archive_ids[:2] + [0], "course_id": target.id},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (2, 1)
+        assert body["results"][-1] == {
+            "id": 0,
+            "success": False,
+            "detail": "Archive not found",
+        }
+
+        response = await client.post(
+            "/courses/admin/archives/bulk-delete",
+            json={"ids": [archive_ids[0], archive_ids[0]]},
+        )
+        assert response.json()["succeeded"] == 1
+        assert len(response.json()["results"]) == 1
+
+        response = await client.post(
+            "/courses/admin/courses/bulk-delete",
+            json={"ids": [source.id, target.id]},
+        )
+        assert response.json()["succeeded"] == 2
+
+        async with session_maker() as session:
+            refreshed = [await session.get(Archive, archive_id) for archive_id in archive_ids]
+            assert [archive.course_id for archive in refreshed] == [
+                target.id,
+                target.id,
+                source.id,
+            ]
+            assert all(archive.deleted_at is not None for archive in refreshed)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id.in_(archive_ids)))
+            await session.execute(
+                delete(Course).where(Course.id.in_([source.id, target.id]))
+            )
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoints_require_admin(client: AsyncClient, make_user):
+    user = await make_user(is_admin=False)
+    app.dependency_overrides[get_current_user] = _override_user(user)
+    try:
+        for path, payload in (
+            ("/courses/admin/courses/bulk-delete", {"ids": [1]}),
+            ("/courses/admin/archives/bulk-delete", {"ids": [1]}),
+            ("/courses/admin/archives/bulk-move", {"ids": [1], "course_id": 1}),
+        ):
+            response = await client.post(path, json=payload)
+            assert response.status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_restore_course_undoes_the_cascade_only(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "COURSE_DELETE_CASCADE_DISCUSSIONS", True)
+    admin = await make_user(is_admin=True)
+    course = await _create_course(session_maker)
+    live = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id
+    )
+    removed_earlier = await _create_archive(
+        session_maker, course_id=course.id, uploader_id=admin.id, deleted=True
+    )
+    async with session_maker() as session:
+        message = ArchiveDiscussionMessage(
+            archive_id=live.id, user_id=admin.id, content="hello"
+        )
+        session.add(message)
+        await session.commit()
+        await session.refresh(message)
+        message_id = message.id
+
+    app.dependency_overrides[get_current_user] = _override_user(admin)
+    try:
+        response = await client.delete(f"/courses/admin/courses/{course.id}")
+        body = response.json()
+        assert (body["archives_deleted"], body["messages_deleted"]) == (1, 1)
+
+        async with session_maker() as session:
+            deleted_message = await session.get(ArchiveDiscussionMessage, message_id)
+            assert deleted_message.deleted_at is not None
+
+        response = await client.post(f"/courses/admin/courses/{course.id}/restore")
+        assert response.status_code == 200
+        assert response.json()["id"] == course.id
+
+        async with session_maker() as session:
+            assert (await session.get(Course, course.id)).deleted_at is None
+            assert (await session.get(Archive, live.id)).deleted_at is None
+            assert (
+                await session.get(Archive, removed_earlier.id)
+            ).deleted_at is not None
+            restored = await session.get(ArchiveDiscussionMessage, message_id)
+            assert restored.deleted_at is None
+
+        response = await client.post(f"/courses/admin/courses/{course.id}/restore")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(
+                delete(ArchiveDiscussionMessage).where(
+                    ArchiveDiscussionMessage.id == message_id
+                )
+            )
+            await session.execute(
+                delete(Archive).where(
+                    Archive.id.in_([live.id, removed_earlier.id])
+                )
+            )
+            await session.execute(delete(Course).where(Course.id == course.id))
+            await session.commit()
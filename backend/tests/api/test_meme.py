@@ -2,6 +2,14 @@ import pytest
 from sqlalchemy import delete, select
 
 from app.models.models import Meme
+from app.services.memes import meme_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_meme_cache():
+    meme_cache.clear()
+    yield
+    meme_cache.clear()
 
 
 @pytest.mark.asyncio
@@ -57,3 +65,29 @@ async def test_get_random_meme_returns_404_when_empty(client, session_maker):
                     for item in snapshot
                 )
                 await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_random_meme_filters_by_language(client, session_maker):
+    async with session_maker() as session:
+        meme = Meme(content="Only one", language="xx-test")
+        session.add(meme)
+        await session.commit()
+        await session.refresh(meme)
+        created_id = meme.id
+
+    try:
+        response = await client.get("/meme", params={"language": "xx-test"})
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": created_id,
+            "content": "Only one",
+            "language": "xx-test",
+        }
+
+        response = await client.get("/meme", params={"language": "yy-test"})
+        assert response.status_code == 404
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Meme).where(Meme.id == created_id))
+            await session.commit()
@@ -3,8 +3,10 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 from httpx import AsyncClient
+from redis.exceptions import WatchError
 from sqlalchemy import delete
 
+from app.api.services import notifications as notifications_service
 from app.main import app
 from app.models.models import (
     Notification,
@@ -12,9 +14,88 @@ from app.models.models import (
     NotificationSeverity,
     UserRoles,
 )
+from app.utils import auth as auth_utils
 from app.utils.auth import get_current_user
 
 
+class FakeCacheRedis:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        # Simulates another worker writing between WATCH and EXEC.
+        self.race_on_exec = False
+        self.stream: list[dict] = []
+        self.published: list[tuple[str, str]] = []
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, px=None):
+        self.store[key] = value
+        self.ttls[key] = px
+
+    def incr(self, key):
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.stream.append(fields)
+        return f"{len(self.stream)}-0".encode()
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakeCachePipeline(self)
+
+
+class FakeCachePipeline:
+    def __init__(self, redis: FakeCacheRedis):
+        self.redis = redis
+        self.queued = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        pass
+
+    def get(self, key):
+        return self.redis.get(key)
+
+    def multi(self):
+        pass
+
+    def set(self, *args, **kwargs):
+        self.queued.append(("set", args, kwargs))
+
+    def incr(self, *args):
+        self.queued.append(("incr", args, {}))
+
+    def delete(self, *args):
+        self.queued.append(("delete", args, {}))
+
+    def execute(self):
+        if self.redis.race_on_exec:
+            raise WatchError("version changed")
+        for name, args, kwargs in self.queued:
+            getattr(self.redis, name)(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def cache_redis(monkeypatch) -> FakeCacheRedis:
+    redis = FakeCacheRedis()
+    monkeypatch.setattr(auth_utils, "redis_client", redis)
+    return redis
+
+
 async def _create_notification(session_maker, **overrides):
     now = datetime.now(timezone.utc)
     data = NotificationCreate(
@@ -208,3 +289,100 @@ async def test_admin_notifications_require_admin(
         async with session_maker() as session:
             await session.execute(delete(Notification))
             await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_active_notifications_cache_expires_at_next_transition(
+    client: AsyncClient,
+    session_maker,
+    cache_redis: FakeCacheRedis,
+):
+    async with session_maker() as session:
+        await session.execute(delete(Notification))
+        await session.commit()
+
+    now = datetime.now(timezone.utc)
+    visible = await _create_notification(
+        session_maker, ends_at=now + timedelta(minutes=30)
+    )
+    await _create_notification(
+        session_maker,
+        starts_at=now + timedelta(minutes=10),
+        ends_at=now + timedelta(hours=2),
+    )
+
+    try:
+        response = await client.get("/notifications/active")
+        assert [item["id"] for item in response.json()] == [visible.id]
+
+        key = notifications_service.ACTIVE_NOTIFICATIONS_CACHE_KEY
+        assert key in cache_redis.store
+        assert 9 * 60 * 1000 < cache_redis.ttls[key] <= 10 * 60 * 1000
+
+        # Served from cache: rows written behind the API's back are not seen.
+        await _create_notification(session_maker)
+        response = await client.get("/notifications")
+        assert [item["id"] for item in response.json()] == [visible.id]
+
+        notifications_service.invalidate_active_notifications()
+        response = await client.get("/notifications")
+        assert len(response.json()) == 2
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Notification))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_admin_write_invalidates_active_notifications(
+    client: AsyncClient,
+    session_maker,
+    make_user,
+    cache_redis: FakeCacheRedis,
+):
+    async with session_maker() as session:
+        await session.execute(delete(Notification))
+        await session.commit()
+
+    admin = await make_user(is_admin=True)
+    app.dependency_overrides[get_current_user] = _override_user(
+        {"id": admin.id, "is_admin": True}
+    )
+    try:
+        response = await client.get("/notifications/active")
+        assert response.json() == []
+
+        response = await client.post(
+            "/notifications/admin/notifications",
+            json={"title": "New", "body": "Fresh", "is_active": True},
+        )
+        assert response.status_code == 201
+
+        response = await client.get("/notifications/active")
+        assert [item["title"] for item in response.json()] == ["New"]
+
+        assert [event["type"] for event in cache_redis.stream] == ["created"]
+        assert len(cache_redis.published) == 1
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Notification))
+            await session.commit()
+
+
+def test_cache_fill_is_dropped_when_an_admin_write_races():
+    redis = FakeCacheRedis()
+    redis.race_on_exec = True
+
+    notifications_service._store_active_notifications(redis, None, b"[]", 1000)
+
+    assert notifications_service.ACTIVE_NOTIFICATIONS_CACHE_KEY not in redis.store
+
+
+def test_cache_fill_is_dropped_when_version_moved():
+    redis = FakeCacheRedis()
+    redis.incr(notifications_service.NOTIFICATIONS_VERSION_KEY)
+
+    notifications_service._store_active_notifications(redis, None, b"[]", 1000)
+
+    assert notifications_service.ACTIVE_NOTIFICATIONS_CACHE_KEY not in redis.store
@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.main import app
+from app.models.models import Archive, ArchiveType, Course, CourseCategory, UserRoles
+from app.utils.auth import get_current_user
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_archives_and_matches_through_course(
+    client, session_maker, make_user
+):
+    user = await make_user()
+    tag = uuid.uuid4().hex[:6]
+    async with session_maker() as session:
+        course = Course(name=f"微積分 {tag}", category=CourseCategory.FRESHMAN)
+        other = Course(name=f"線性代數 {tag}", category=CourseCategory.FRESHMAN)
+        session.add_all([course, other])
+        await session.flush()
+        archives = [
+            Archive(
+                name=f"期中考 {tag}",
+                academic_year=2024,
+                archive_type=ArchiveType.MIDTERM,
+                professor="王小明",
+                object_name=f"{tag}-1.pdf",
+                course_id=course.id,
+                uploader_id=user.id,
+            ),
+            Archive(
+                name=f"微積分小考 {tag}",
+                academic_year=2023,
+                archive_type=ArchiveType.QUIZ,
+                professor="李大華",
+                object_name=f"{tag}-2.pdf",
+                course_id=other.id,
+                uploader_id=user.id,
+            ),
+        ]
+        session.add_all(archives)
+        await session.commit()
+        course_ids = [course.id, other.id]
+        archive_ids = [archive.id for archive in archives]
+
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=user.id, is_admin=False
+    )
+    try:
+        response = await client.get("/search", params={"q": f"積分 {tag}"})
+        assert response.status_code == 200
+        body = response.json()
+        assert [hit["id"] for hit in body["courses"]] == [course_ids[0]]
+        # The archive named after the query outranks the one matched
+        # only through its course.
+        assert [hit["id"] for hit in body["archives"]] == archive_ids[::-1]
+        assert body["archives"][1]["course_name"] == f"微積分 {tag}"
+
+        response = await client.get("/search", params={"q": f"王小 {tag}"})
+        assert [hit["id"] for hit in response.json()["archives"]] == archive_ids[:1]
+
+        response = await client.get(
+            "/search", params={"q": f"積分 {tag}", "limit": 1}
+        )
+        page = response.json()
+        assert page["next_offset"] == 1
+        response = await client.get(
+            "/search", params={"q": f"積分 {tag}", "limit": 1, "offset": 1}
+        )
+        assert response.json()["courses"] == []
+        assert response.json()["next_offset"] is None
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(Archive).where(Archive.id.in_(archive_ids)))
+            await session.execute(delete(Course).where(Course.id.in_(course_ids)))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_search_with_no_usable_terms_returns_nothing(client, make_user):
+    user = await make_user()
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=user.id, is_admin=False
+    )
+    try:
+        response = await client.get("/search", params={"q": "!!"})
+        assert response.status_code == 200
+        assert response.json() == {
+            "query": "!!",
+            "courses": [],
+            "archives": [],
+            "next_offset": None,
+        }
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -5,7 +5,10 @@ import pytest
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.services.statistics import get_system_statistics
+from app.api.services.statistics import get_system_statistics, statistics_cache
+from app.services.counters import reconcile_counters
+from app.utils import auth as auth_utils
+from app.utils.activity import record_user_activity
 from app.models.models import (
     Archive,
     ArchiveType,
@@ -15,6 +18,18 @@ from app.models.models import (
 )
 
 
+@pytest.fixture(autouse=True)
+def activity_redis(fake_activity_redis):
+    return fake_activity_redis
+
+
+@pytest.fixture(autouse=True)
+def clear_statistics_cache():
+    statistics_cache.clear()
+    yield
+    statistics_cache.clear()
+
+
 @pytest.mark.asyncio
 async def test_statistics_endpoint_has_basic_fields(client):
     response = await client.get("/statistics")
@@ -117,6 +132,10 @@ async def test_get_system_statistics_direct_success(session_maker):
         await session.refresh(active_archive)
         await session.refresh(deleted_archive)
 
+        # The rows above were inserted directly, bypassing the write paths.
+        await reconcile_counters(session)
+        record_user_activity(auth_utils.redis_client, online_user.id)
+        statistics_cache.clear()
         stats = await get_system_statistics(db=session)
 
         assert stats["success"] is True
@@ -125,7 +144,9 @@ async def test_get_system_statistics_direct_success(session_maker):
         total_users = await session.scalar(
             select(func.count(User.id)).where(User.deleted_at.is_(None))
         )
-        total_courses = await session.scalar(select(func.count(Course.id)))
+        total_courses = await session.scalar(
+            select(func.count(Course.id)).where(Course.deleted_at.is_(None))
+        )
         total_archives = await session.scalar(
             select(func.count(Archive.id)).where(Archive.deleted_at.is_(None))
         )
@@ -148,6 +169,7 @@ async def test_get_system_statistics_direct_success(session_maker):
         await session.delete(online_user)
         await session.delete(offline_user)
         await session.commit()
+        await reconcile_counters(session)
 
 
 @pytest.mark.asyncio
@@ -164,3 +186,17 @@ async def test_get_system_statistics_direct_handles_exception(
         stats = await get_system_statistics(db=session)
         assert stats["success"] is False
         assert stats["data"]["totalUsers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_statistics_endpoint_serves_cached_value(monkeypatch, client):
+    first = await client.get("/statistics")
+    assert first.json()["success"] is True
+
+    async def failing_execute(self, *args, **kwargs):
+        raise RuntimeError("db error")
+
+    monkeypatch.setattr(AsyncSession, "execute", failing_execute, raising=False)
+
+    second = await client.get("/statistics")
+    assert second.json() == first.json()
@@ -79,12 +79,135 @@ async def test_admin_can_list_users(client):
         response = await client.get(ADMIN_PATH)
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
-        assert data, "Expected at least one user in seed data"
+        assert isinstance(data["items"], list)
+        assert data["items"], "Expected at least one user in seed data"
+        assert data["total"] is None
     finally:
         app.dependency_overrides.pop(get_current_user, None)
 
 
+@pytest.mark.asyncio
+async def test_admin_user_listing_pages_and_searches(client, session_maker):
+    prefix = f"page-{uuid.uuid4().hex[:6]}"
+    async with session_maker() as session:
+        users = [
+            User(
+                name=f"{prefix}-{index}",
+                email=f"{prefix}-{index}@smail.nchu.edu.tw",
+                nickname="Searchable" if index == 0 else None,
+                is_admin=index == 4,
+                is_local=True,
+            )
+            for index in range(5)
+        ]
+        session.add_all(users)
+        await session.commit()
+        user_ids = [user.id for user in users]
+
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1,
+        is_admin=True,
+    )
+
+    try:
+        names = []
+        cursor = None
+        for _ in range(3):
+            params = {"q": prefix.upper(), "limit": 2, "include_total": True}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(ADMIN_PATH, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert page["total"] == 5
+            names.extend(item["name"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert names == [f"{prefix}-{index}" for index in range(5)]
+
+        response = await client.get(
+            ADMIN_PATH, params={"q": prefix, "sort": "email", "order": "desc"}
+        )
+        assert response.json()["items"][0]["name"] == f"{prefix}-4"
+
+        response = await client.get(
+            ADMIN_PATH, params={"q": prefix, "is_admin": True}
+        )
+        assert [item["name"] for item in response.json()["items"]] == [
+            f"{prefix}-4"
+        ]
+
+        response = await client.get(ADMIN_PATH, params={"q": "searchab"})
+        assert f"{prefix}-0" in [item["name"] for item in response.json()["items"]]
+
+        response = await client.get(ADMIN_PATH, params={"q": f"{prefix[:-1]}%"})
+        assert response.json()["items"] == []
+
+        response = await client.get(ADMIN_PATH, params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_admin_bulk_user_operations(client, session_maker):
+    unique = uuid.uuid4().hex[:8]
+    async with session_maker() as session:
+        users = [
+            User(
+                name=f"bulk-{unique}-{index}",
+                email=f"bulk-{unique}-{index}@smail.nchu.edu.tw",
+                is_admin=True,
+                is_local=True,
+            )
+            for index in range(3)
+        ]
+        session.add_all(users)
+        await session.commit()
+        user_ids = [user.id for user in users]
+
+    acting_id = user_ids[0]
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=acting_id,
+        is_admin=True,
+    )
+
+    try:
+        response = await client.post(
+            f"{ADMIN_PATH}/bulk-update",
+            json={"ids": user_ids[1:], "is_admin": False},
+        )
+        assert response.status_code == 200
+        assert response.json()["succeeded"] == 2
+
+        response = await client.post(
+            f"{ADMIN_PATH}/bulk-delete", json={"ids": user_ids + [0]}
+        )
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (2, 2)
+        details = {item["id"]: item["detail"] for item in body["results"]}
+        assert details[acting_id] == "Cannot delete yourself"
+        assert details[0] == "User not found"
+
+        async with session_maker() as session:
+            refreshed = [await session.get(User, user_id) for user_id in user_ids]
+            assert [user.is_admin for user in refreshed] == [True, False, False]
+            assert [user.deleted_at is None for user in refreshed] == [
+                True,
+                False,
+                False,
+            ]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with session_maker() as session:
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+
+
 @pytest.mark.asyncio
 async def test_admin_can_update_user(client, session_maker):
     unique = uuid.uuid4().hex[:8]
@@ -228,7 +351,7 @@ async def test_get_users_direct_returns_users(session_maker):
             current_user=UserRoles(user_id=2, is_admin=True),
             db=session,
         )
-        assert any(item.id == user.id for item in users)
+        assert any(item.id == user.id for item in users.items)
 
         await session.delete(user)
         await session.commit()
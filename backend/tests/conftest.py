@@ -126,3 +126,96 @@ async def client(monkeypatch) -> AsyncIterator[AsyncClient]:
         base_url="http://testserver",
     ) as async_client:
         yield async_client
+
+
+class FakeActivityRedis:
+    """In-memory stand-in for the Redis commands the tests rely on."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hlls: dict[str, set[str]] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.expirations: dict[str, int] = {}
+        self.executed = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    def zremrangebyscore(self, key, _min, max_score):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= max_score]:
+            del zset[member]
+
+    def zcount(self, key, min_score, _max):
+        return sum(1 for s in self.zsets.get(key, {}).values() if s >= min_score)
+
+    def pfadd(self, key, value):
+        self.hlls.setdefault(key, set()).add(value)
+
+    def pfcount(self, key):
+        return len(self.hlls.get(key, set()))
+
+    def expire(self, key, seconds):
+        self.expirations[key] = seconds
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        if ex is not None:
+            self.expirations[key] = ex
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {str(field): value for field, value in mapping.items()}
+        )
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        fields = self.hashes.setdefault(key, {})
+        fields[str(field)] = fields.get(str(field), 0) + amount
+        return fields[str(field)]
+
+    def hmget(self, key, fields):
+        values = self.hashes.get(key, {})
+        return [values.get(str(field)) for field in fields]
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeActivityRedis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    def execute(self):
+        self.redis.executed += 1
+        return [
+            getattr(self.redis, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+@pytest.fixture()
+def fake_activity_redis(monkeypatch) -> FakeActivityRedis:
+    from app.utils import activity
+    from app.utils import auth as auth_utils
+
+    redis = FakeActivityRedis()
+    monkeypatch.setattr(auth_utils, "redis_client", redis)
+    monkeypatch.setattr(activity, "_last_recorded", {})
+    return redis
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app import main
+
+
+@pytest.mark.asyncio
+async def test_lifespan_stops_the_refresher_before_closing_pools(monkeypatch):
+    events = []
+    refreshing = asyncio.Event()
+
+    async def noop(*_args, **_kwargs):
+        return None
+
+    async def refresh(interval_seconds):
+        refreshing.set()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            # An in-flight refresh still holds a session while it unwinds.
+            await asyncio.sleep(0)
+            events.append("refresher stopped")
+
+    async def close_broadcaster():
+        events.append("broadcaster closed")
+
+    async def close_resources():
+        events.append("resources closed")
+
+    monkeypatch.setattr(main, "init_db", noop)
+    monkeypatch.setattr(main, "warm_meme_cache", noop)
+    monkeypatch.setattr(main.resources, "start", noop)
+    monkeypatch.setattr(main.resources, "close", close_resources)
+    monkeypatch.setattr(main.notification_broadcaster, "close", close_broadcaster)
+    monkeypatch.setattr(main, "refresh_statistics_periodically", refresh)
+    monkeypatch.setattr(main.settings, "STATISTICS_REFRESH_INTERVAL_SECONDS", 60)
+
+    async with main.lifespan(main.app):
+        await refreshing.wait()
+
+    assert events == ["refresher stopped", "broadcaster closed", "resources closed"]
@@ -0,0 +1,207 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import redis.asyncio as aioredis
+
+from app.core import resources as resources_module
+from app.core.resources import Resources
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        self.engine.open += 1
+        self.engine.peak = max(self.engine.peak, self.engine.open)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.engine.open -= 1
+
+    async def execute(self, statement):
+        self.engine.queries.append(str(statement))
+
+
+class FakeEngine:
+    def __init__(self):
+        self.open = 0
+        self.peak = 0
+        self.queries = []
+        self.disposed = 0
+
+    def connect(self):
+        return FakeConnection(self)
+
+    async def dispose(self):
+        self.disposed += 1
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.pings = 0
+        self.connection_pool = SimpleNamespace(disconnected=0)
+        self.connection_pool.disconnect = self._disconnect
+
+    def _disconnect(self):
+        self.connection_pool.disconnected += 1
+
+    def ping(self):
+        self.pings += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return True
+
+
+class FakeArqPool:
+    def __init__(self, pool):
+        self.pool = pool
+        self.closed = False
+
+    async def ping(self):
+        return True
+
+    async def aclose(self, close_connection_pool=None):
+        self.closed = close_connection_pool
+
+
+class FakeStorage:
+    def __init__(self):
+        self.ensured = False
+        self.closed = False
+
+    async def ensure_bucket(self):
+        self.ensured = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr("app.db.session.engine", engine)
+    return engine
+
+
+@pytest.fixture
+def arq_pools(monkeypatch):
+    pools = []
+
+    def fake_arq_redis(pool):
+        pools.append(FakeArqPool(pool))
+        return pools[-1]
+
+    monkeypatch.setattr(resources_module, "ArqRedis", fake_arq_redis)
+    return pools
+
+
+def _registry(redis=None):
+    registry = Resources()
+    registry._redis = redis or FakeRedis()
+    registry._storage = FakeStorage()
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_start_warms_every_pool(engine, arq_pools, monkeypatch):
+    monkeypatch.setattr(resources_module.settings, "DB_POOL_WARM_CONNECTIONS", 3)
+    registry = _registry()
+
+    await registry.start()
+
+    assert registry.storage.ensured is True
+    assert engine.peak == 3
+    assert engine.open == 0
+    assert engine.queries == ["SELECT 1"] * 3
+    assert registry.redis.pings == 1
+    assert len(arq_pools) == 1
+    assert await registry.arq_pool() is arq_pools[0]
+
+
+@pytest.mark.asyncio
+async def test_start_without_arq_pool_and_with_redis_down(engine, arq_pools):
+    registry = _registry(FakeRedis(fail=True))
+
+    await registry.start(arq_pool=False)
+
+    assert registry.storage.ensured is True
+    assert registry.redis.pings == 1
+    assert arq_pools == []
+
+
+@pytest.mark.asyncio
+async def test_close_drains_every_pool_once(engine, arq_pools):
+    redis = FakeRedis()
+    registry = _registry(redis)
+    storage = registry.storage
+    await registry.arq_pool()
+
+    await registry.close()
+    await registry.close()
+
+    assert storage.closed is True
+    assert arq_pools[0].closed is True
+    assert redis.connection_pool.disconnected == 1
+    assert engine.disposed == 2
+    assert registry._storage is None and registry._arq is None
+
+
+class StubConnection(aioredis.Connection):
+    """A connection that needs no server: XREAD blocks, the rest succeed."""
+
+    async def connect(self):
+        pass
+
+    async def can_read_destructive(self):
+        return False
+
+    async def send_packed_command(self, command, check_health=True):
+        packed = command if isinstance(command, bytes) else b"".join(command)
+        self._blocking = b"XREAD" in packed
+
+    async def read_response(self, *args, **kwargs):
+        if self._blocking:
+            await asyncio.sleep(0.2)
+            return None
+        return 1
+
+    async def disconnect(self, nowait=False):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_stream_readers_do_not_starve_the_arq_pool(engine, monkeypatch):
+    pool_factory = resources_module._async_pool
+    monkeypatch.setattr(
+        resources_module,
+        "_async_pool",
+        lambda size: pool_factory(size, connection_class=StubConnection),
+    )
+    monkeypatch.setattr(resources_module.settings, "ARQ_MAX_CONNECTIONS", 2)
+    monkeypatch.setattr(resources_module.settings, "TASK_EVENT_MAX_CONNECTIONS", 3)
+    registry = Resources()
+    arq = await registry.arq_pool()
+
+    # More readers than either pool has connections, each blocking on XREAD.
+    readers = [
+        asyncio.create_task(
+            registry.task_events.xread({f"stream-{i}": "0-0"}, block=5000)
+        )
+        for i in range(6)
+    ]
+    await asyncio.sleep(0.05)
+
+    # Job operations get connections right away, more of them than the cap.
+    results = await asyncio.wait_for(
+        asyncio.gather(*(arq.lpush("queue", i) for i in range(5))), timeout=0.1
+    )
+    assert results == [1] * 5
+    assert not any(reader.done() for reader in readers)
+
+    # Readers past the cap wait for a connection instead of failing.
+    assert await asyncio.gather(*readers) == [[]] * 6
+
+    await registry.close()
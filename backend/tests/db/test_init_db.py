@@ -1,4 +1,3 @@
-import subprocess
 from contextlib import asynccontextmanager
 
 import pytest
@@ -17,6 +16,9 @@ class FakeScalarResult:
     def scalar(self):
         return self._value
 
+    def one(self):
+        return self._value
+
 
 class FakeSession:
     def __init__(self, admin_exists=False, course_count=0, meme_count=0):
@@ -47,10 +49,7 @@ class FakeSession:
             return FakeScalarResult(self.admin)
         if self.execute_step == 1:
             self.execute_step += 1
-            return FakeScalarResult(self.course_count)
-        if self.execute_step == 2:
-            self.execute_step += 1
-            return FakeScalarResult(self.meme_count)
+            return FakeScalarResult((self.course_count > 0, self.meme_count > 0))
         raise AssertionError("Unexpected execute call")
 
     def add(self, obj):
@@ -71,8 +70,48 @@ class FakeSession:
         return None
 
 
+@pytest.fixture(autouse=True)
+def reconciled_counters(monkeypatch):
+    sessions = []
+
+    async def fake_reconcile(session):
+        sessions.append(session)
+        return {}
+
+    monkeypatch.setattr(init_db, "reconcile_counters", fake_reconcile)
+    return sessions
+
+
+@pytest.fixture(autouse=True)
+def backfilled_search_vectors(monkeypatch):
+    async def fake_backfill(session):
+        return 0
+
+    monkeypatch.setattr(init_db, "backfill_search_vectors", fake_backfill)
+
+
+@pytest.fixture(autouse=True)
+def migrations(monkeypatch, fake_activity_redis):
+    calls = {"locks": 0, "runs": 0, "result": True}
+
+    @asynccontextmanager
+    async def fake_lock():
+        calls["locks"] += 1
+        yield
+
+    async def fake_run_migrations():
+        calls["runs"] += 1
+        if isinstance(calls["result"], Exception):
+            raise calls["result"]
+        return calls["result"]
+
+    monkeypatch.setattr(init_db, "startup_lock", fake_lock)
+    monkeypatch.setattr(init_db, "run_migrations", fake_run_migrations)
+    return calls
+
+
 @pytest.mark.asyncio
-async def test_init_db_creates_admin_and_seeds(monkeypatch):
+async def test_init_db_creates_admin_and_seeds(monkeypatch, reconciled_counters):
     original_loader = init_db.load_seed_data
     original_loader.cache_clear()
 
@@ -92,11 +131,6 @@ async def test_init_db_creates_admin_and_seeds(monkeypatch):
         ],
     }
 
-    class Result:
-        returncode = 0
-        stdout = ""
-        stderr = ""
-
     fake_session = FakeSession()
 
     @asynccontextmanager
@@ -104,11 +138,6 @@ async def test_init_db_creates_admin_and_seeds(monkeypatch):
         async with fake_session:
             yield fake_session
 
-    monkeypatch.setattr(
-        subprocess,
-        "run",
-        lambda *args, **kwargs: Result(),
-    )
     monkeypatch.setattr(
         init_db,
         "load_seed_data",
@@ -133,19 +162,16 @@ async def test_init_db_creates_admin_and_seeds(monkeypatch):
     }
     assert len(fake_session.added_memes) == 1
     assert fake_session.added_memes[0].content == "Study hard!"
+    assert reconciled_counters == [fake_session]
 
     original_loader.cache_clear()
 
 
 @pytest.mark.asyncio
-async def test_init_db_fallback_when_migration_fails(monkeypatch):
+async def test_init_db_fallback_when_migration_fails(monkeypatch, migrations):
     original_loader = init_db.load_seed_data
     original_loader.cache_clear()
-
-    class FailResult:
-        returncode = 1
-        stdout = ""
-        stderr = "boom"
+    migrations["result"] = RuntimeError("boom")
 
     fake_session = FakeSession(admin_exists=True, course_count=1, meme_count=1)
 
@@ -180,11 +206,6 @@ async def test_init_db_fallback_when_migration_fails(monkeypatch):
 
     tracker = {"create_all": 0}
 
-    monkeypatch.setattr(
-        subprocess,
-        "run",
-        lambda *args, **kwargs: FailResult(),
-    )
     monkeypatch.setattr(
         init_db,
         "load_seed_data",
@@ -208,3 +229,49 @@ async def test_init_db_fallback_when_migration_fails(monkeypatch):
 
     assert tracker["create_all"] == 1
     original_loader.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_init_db_skips_work_when_nothing_changed(
+    monkeypatch, migrations, reconciled_counters, fake_activity_redis
+):
+    migrations["result"] = False
+    fake_session = FakeSession(admin_exists=True, course_count=1, meme_count=1)
+    fake_session.admin.is_admin = True
+    fake_session.admin.password_hash = "stored-hash"
+    fake_activity_redis.set(
+        init_db.ADMIN_FINGERPRINT_KEY,
+        init_db.admin_fingerprint("stored-hash").encode(),
+    )
+
+    @asynccontextmanager
+    async def fake_session_factory():
+        async with fake_session:
+            yield fake_session
+
+    def fail_hash(_password):
+        raise AssertionError("bcrypt should not run")
+
+    monkeypatch.setattr(init_db, "get_password_hash", fail_hash)
+    monkeypatch.setattr(
+        init_db, "AsyncSessionLocal", lambda: fake_session_factory(), raising=False
+    )
+
+    await init_db.init_db()
+
+    assert migrations == {"locks": 1, "runs": 1, "result": False}
+    assert fake_session.commits == 0
+    assert reconciled_counters == []
+
+    # A changed password invalidates the fingerprint and is applied.
+    monkeypatch.setattr(init_db.settings, "DEFAULT_ADMIN_PASSWORD", "rotated")
+    monkeypatch.setattr(init_db, "get_password_hash", lambda password: "new-hash")
+    fake_session.execute_step = 0
+
+    await init_db.init_db()
+
+    assert fake_session.admin.password_hash == "new-hash"
+    assert fake_activity_redis.get(init_db.ADMIN_FINGERPRINT_KEY) == (
+        init_db.admin_fingerprint("new-hash")
+    )
+    assert reconciled_counters == [fake_session]
@@ -0,0 +1,73 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db import migrations
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+
+    async def run_sync(self, fn, *args):
+        return fn(None, *args)
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+class FakeEngine:
+    def __init__(self):
+        self.connection = FakeConnection()
+
+    @asynccontextmanager
+    async def _context(self):
+        yield self.connection
+
+    def begin(self):
+        return self._context()
+
+    def connect(self):
+        return self._context()
+
+
+@pytest.fixture()
+def fake_engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(migrations, "engine", engine)
+    return engine
+
+
+def test_alembic_config_finds_the_scripts():
+    heads = migrations.head_revisions(migrations.alembic_config())
+    assert len(heads) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_skips_upgrade_at_head(monkeypatch, fake_engine):
+    heads = migrations.head_revisions(migrations.alembic_config())
+    upgrades = []
+    monkeypatch.setattr(migrations, "_current_revisions", lambda _conn: set(heads))
+    monkeypatch.setattr(
+        migrations, "_upgrade", lambda _conn, config: upgrades.append(config)
+    )
+
+    assert await migrations.run_migrations() is False
+    assert upgrades == []
+
+    monkeypatch.setattr(migrations, "_current_revisions", lambda _conn: set())
+    assert await migrations.run_migrations() is True
+    assert len(upgrades) == 1
+
+
+@pytest.mark.asyncio
+async def test_startup_lock_releases_after_error(fake_engine):
+    with pytest.raises(RuntimeError):
+        async with migrations.startup_lock():
+            raise RuntimeError("boom")
+
+    statements = [sql for sql, _ in fake_engine.connection.statements]
+    assert statements == [
+        "SELECT pg_advisory_lock(:key)",
+        "SELECT pg_advisory_unlock(:key)",
+    ]
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.models import Archive
+from app.services import bulk
+
+
+def test_unique_ids_keeps_first_occurrence_order():
+    assert bulk.unique_ids([3, 1, 3, 2, 1]) == [3, 1, 2]
+
+
+def test_bulk_result_reports_each_item():
+    result = bulk.bulk_result(
+        [1, 2, 3], succeeded=[1], failures={2: "Cannot delete yourself"}
+    )
+
+    assert (result.succeeded, result.failed) == (1, 2)
+    assert [(item.id, item.success, item.detail) for item in result.results] == [
+        (1, True, None),
+        (2, False, "Cannot delete yourself"),
+        (3, False, "Not found"),
+    ]
+
+
+class FakeResult:
+    def one(self):
+        return 4, 17
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult()
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_archives_is_one_aggregated_update():
+    session = FakeSession()
+
+    count, downloads = await bulk.soft_delete_archives(
+        session, Archive.course_id == 5, deleted_at=datetime.now(timezone.utc)
+    )
+
+    assert (count, downloads) == (4, 17)
+    [statement] = session.statements
+    assert statement.startswith("WITH changed_rows AS \n(UPDATE archives")
+    assert "archives.deleted_at IS NULL" in statement
+    assert "RETURNING archives.download_count" in statement
+
+
+@pytest.mark.asyncio
+async def test_restore_archives_matches_the_cascade_timestamp():
+    session = FakeSession()
+    deleted_at = datetime.now(timezone.utc)
+
+    await bulk.restore_archives(session, Archive.course_id == 5, deleted_at=deleted_at)
+    await bulk.restore_course_discussions(session, [5], deleted_at=deleted_at)
+
+    archives, messages = session.statements
+    assert "WHERE archives.deleted_at = %(deleted_at_1)s" in archives
+    assert "UPDATE archive_discussion_messages SET deleted_at" in messages
+    assert "archive_discussion_messages.deleted_at = %(deleted_at_1)s" in messages
+    assert "FROM changed_rows" in messages
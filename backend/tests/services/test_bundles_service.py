@@ -0,0 +1,140 @@
+import io
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from app.services import bundles
+from app.utils.storage import ObjectStorage
+
+OBJECTS = {
+    "archives/1/a.pdf": b"%PDF-a" * 50,
+    "archives/1/b.pdf": b"%PDF-b" * 70,
+    "archives/1/c.optimized.pdf": b"%PDF-c" * 30,
+}
+
+
+class FakeMinio:
+    def __init__(self, objects):
+        self.objects = objects
+        self.reads = []
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        self.reads.append((object_name, offset, length))
+        data = self.objects[object_name]
+        end = offset + length if length else len(data)
+        return SimpleNamespace(
+            read=io.BytesIO(data[offset:end]).read,
+            close=lambda: None,
+            release_conn=lambda: None,
+        )
+
+    def stat_object(self, bucket_name, object_name):
+        return SimpleNamespace(
+            size=len(self.objects[object_name]),
+            etag=f"etag-{object_name}",
+            content_type="application/pdf",
+            last_modified=None,
+        )
+
+
+def _archive(archive_id, object_name, name, optimized=None):
+    return SimpleNamespace(
+        id=archive_id,
+        object_name=object_name,
+        optimized_object_name=optimized,
+        academic_year=112,
+        professor="王/教授",
+        name=name,
+    )
+
+
+async def _collect(manifest, storage, start, end):
+    return b"".join(
+        [chunk async for chunk in bundles.iter_bundle(manifest, storage, start, end)]
+    )
+
+
+@pytest.fixture()
+def storage():
+    object_storage = ObjectStorage(FakeMinio(OBJECTS))
+    yield object_storage
+    object_storage.close()
+
+
+@pytest_asyncio.fixture()
+async def manifest(storage, fake_activity_redis):
+    course = SimpleNamespace(id=1, name="微積分")
+    archives = [
+        _archive(1, "archives/1/a.pdf", "期中考"),
+        _archive(2, "archives/1/b.pdf", "期中考"),
+        _archive(3, "archives/1/c.pdf", "期末考", "archives/1/c.optimized.pdf"),
+    ]
+    return await bundles.create_bundle(storage, course, archives)
+
+
+@pytest.mark.asyncio
+async def test_bundle_streams_a_valid_zip(manifest, storage, fake_activity_redis):
+    loaded = bundles.load_bundle(manifest.id)
+    assert loaded.entries == manifest.entries
+    assert loaded.filename == "微積分.zip"
+
+    data = await _collect(loaded, storage, 0, manifest.layout.total_size - 1)
+    assert len(data) == manifest.layout.total_size
+
+    with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+        assert bundle.testzip() is None
+        assert bundle.namelist() == [
+            "112_微積分_王_教授_期中考.pdf",
+            "112_微積分_王_教授_期中考 (2).pdf",
+            "112_微積分_王_教授_期末考.pdf",
+        ]
+        assert bundle.read(bundle.namelist()[2]) == OBJECTS["archives/1/c.optimized.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_bundle_ranges_match_the_full_archive(
+    manifest, storage, fake_activity_redis
+):
+    size = manifest.layout.total_size
+    full = await _collect(manifest, storage, 0, size - 1)
+
+    # Without stored CRCs the tail still comes out right: objects are re-read.
+    fake_activity_redis.hashes.clear()
+    assert await _collect(manifest, storage, size - 200, size - 1) == full[-200:]
+
+    for start, end in [(0, 10), (40, 400), (350, 900), (size - 23, size - 1)]:
+        assert await _collect(manifest, storage, start, end) == full[start : end + 1]
+
+
+@pytest.mark.asyncio
+async def test_bundle_resume_reuses_stored_crcs(manifest, storage, fake_activity_redis):
+    size = manifest.layout.total_size
+    first_entry_end = manifest.layout.entry_end(0)
+    await _collect(manifest, storage, 0, first_entry_end - 1)
+
+    fake = storage.client
+    fake.reads.clear()
+    await _collect(manifest, storage, first_entry_end, size - 1)
+
+    # The first object's CRC came from the interrupted download.
+    assert [name for name, _, _ in fake.reads] == [
+        "archives/1/b.pdf",
+        "archives/1/c.optimized.pdf",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_create_bundle_rejects_empty_and_oversized(
+    storage, fake_activity_redis, monkeypatch
+):
+    course = SimpleNamespace(id=1, name="微積分")
+    with pytest.raises(bundles.BundleError):
+        await bundles.create_bundle(storage, course, [])
+
+    monkeypatch.setattr(bundles.settings, "ARCHIVE_BUNDLE_MAX_BYTES", 10)
+    with pytest.raises(bundles.BundleError):
+        await bundles.create_bundle(
+            storage, course, [_archive(1, "archives/1/a.pdf", "期中考")]
+        )
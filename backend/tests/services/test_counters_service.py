@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.main import app
+from app.models.models import SystemCounter, UserRoles
+from app.services import counters
+from app.utils.auth import get_current_user
+
+
+async def _stored_counters(session) -> dict[str, int]:
+    result = await session.execute(select(SystemCounter.name, SystemCounter.value))
+    return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_reconcile_counters_corrects_drift(session_maker):
+    async with session_maker() as session:
+        await counters.reconcile_counters(session)
+        before = await _stored_counters(session)
+
+        await counters.bump_counters(session, users=3, downloads=-2)
+        await session.commit()
+        bumped = await _stored_counters(session)
+        assert bumped[counters.USERS] == before[counters.USERS] + 3
+        assert bumped[counters.DOWNLOADS] == before[counters.DOWNLOADS] - 2
+        assert bumped[counters.ARCHIVES] == before[counters.ARCHIVES]
+
+        drift = await counters.reconcile_counters(session)
+
+        assert drift == {
+            counters.USERS: -3,
+            counters.COURSES: 0,
+            counters.ARCHIVES: 0,
+            counters.DOWNLOADS: 2,
+        }
+        assert await _stored_counters(session) == before
+
+
+@pytest.mark.asyncio
+async def test_user_write_paths_keep_counter_in_step(session_maker, client):
+    async with session_maker() as session:
+        await counters.reconcile_counters(session)
+        before = (await _stored_counters(session))[counters.USERS]
+
+    unique_suffix = uuid.uuid4().hex[:8]
+    app.dependency_overrides[get_current_user] = lambda: UserRoles(
+        user_id=1,
+        is_admin=True,
+    )
+    try:
+        response = await client.post(
+            "/users/admin/users",
+            json={
+                "name": f"counter-user-{unique_suffix}",
+                "email": f"counter-{unique_suffix}@smail.nchu.edu.tw",
+                "password": "StrongPass123",
+                "is_admin": False,
+            },
+        )
+        assert response.status_code == 200
+        created_id = response.json()["id"]
+
+        async with session_maker() as session:
+            assert (await _stored_counters(session))[counters.USERS] == before + 1
+
+        response = await client.delete(f"/users/admin/users/{created_id}")
+        assert response.status_code == 200
+
+        async with session_maker() as session:
+            assert (await _stored_counters(session))[counters.USERS] == before
+            assert await counters.reconcile_counters(session) == {
+                name: 0 for name in counters.COUNTER_NAMES
+            }
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,341 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.genai import errors as genai_errors
+
+from app.services import gemini
+
+
+def _api_error(cls, code: int, status: str, message: str):
+    return cls(code, {"error": {"code": code, "status": status, "message": message}})
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(gemini, "_breakers", {})
+    monkeypatch.setattr(gemini, "_key_validations", {})
+    monkeypatch.setattr(gemini, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(gemini.settings, "GEMINI_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(gemini.settings, "GEMINI_CIRCUIT_FAILURE_THRESHOLD", 5)
+
+
+@pytest.mark.parametrize(
+    ("exc", "kind"),
+    [
+        (
+            _api_error(genai_errors.ClientError, 429, "RESOURCE_EXHAUSTED", "quota"),
+            gemini.GeminiErrorKind.RATE_LIMITED,
+        ),
+        (
+            _api_error(genai_errors.ServerError, 503, "UNAVAILABLE", "overloaded"),
+            gemini.GeminiErrorKind.SERVER_ERROR,
+        ),
+        (
+            _api_error(
+                genai_errors.ClientError,
+                400,
+                "INVALID_ARGUMENT",
+                "API key not valid. Please pass a valid API key.",
+            ),
+            gemini.GeminiErrorKind.INVALID_KEY,
+        ),
+        (asyncio.TimeoutError(), gemini.GeminiErrorKind.TIMEOUT),
+        (ValueError("bad prompt"), gemini.GeminiErrorKind.OTHER),
+    ],
+)
+def test_classify_gemini_error(exc, kind):
+    assert gemini.classify_gemini_error(exc) == kind
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_recovers_from_transient_errors():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _api_error(genai_errors.ServerError, 503, "UNAVAILABLE", "busy")
+        return "ok"
+
+    assert await gemini.call_with_retry(operation, api_key="key") == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_does_not_retry_invalid_key():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        raise _api_error(genai_errors.ClientError, 401, "UNAUTHENTICATED", "no")
+
+    with pytest.raises(genai_errors.ClientError):
+        await gemini.call_with_retry(operation, api_key="key")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_respects_can_retry_veto():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        raise asyncio.TimeoutError()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await gemini.call_with_retry(
+            operation, api_key="key", can_retry=lambda: False
+        )
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_per_api_key(monkeypatch):
+    monkeypatch.setattr(gemini.settings, "GEMINI_CIRCUIT_FAILURE_THRESHOLD", 3)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise _api_error(genai_errors.ServerError, 500, "INTERNAL", "down")
+
+    with pytest.raises(genai_errors.ServerError):
+        await gemini.call_with_retry(failing, api_key="key-a")
+    assert len(calls) == 3
+
+    with pytest.raises(gemini.CircuitOpenError):
+        await gemini.call_with_retry(failing, api_key="key-a")
+    assert len(calls) == 3
+
+    async def healthy():
+        return "ok"
+
+    assert await gemini.call_with_retry(healthy, api_key="key-b") == "ok"
+
+
+def test_circuit_breaker_half_opens_after_reset():
+    now = [0.0]
+    breaker = gemini.CircuitBreaker(
+        failure_threshold=1, reset_seconds=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+    with pytest.raises(gemini.CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 11.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.is_open is False
+
+
+def test_circuit_breaker_admits_one_probe_when_half_open():
+    now = [0.0]
+    breaker = gemini.CircuitBreaker(
+        failure_threshold=3, reset_seconds=10, clock=lambda: now[0]
+    )
+    for _ in range(3):
+        breaker.record_failure()
+
+    now[0] = 11.0
+    breaker.before_call()
+    with pytest.raises(gemini.CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe re-opens the circuit at once, below the threshold.
+    breaker.record_failure()
+    now[0] = 15.0
+    with pytest.raises(gemini.CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 22.0
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+
+def test_circuit_breaker_frees_an_abandoned_probe():
+    now = [0.0]
+    breaker = gemini.CircuitBreaker(
+        failure_threshold=1, reset_seconds=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+
+    now[0] = 11.0
+    breaker.before_call()
+    now[0] = 20.0
+    with pytest.raises(gemini.CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 22.0
+    breaker.before_call()
+    breaker.release_probe()
+    breaker.before_call()
+
+
+@pytest.mark.asyncio
+async def test_half_open_circuit_lets_one_concurrent_caller_through(monkeypatch):
+    monkeypatch.setattr(gemini.settings, "GEMINI_CIRCUIT_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(gemini.settings, "GEMINI_MAX_ATTEMPTS", 1)
+    now = [0.0]
+    breaker = gemini.CircuitBreaker(
+        failure_threshold=1, reset_seconds=10, clock=lambda: now[0]
+    )
+    monkeypatch.setattr(
+        gemini, "_breakers", {gemini.api_key_fingerprint("k"): breaker}
+    )
+    breaker.record_failure()
+    now[0] = 11.0
+    release = asyncio.Event()
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        await release.wait()
+        return "ok"
+
+    callers = [
+        asyncio.create_task(gemini.call_with_retry(probe, api_key="k"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert len(calls) == 1
+    assert results.count("ok") == 1
+    assert all(
+        isinstance(result, gemini.CircuitOpenError)
+        for result in results
+        if result != "ok"
+    )
+    assert breaker.is_open is False
+
+
+class _FakeModelsClient:
+    def __init__(self, error=None, delay=0):
+        self.error = error
+        self.delay = delay
+        self.calls = []
+        self.aio = self
+
+    @property
+    def models(self):
+        return self
+
+    async def get(self, *, model):
+        self.calls.append(model)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"name": model}
+
+
+@pytest.mark.asyncio
+async def test_validate_api_key_caches_result_by_fingerprint(monkeypatch):
+    fake = _FakeModelsClient()
+    monkeypatch.setattr(gemini, "create_gemini_client", lambda api_key: fake)
+
+    await gemini.validate_api_key("good-key")
+    await gemini.validate_api_key("good-key")
+
+    assert fake.calls == [gemini.settings.GEMINI_MODEL]
+    assert gemini.get_cached_key_validation("good-key") == (True, None)
+    assert "good-key" not in repr(gemini._key_validations)
+
+
+@pytest.mark.asyncio
+async def test_validate_api_key_caches_rejection(monkeypatch):
+    fake = _FakeModelsClient(
+        error=_api_error(
+            genai_errors.ClientError, 400, "INVALID_ARGUMENT", "API key not valid."
+        )
+    )
+    monkeypatch.setattr(gemini, "create_gemini_client", lambda api_key: fake)
+
+    for _ in range(2):
+        with pytest.raises(gemini.InvalidApiKeyError):
+            await gemini.validate_api_key("bad-key")
+    assert len(fake.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_validate_api_key_times_out_without_caching(monkeypatch):
+    monkeypatch.setattr(gemini.settings, "GEMINI_KEY_VALIDATION_TIMEOUT_SECONDS", 0.01)
+    fake = _FakeModelsClient(delay=1)
+    monkeypatch.setattr(gemini, "create_gemini_client", lambda api_key: fake)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await gemini.validate_api_key("slow-key")
+    assert gemini.get_cached_key_validation("slow-key") is None
+
+
+class _FakeGenAIHandler(BaseHTTPRequestHandler):
+    responses: list[tuple[int, str]] = []
+    paths: list[str] = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        type(self).paths.append(self.path)
+        status, body = type(self).responses.pop(0)
+        self.send_response(status)
+        if status == 200:
+            self.send_header("content-type", "text/event-stream")
+        else:
+            self.send_header("content-type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *_args):
+        pass
+
+
+def _sse_chunk(text: str) -> str:
+    payload = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+    return f"data: {json.dumps(payload)}\r\n\r\n"
+
+
+@pytest.fixture
+def fake_genai_server(monkeypatch):
+    _FakeGenAIHandler.responses = []
+    _FakeGenAIHandler.paths = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        gemini.settings,
+        "GEMINI_BASE_URL",
+        f"http://127.0.0.1:{server.server_address[1]}",
+    )
+    try:
+        yield _FakeGenAIHandler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_streaming_retry_against_fake_genai_server(fake_genai_server):
+    error = {"error": {"code": 503, "status": "UNAVAILABLE", "message": "busy"}}
+    fake_genai_server.responses = [
+        (503, json.dumps(error)),
+        (200, _sse_chunk("Hello ") + _sse_chunk("exam")),
+    ]
+    client = gemini.create_gemini_client("fake-key")
+    received = []
+
+    async def generate():
+        stream = await client.aio.models.generate_content_stream(
+            model="gemini-2.5-flash", contents="Hi"
+        )
+        async for chunk in stream:
+            received.append(chunk.text)
+
+    await gemini.call_with_retry(generate, api_key="fake-key")
+
+    assert received == ["Hello ", "exam"]
+    assert len(fake_genai_server.paths) == 2
+    assert all("streamGenerateContent" in path for path in fake_genai_server.paths)
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models.models import Meme, MemeRead
+from app.services import memes
+
+
+class FakeResult:
+    def __init__(self, row=None, rows=None, scalar=None):
+        self._row = row
+        self._rows = rows or []
+        self._scalar = scalar
+
+    def one(self):
+        return self._row
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar_one_or_none(self):
+        return self._scalar
+
+
+class FakeSession:
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(
+            str(statement.compile(dialect=postgresql.dialect()))
+        )
+        return self.results.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def clear_meme_cache():
+    memes.meme_cache.clear()
+    yield
+    memes.meme_cache.clear()
+
+
+def _meme(meme_id, language):
+    return Meme(id=meme_id, content=f"meme {meme_id}", language=language)
+
+
+@pytest.mark.asyncio
+async def test_pick_is_served_from_memory_and_filters_language():
+    session = FakeSession(
+        [
+            FakeResult(row=(3, 3)),
+            FakeResult(rows=[_meme(1, "zh"), _meme(2, "en"), _meme(3, "en")]),
+        ]
+    )
+
+    picks = {(await memes.pick_random_meme(session, "en")).id for _ in range(50)}
+    assert picks <= {2, 3}
+    assert (await memes.pick_random_meme(session, "zh")).id == 1
+    assert await memes.pick_random_meme(session, "fr") is None
+    assert isinstance(await memes.pick_random_meme(session), MemeRead)
+    assert len(session.statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_unchanged_table_keeps_the_current_corpus():
+    current = memes.MemeCorpus((1, 7), (MemeRead(id=7, content="x", language="en"),))
+    session = FakeSession([FakeResult(row=(1, 7))])
+
+    assert await memes.load_meme_corpus(session, current) is current
+    assert len(session.statements) == 1
+
+    session = FakeSession(
+        [FakeResult(row=(2, 8)), FakeResult(rows=[_meme(7, "en"), _meme(8, "en")])]
+    )
+    reloaded = await memes.load_meme_corpus(session, current)
+    assert [meme.id for meme in reloaded.memes] == [7, 8]
+
+
+@pytest.mark.asyncio
+async def test_large_table_falls_back_to_random_id_seek(monkeypatch):
+    monkeypatch.setattr(settings, "MEME_CACHE_MAX_ITEMS", 1)
+    session = FakeSession(
+        [
+            FakeResult(row=(5, 10)),
+            FakeResult(row=(1, 10)),
+            FakeResult(scalar=_meme(4, "en")),
+        ]
+    )
+
+    meme = await memes.pick_random_meme(session, "en")
+
+    assert meme.id == 4
+    assert "random" not in session.statements[2].lower()
+    assert "memes.id >= %(id_1)s" in session.statements[2]
+    assert "memes.language = %(language_1)s" in session.statements[2]
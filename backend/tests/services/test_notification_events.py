@@ -0,0 +1,213 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import notification_events as events
+
+
+class FakeStreamRedis:
+    """Sync-or-async stand-in for the stream and Pub/Sub commands used."""
+
+    def __init__(self):
+        self.entries: list[tuple[bytes, dict]] = []
+        self.published: list[tuple[str, str]] = []
+        self.seq = 0
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.seq += 1
+        entry_id = f"{1000 + self.seq}-0".encode()
+        self.entries.append(
+            (entry_id, {k.encode(): str(v).encode() for k, v in fields.items()})
+        )
+        return entry_id
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def aclose(self):
+        pass
+
+    async def xrevrange(self, name, count=None):
+        return list(reversed(self.entries))[:count]
+
+    async def xrange(self, name, min="-", count=None):
+        selected = [
+            entry
+            for entry in self.entries
+            if min == "-"
+            or events.parse_event_id(entry[0].decode())
+            >= events.parse_event_id(min)
+        ]
+        return selected[:count] if count else selected
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    async def no_listen(self):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(events.NotificationBroadcaster, "_listen", no_listen)
+    monkeypatch.setattr(events.settings, "NOTIFICATION_STREAM_KEEPALIVE_SECONDS", 0.05)
+    instance = events.NotificationBroadcaster("redis://unused")
+    instance._redis = FakeStreamRedis()
+    return instance
+
+
+def _parse(chunk: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def _never_disconnected():
+    return False
+
+
+def test_publish_notification_event_records_and_broadcasts():
+    redis = FakeStreamRedis()
+
+    event = events.publish_notification_event(
+        redis, "created", 7, {"id": 7, "title": "Hi"}
+    )
+
+    assert event == {
+        "id": "1001-0",
+        "type": "created",
+        "notification_id": 7,
+        "notification": {"id": 7, "title": "Hi"},
+    }
+    assert redis.published == [
+        (events.NOTIFICATION_EVENTS_CHANNEL, json.dumps(event))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_ready_then_live_events(broadcaster):
+    events.publish_notification_event(broadcaster.redis, "created", 1, {"id": 1})
+    stream = events.notification_event_stream(broadcaster, _never_disconnected)
+
+    ready = _parse(await stream.__anext__())
+    assert ready["event"] == "ready"
+    assert ready["id"] == "1001-0"
+
+    stale = {"id": "1001-0", "type": "created", "notification_id": 1}
+    live = events.publish_notification_event(broadcaster.redis, "deleted", 1)
+    broadcaster.dispatch(stale)
+    broadcaster.dispatch(live)
+
+    chunk = _parse(await stream.__anext__())
+    assert chunk["event"] == "notification"
+    assert chunk["id"] == "1002-0"
+    assert chunk["data"]["type"] == "deleted"
+
+    assert await stream.__anext__() == ": keepalive\n\n"
+    await stream.aclose()
+    assert not broadcaster._subscriptions
+    await broadcaster.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_from_last_event_id(broadcaster):
+    for notification_id in (1, 2, 3):
+        events.publish_notification_event(
+            broadcaster.redis, "updated", notification_id, {"id": notification_id}
+        )
+
+    stream = events.notification_event_stream(
+        broadcaster, _never_disconnected, last_event_id="1001-0"
+    )
+    replayed = [_parse(await stream.__anext__()) for _ in range(2)]
+
+    assert [chunk["id"] for chunk in replayed] == ["1002-0", "1003-0"]
+    assert [chunk["data"]["notification_id"] for chunk in replayed] == [2, 3]
+    await stream.aclose()
+    await broadcaster.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_when_gap_was_trimmed(broadcaster):
+    for notification_id in (1, 2):
+        events.publish_notification_event(broadcaster.redis, "created", notification_id)
+    broadcaster.redis.entries.pop(0)
+
+    stream = events.notification_event_stream(
+        broadcaster, _never_disconnected, last_event_id="999-0"
+    )
+    chunk = _parse(await stream.__anext__())
+
+    assert chunk["event"] == "reset"
+    assert chunk["id"] == "1002-0"
+    await stream.aclose()
+    await broadcaster.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped(broadcaster, monkeypatch):
+    monkeypatch.setattr(events.settings, "NOTIFICATION_STREAM_QUEUE_SIZE", 1)
+    subscription = broadcaster.subscribe()
+
+    broadcaster.dispatch({"id": "1-0"})
+    broadcaster.dispatch({"id": "2-0"})
+
+    assert subscription.overflowed is True
+    assert subscription not in broadcaster._subscriptions
+    await broadcaster.close()
+
+
+class DroppingPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.redis.open += 1
+        self.redis.peak = max(self.redis.peak, self.redis.open)
+
+    async def listen(self):
+        if len(self.redis.pubsubs) == 3:
+            yield {"type": "message", "data": json.dumps({"id": "1-0"})}
+            await asyncio.Event().wait()
+        raise ConnectionError("connection lost")
+        yield
+
+    async def aclose(self):
+        self.closed = True
+        self.redis.open -= 1
+
+
+class PubSubRedis:
+    def __init__(self):
+        self.pubsubs: list[DroppingPubSub] = []
+        self.open = 0
+        self.peak = 0
+
+    def pubsub(self):
+        self.pubsubs.append(DroppingPubSub(self))
+        return self.pubsubs[-1]
+
+    async def aclose(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_listener_closes_each_pubsub_before_reconnecting(monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def no_backoff(delay):
+        await real_sleep(0)
+
+    monkeypatch.setattr(events.asyncio, "sleep", no_backoff)
+    broadcaster = events.NotificationBroadcaster("redis://unused")
+    redis = broadcaster._redis = PubSubRedis()
+    subscription = broadcaster.subscribe()
+
+    received = [
+        await asyncio.wait_for(subscription.queue.get(), 1) for _ in range(3)
+    ]
+    assert received == [events.RESYNC, events.RESYNC, {"id": "1-0"}]
+    assert [pubsub.closed for pubsub in redis.pubsubs] == [True, True, False]
+    assert redis.peak == 1
+
+    await broadcaster.close()
+    assert redis.pubsubs[-1].closed is True
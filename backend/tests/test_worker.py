@@ -1,13 +1,27 @@
+import asyncio
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
+from sqlalchemy import delete
+from sqlmodel import select
+
+from google.genai import errors as genai_errors
 
 from app import worker
+from app.core.resources import Resources
+from app.models.models import Archive, ArchiveType, Course, CourseCategory
+from app.services import gemini
+from app.utils.storage import ObjectStorage
 
 
 class FakeSession:
     def __init__(self, results):
         self._results = results
+        self.queries = []
 
     async def __aenter__(self):
         return self
@@ -15,11 +29,15 @@ class FakeSession:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    async def execute(self, _query):
+    async def execute(self, query):
+        self.queries.append(query)
         if not self._results:
             raise AssertionError("No more results configured")
         return self._results.pop(0)
 
+    async def commit(self):
+        return None
+
 
 class FakeObject:
     def __init__(self, data: bytes):
@@ -38,19 +56,33 @@ class FakeObject:
 
 
 class FakeMinio:
-    def __init__(self):
+    def __init__(self, objects: dict[str, bytes] | None = None):
         self.requests: list[tuple[str, str]] = []
+        self.objects = objects or {}
+        self.puts: dict[str, bytes] = {}
 
     def get_object(self, bucket_name, object_name):
         self.requests.append((bucket_name, object_name))
-        return FakeObject(b"%PDF-1.4 fake data")
+        return FakeObject(self.objects.get(object_name, b"%PDF-1.4 fake data"))
+
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        self.puts[object_name] = data.read()
 
 
 class FakeGenAIClient:
-    def __init__(self, should_fail: bool = False):
+    def __init__(
+        self,
+        should_fail: bool = False,
+        chunks: tuple[str, ...] = ("Generated ", "exam content"),
+        transient_failures: int = 0,
+    ):
         self.should_fail = should_fail
+        self.transient_failures = transient_failures
+        self.generate_calls = 0
+        self.chunks = chunks
         self.uploads: list[bytes] = []
         self.deleted: list[str] = []
+        self.delete_threads: set[int] = set()
         self.last_contents = None
 
         client = self
@@ -62,17 +94,28 @@ class FakeGenAIClient:
                 return SimpleNamespace(name=f"uploaded-{len(client.uploads)}")
 
             def delete(self_inner, *, name):
+                client.delete_threads.add(threading.get_ident())
                 client.deleted.append(name)
 
-        class Models:
-            def generate_content(self_inner, *, model, contents, config):
+        class AsyncModels:
+            async def generate_content_stream(self_inner, *, model, contents, config):
                 client.last_contents = contents
+                client.generate_calls += 1
                 if client.should_fail:
                     raise RuntimeError("generation failed")
-                return SimpleNamespace(text="Generated exam content")
+                if client.generate_calls <= client.transient_failures:
+                    raise genai_errors.ServerError(
+                        503, {"error": {"code": 503, "status": "UNAVAILABLE"}}
+                    )
+
+                async def stream():
+                    for text in client.chunks:
+                        yield SimpleNamespace(text=text)
+
+                return stream()
 
         self.files = Files()
-        self.models = Models()
+        self.aio = SimpleNamespace(models=AsyncModels())
 
 
 def _user_result(user):
@@ -90,6 +133,8 @@ async def test_generate_exam_content_success(monkeypatch):
         id=1,
         name="Midterm",
         object_name="archives/1.pdf",
+        compact_object_name=None,
+        optimized_object_name=None,
         professor="Prof X",
         academic_year=2024,
         archive_type="final",
@@ -113,10 +158,10 @@ async def test_generate_exam_content_success(monkeypatch):
     )
 
     fake_minio = FakeMinio()
-    monkeypatch.setattr(worker, "get_minio_client", lambda: fake_minio)
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
 
     fake_client = FakeGenAIClient()
-    monkeypatch.setattr(worker.genai, "Client", lambda api_key: fake_client)
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
 
     result = await worker.generate_exam_content(
         archive_ids=[1],
@@ -127,14 +172,581 @@ async def test_generate_exam_content_success(monkeypatch):
 
     assert result["success"] is True
     assert result["generated_content"].startswith("⚠️ 注意事項")
+    assert result["generated_content"].endswith("Generated exam content")
     assert len(result["archives_used"]) == 1
     assert fake_client.uploads
     assert fake_client.deleted == ["uploaded-1"]
+    assert threading.get_ident() not in fake_client.delete_threads
     assert fake_minio.requests == [
         (worker.settings.MINIO_BUCKET_NAME, "archives/1.pdf")
     ]
 
 
+@pytest.mark.asyncio
+async def test_generate_exam_content_streams_chunks(monkeypatch):
+    user = SimpleNamespace(gemini_api_key="API_KEY")
+    archive = SimpleNamespace(
+        id=1,
+        name="Midterm",
+        object_name="archives/1.pdf",
+        compact_object_name=None,
+        optimized_object_name=None,
+        professor="Prof X",
+        academic_year=2024,
+        archive_type="final",
+        deleted_at=None,
+    )
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [_user_result(user), _archives_result([(archive, course)])]
+    )
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(FakeMinio()))
+
+    fake_client = FakeGenAIClient(chunks=("Q1. ", "", "Q2."))
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    received: list[str] = []
+
+    async def on_chunk(text):
+        received.append(text)
+
+    result = await worker.generate_exam_content(
+        archive_ids=[1],
+        user_id=7,
+        on_chunk=on_chunk,
+    )
+
+    assert received[0].startswith("⚠️ 注意事項")
+    assert received[1:] == ["Q1. ", "Q2."]
+    assert result["generated_content"] == "".join(received)
+
+
+@pytest.mark.asyncio
+async def test_generate_exam_content_retries_generation_keeping_uploads(monkeypatch):
+    user = SimpleNamespace(gemini_api_key="RETRY_KEY")
+    archive = SimpleNamespace(
+        id=1,
+        name="Midterm",
+        object_name="archives/1.pdf",
+        compact_object_name=None,
+        optimized_object_name=None,
+        professor="Prof X",
+        academic_year=2024,
+        archive_type="final",
+        deleted_at=None,
+    )
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [_user_result(user), _archives_result([(archive, course)])]
+    )
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(FakeMinio()))
+    monkeypatch.setattr(gemini, "_breakers", {})
+    monkeypatch.setattr(gemini, "backoff_delay", lambda attempt: 0)
+
+    fake_client = FakeGenAIClient(transient_failures=2)
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    result = await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert result["generated_content"].endswith("Generated exam content")
+    assert fake_client.generate_calls == 3
+    assert len(fake_client.uploads) == 1
+    assert fake_client.deleted == ["uploaded-1"]
+
+
+@pytest.mark.asyncio
+async def test_generate_exam_content_deletes_uploads_that_outlive_a_timeout(
+    monkeypatch,
+):
+    user = SimpleNamespace(gemini_api_key="SLOW_UPLOAD_KEY")
+    archive = SimpleNamespace(
+        id=1,
+        name="Midterm",
+        object_name="archives/1.pdf",
+        compact_object_name=None,
+        optimized_object_name=None,
+        professor="Prof X",
+        academic_year=2024,
+        archive_type="final",
+        deleted_at=None,
+    )
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [_user_result(user), _archives_result([(archive, course)])]
+    )
+    monkeypatch.setattr(
+        worker,
+        "AsyncSession",
+        lambda *_args, **_kwargs: fake_session,
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(FakeMinio()))
+    monkeypatch.setattr(worker.settings, "GEMINI_REQUEST_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(gemini, "_breakers", {})
+    monkeypatch.setattr(gemini, "backoff_delay", lambda attempt: 0)
+
+    fake_client = FakeGenAIClient()
+    fast_upload = fake_client.files.upload
+    first_upload_done = threading.Event()
+
+    def slow_first_upload(*, file, config):
+        if not fake_client.uploads:
+            uploaded = fast_upload(file=file, config=config)
+            time.sleep(0.2)
+            first_upload_done.set()
+            return uploaded
+        return fast_upload(file=file, config=config)
+
+    fake_client.files.upload = slow_first_upload
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    result = await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert result["success"] is True
+    assert len(fake_client.uploads) == 2
+    assert fake_client.last_contents[0].name == "uploaded-2"
+    assert await asyncio.to_thread(first_upload_done.wait, 1)
+    for _ in range(50):
+        if "uploaded-1" in fake_client.deleted:
+            break
+        await asyncio.sleep(0.01)
+    assert sorted(fake_client.deleted) == ["uploaded-1", "uploaded-2"]
+
+
+def _archive(**overrides):
+    base = {
+        "id": 1,
+        "name": "Midterm",
+        "object_name": "archives/1/exam.pdf",
+        "compact_object_name": None,
+        "optimized_object_name": None,
+        "professor": "Prof X",
+        "academic_year": 2024,
+        "archive_type": "final",
+        "deleted_at": None,
+        "previews_generated_at": None,
+        "previews_failed_at": None,
+    }
+    base.update(overrides)
+    return SimpleNamespace(**base)
+
+
+@pytest.mark.asyncio
+async def test_generate_exam_content_prefers_compact_copy(monkeypatch):
+    archive = _archive(compact_object_name="archives/1/exam.compact.pdf")
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [
+            _user_result(SimpleNamespace(gemini_api_key="KEY")),
+            _archives_result([(archive, course)]),
+        ]
+    )
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    fake_minio = FakeMinio({"archives/1/exam.compact.pdf": b"%PDF compact"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+    fake_client = FakeGenAIClient()
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert [name for _, name in fake_minio.requests] == [
+        "archives/1/exam.compact.pdf"
+    ]
+    assert fake_client.uploads == [b"%PDF compact"]
+
+
+@pytest.mark.asyncio
+async def test_generate_exam_content_preprocesses_lazily(monkeypatch):
+    archive = _archive()
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [
+            _user_result(SimpleNamespace(gemini_api_key="KEY")),
+            _archives_result([(archive, course)]),
+            SimpleNamespace(),
+        ]
+    )
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    monkeypatch.setattr(worker.settings, "AI_EXAM_PREPROCESS_PDFS", True)
+    monkeypatch.setattr(
+        worker,
+        "compact_pdf",
+        lambda data: {"data": b"%PDF small", "pages_total": 4, "pages_kept": 2},
+    )
+    fake_minio = FakeMinio()
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+    fake_client = FakeGenAIClient()
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert fake_minio.puts == {"archives/1/exam.compact.pdf": b"%PDF small"}
+    assert archive.compact_object_name == "archives/1/exam.compact.pdf"
+    assert fake_client.uploads == [b"%PDF small"]
+
+
+@pytest.mark.asyncio
+async def test_store_helpers_keep_caller_objects_loaded(
+    session_maker, make_user, monkeypatch
+):
+    """On a real session, committing in a helper must not expire the rows
+    the caller goes on reading, or the next attribute access lazy-loads
+    outside the greenlet and raises MissingGreenlet."""
+    from app.db import session as db_session
+
+    user = await make_user()
+    async with session_maker() as setup:
+        course = Course(
+            name=f"Worker {uuid.uuid4().hex[:8]}", category=CourseCategory.FRESHMAN
+        )
+        setup.add(course)
+        await setup.commit()
+        await setup.refresh(course)
+        archive = Archive(
+            name="Exam",
+            academic_year=2024,
+            archive_type=ArchiveType.FINAL,
+            professor="Prof",
+            has_answers=False,
+            object_name="archives/1/exam.pdf",
+            uploader_id=user.id,
+            course_id=course.id,
+        )
+        setup.add(archive)
+        await setup.commit()
+        archive_id, course_id, course_name = archive.id, course.id, course.name
+
+    monkeypatch.setattr(worker, "engine", db_session.engine)
+    monkeypatch.setattr(
+        worker,
+        "compact_pdf",
+        lambda data: {"data": b"%PDF s", "pages_total": 2, "pages_kept": 1},
+    )
+    monkeypatch.setattr(worker, "optimize_pdf", lambda data, dpi, quality: b"%PDF o")
+    monkeypatch.setattr(
+        worker, "render_first_page", lambda data, widths, quality: {"thumb": b"w"}
+    )
+    storage = ObjectStorage(FakeMinio())
+    try:
+        async with worker._session() as db:
+            archive, course = (
+                await db.execute(
+                    select(Archive, Course)
+                    .join(Course)
+                    .where(Archive.id == archive_id)
+                )
+            ).one()
+
+            await worker.store_compact_archive(db, storage, archive, b"%PDF original")
+            assert (archive.id, archive.name, course.name) == (
+                archive_id,
+                "Exam",
+                course_name,
+            )
+            await worker.store_optimized_archive(db, storage, archive, b"%PDF original")
+            await worker.store_archive_previews(db, storage, archive, b"%PDF original")
+            assert archive.object_name == "archives/1/exam.pdf"
+            assert archive.previews_generated_at is not None
+    finally:
+        async with session_maker() as cleanup:
+            await cleanup.execute(delete(Archive).where(Archive.id == archive_id))
+            await cleanup.execute(delete(Course).where(Course.id == course_id))
+            await cleanup.commit()
+
+
+@pytest.mark.asyncio
+async def test_preprocess_archive_task_skips_already_compacted(monkeypatch):
+    archive = _archive(compact_object_name="archives/1/exam.compact.pdf")
+    fake_session = FakeSession([_user_result(archive)])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+
+    assert await worker.preprocess_archive_task({}, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_preprocess_archive_task_stores_compact_copy(monkeypatch):
+    archive = _archive()
+    fake_session = FakeSession([_user_result(archive), SimpleNamespace()])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(
+        worker,
+        "compact_pdf",
+        lambda data: {"data": b"%PDF s", "pages_total": 2, "pages_kept": 1},
+    )
+    fake_minio = FakeMinio({"archives/1/exam.pdf": b"%PDF original"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+
+    result = await worker.preprocess_archive_task({}, 1)
+
+    assert result == {
+        "archive_id": 1,
+        "compact_object_name": "archives/1/exam.compact.pdf",
+        "original_bytes": len(b"%PDF original"),
+        "compact_bytes": len(b"%PDF s"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_preprocess_archive_task_records_when_no_smaller_copy(monkeypatch):
+    archive = _archive(optimized_object_name="archives/1/exam.optimized.pdf")
+    fake_session = FakeSession([_user_result(archive), SimpleNamespace()])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(worker, "compact_pdf", lambda data: None)
+    fake_minio = FakeMinio({"archives/1/exam.optimized.pdf": b"%PDF optimized"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+
+    result = await worker.preprocess_archive_task({}, 1)
+
+    assert fake_minio.puts == {}
+    assert archive.compact_object_name == "archives/1/exam.optimized.pdf"
+    assert "compact_object_name" in str(fake_session.queries[-1])
+    assert result["compact_bytes"] == result["original_bytes"]
+
+    # Exam generation then reads that copy without compacting it again.
+    def unexpected_compact(data):
+        raise AssertionError("already preprocessed")
+
+    monkeypatch.setattr(worker, "compact_pdf", unexpected_compact)
+    monkeypatch.setattr(worker.settings, "AI_EXAM_PREPROCESS_PDFS", True)
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    fake_session._results = [
+        _user_result(SimpleNamespace(gemini_api_key="KEY")),
+        _archives_result([(archive, SimpleNamespace(name="Algorithms"))]),
+    ]
+    fake_client = FakeGenAIClient()
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert fake_client.uploads == [b"%PDF optimized"]
+
+
+@pytest.mark.asyncio
+async def test_optimize_archive_task_keeps_original_and_stores_copy(monkeypatch):
+    archive = _archive()
+    fake_session = FakeSession([_user_result(archive), SimpleNamespace()])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(worker, "optimize_pdf", lambda data, dpi, quality: b"%PDF lin")
+    fake_minio = FakeMinio({"archives/1/exam.pdf": b"%PDF original bytes"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+
+    result = await worker.optimize_archive_task({}, 1)
+
+    assert fake_minio.puts == {"archives/1/exam.optimized.pdf": b"%PDF lin"}
+    assert archive.object_name == "archives/1/exam.pdf"
+    assert result == {
+        "archive_id": 1,
+        "optimized_object_name": "archives/1/exam.optimized.pdf",
+        "original_bytes": len(b"%PDF original bytes"),
+        "optimized_bytes": len(b"%PDF lin"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_generate_exam_content_reads_optimized_copy(monkeypatch):
+    archive = _archive(optimized_object_name="archives/1/exam.optimized.pdf")
+    course = SimpleNamespace(name="Algorithms", deleted_at=None)
+    fake_session = FakeSession(
+        [
+            _user_result(SimpleNamespace(gemini_api_key="KEY")),
+            _archives_result([(archive, course)]),
+        ]
+    )
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    monkeypatch.setattr(worker, "load_default_prompt_template", lambda: "Prompt")
+    fake_minio = FakeMinio({"archives/1/exam.optimized.pdf": b"%PDF optimized"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+    fake_client = FakeGenAIClient()
+    monkeypatch.setattr("google.genai.Client", lambda api_key: fake_client)
+
+    await worker.generate_exam_content(archive_ids=[1], user_id=7)
+
+    assert [name for _, name in fake_minio.requests] == [
+        "archives/1/exam.optimized.pdf"
+    ]
+    assert fake_client.uploads == [b"%PDF optimized"]
+
+
+@pytest.mark.asyncio
+async def test_generate_archive_previews_task_stores_each_variant(monkeypatch):
+    archive = _archive(previews_generated_at=None)
+    fake_session = FakeSession([_user_result(archive), SimpleNamespace()])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    rendered = []
+
+    def fake_render(pdf_data, widths, quality):
+        rendered.append((pdf_data, widths))
+        return {variant: f"img-{variant}".encode() for variant in widths}
+
+    monkeypatch.setattr(worker, "render_first_page", fake_render)
+    fake_minio = FakeMinio({"archives/1/exam.pdf": b"%PDF original"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+
+    result = await worker.generate_archive_previews_task({}, 1)
+
+    assert rendered[0][0] == b"%PDF original"
+    assert fake_minio.puts == {
+        "archives/1/exam.preview-thumb.webp": b"img-thumb",
+        "archives/1/exam.preview-page.webp": b"img-page",
+    }
+    assert archive.previews_generated_at is not None
+    assert result == {
+        "archive_id": 1,
+        "bytes": {"thumb": len(b"img-thumb"), "page": len(b"img-page")},
+    }
+
+
+@pytest.mark.asyncio
+async def test_generate_archive_previews_task_skips_rendered(monkeypatch):
+    archive = _archive(previews_generated_at=datetime.now(timezone.utc))
+    fake_session = FakeSession([_user_result(archive)])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+
+    assert await worker.generate_archive_previews_task({}, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_generate_archive_previews_task_marks_unrenderable_pdf(monkeypatch):
+    archive = _archive()
+    fake_session = FakeSession([_user_result(archive), SimpleNamespace()])
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+
+    def broken_render(pdf_data, widths, quality):
+        raise ValueError("Failed to load document")
+
+    monkeypatch.setattr(worker, "render_first_page", broken_render)
+    fake_minio = FakeMinio({"archives/1/exam.pdf": b"not a pdf"})
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(fake_minio))
+
+    with pytest.raises(ValueError):
+        await worker.generate_archive_previews_task({}, 1)
+
+    assert archive.previews_failed_at is not None
+    assert archive.previews_generated_at is None
+    assert fake_minio.puts == {}
+    assert "previews_failed_at" in str(fake_session.queries[-1])
+
+    # Later runs leave it alone instead of failing again.
+    fake_session._results = [_user_result(archive)]
+    assert await worker.generate_archive_previews_task({}, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_backfill_archive_previews_task_enqueues_per_archive(monkeypatch):
+    fake_session = FakeSession(
+        [SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [9, 4]))]
+    )
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+
+    class FakeRedis:
+        def __init__(self):
+            self.jobs = []
+
+        async def enqueue_job(self, function, *args, **options):
+            self.jobs.append((function, args, options))
+
+    redis = FakeRedis()
+    assert await worker.backfill_archive_previews_task({"redis": redis}) == 2
+    assert "archives.previews_failed_at IS NULL" in str(fake_session.queries[0])
+    assert redis.jobs == [
+        (
+            "generate_archive_previews_task",
+            (9,),
+            {
+                "_job_id": "archive-previews:9",
+                "_queue_name": worker.BATCH_QUEUE_NAME,
+            },
+        ),
+        (
+            "generate_archive_previews_task",
+            (4,),
+            {
+                "_job_id": "archive-previews:4",
+                "_queue_name": worker.BATCH_QUEUE_NAME,
+            },
+        ),
+    ]
+
+
+def test_describe_task_error_classifies_gemini_errors():
+    rate_limited = genai_errors.ClientError(
+        429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}}
+    )
+    assert "rate limit" in worker.describe_task_error(rate_limited)
+    assert worker.describe_task_error(ValueError("Archives not found")) == (
+        "Archives not found"
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_ai_exam_task_publishes_chunk_events(monkeypatch):
+    class RecordingRedis:
+        def __init__(self):
+            self.events: list[tuple[str, dict]] = []
+
+        async def xadd(self, name, fields):
+            self.events.append((name, fields))
+
+        async def expire(self, name, seconds):
+            return True
+
+    async def fake_generate(**kwargs):
+        await kwargs["on_chunk"]("partial")
+        return {"success": True, "generated_content": "partial"}
+
+    monkeypatch.setattr(worker, "generate_exam_content", fake_generate)
+    redis = RecordingRedis()
+
+    result = await worker.generate_ai_exam_task(
+        {"redis": redis, "job_id": b"job-9"},
+        {"archive_ids": [1], "user_id": 3},
+    )
+
+    assert result["generated_content"] == "partial"
+    assert {name for name, _ in redis.events} == {
+        worker.task_event_stream_key("job-9")
+    }
+    statuses = [fields["status"] for _, fields in redis.events]
+    assert statuses == ["in_progress", "in_progress", "complete"]
+    assert redis.events[1][1]["chunk"] == "partial"
+
+
 @pytest.mark.asyncio
 async def test_generate_exam_content_missing_user(monkeypatch):
     fake_session = FakeSession([_user_result(None)])
@@ -179,6 +791,8 @@ async def test_generate_exam_content_cleans_up_on_failure(monkeypatch):
         id=1,
         name="Midterm",
         object_name="archives/1.pdf",
+        compact_object_name=None,
+        optimized_object_name=None,
         professor="Prof",
         academic_year=2024,
         archive_type="final",
@@ -198,10 +812,10 @@ async def test_generate_exam_content_cleans_up_on_failure(monkeypatch):
         "load_default_prompt_template",
         lambda: "Prompt {professor}",
     )
-    monkeypatch.setattr(worker, "get_minio_client", lambda: FakeMinio())
+    monkeypatch.setattr(worker, "get_storage", lambda: ObjectStorage(FakeMinio()))
 
     failing_client = FakeGenAIClient(should_fail=True)
-    monkeypatch.setattr(worker.genai, "Client", lambda api_key: failing_client)
+    monkeypatch.setattr("google.genai.Client", lambda api_key: failing_client)
 
     with pytest.raises(RuntimeError, match="generation failed"):
         await worker.generate_exam_content(
@@ -212,6 +826,7 @@ async def test_generate_exam_content_cleans_up_on_failure(monkeypatch):
         )
 
     assert failing_client.deleted == ["uploaded-1"]
+    assert threading.get_ident() not in failing_client.delete_threads
 
 
 @pytest.mark.asyncio
@@ -235,11 +850,197 @@ async def test_generate_ai_exam_task_calls_generate(monkeypatch):
     assert called["kwargs"]["temperature"] == 0.9
 
 
+class CounterRedis:
+    def __init__(self):
+        self.counters: dict[str, int] = {}
+        self.expirations: dict[str, int] = {}
+
+    async def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def expire(self, key, seconds):
+        self.expirations[key] = seconds
+
+
+@pytest.mark.asyncio
+async def test_plan_fair_enqueue_orders_light_users_first(monkeypatch):
+    monkeypatch.setattr(worker.settings, "AI_EXAM_HEAVY_USER_THRESHOLD", 3)
+    monkeypatch.setattr(worker.settings, "AI_EXAM_PRIORITY_HEADROOM_SECONDS", 60)
+    redis = CounterRedis()
+
+    plans = [await worker.plan_fair_enqueue(redis, user_id=1) for _ in range(4)]
+    light_queue, light_score = await worker.plan_fair_enqueue(redis, user_id=2)
+
+    assert [queue for queue, _ in plans] == [
+        worker.INTERACTIVE_QUEUE_NAME,
+        worker.INTERACTIVE_QUEUE_NAME,
+        worker.INTERACTIVE_QUEUE_NAME,
+        worker.BATCH_QUEUE_NAME,
+    ]
+    scores = [score for _, score in plans]
+    assert scores == sorted(scores)
+    assert light_queue == worker.INTERACTIVE_QUEUE_NAME
+    assert light_score < scores[1]
+    assert all(score <= datetime.now(timezone.utc) for score in scores)
+    assert redis.expirations == {
+        "ai_exam:usage:1": worker.settings.AI_EXAM_FAIR_SHARE_WINDOW_SECONDS,
+        "ai_exam:usage:2": worker.settings.AI_EXAM_FAIR_SHARE_WINDOW_SECONDS,
+    }
+
+
+@pytest.mark.asyncio
+async def test_generate_ai_exam_task_records_queue_wait(monkeypatch):
+    class ListRedis:
+        def __init__(self):
+            self.lists: dict[str, list] = {}
+
+        async def lpush(self, key, value):
+            self.lists.setdefault(key, []).insert(0, value)
+
+        async def ltrim(self, key, start, end):
+            self.lists[key] = self.lists[key][start : end + 1]
+
+        async def xadd(self, name, fields):
+            return None
+
+        async def expire(self, name, seconds):
+            return True
+
+    async def fake_generate(**kwargs):
+        return {"success": True}
+
+    monkeypatch.setattr(worker, "generate_exam_content", fake_generate)
+    redis = ListRedis()
+
+    await worker.generate_ai_exam_task(
+        {
+            "redis": redis,
+            "job_id": "job-1",
+            "enqueue_time": datetime.now(timezone.utc) - timedelta(seconds=2),
+            "queue_name": worker.BATCH_QUEUE_NAME,
+        },
+        {"archive_ids": [1], "user_id": 3},
+    )
+
+    samples = redis.lists[f"ai_exam:queue_wait:{worker.BATCH_QUEUE_NAME}"]
+    assert len(samples) == 1
+    assert samples[0] >= 2000
+
+
+class StreamRedis:
+    def __init__(self):
+        self.events: list[tuple[str, dict]] = []
+        self.values: dict[str, bytes] = {}
+
+    async def set(self, name, value, ex=None):
+        self.values[name] = value.encode("utf-8")
+
+    async def getdel(self, name):
+        return self.values.pop(name, None)
+
+    async def xadd(self, name, fields):
+        self.events.append((name, fields))
+
+    async def expire(self, name, seconds):
+        return True
+
+
 @pytest.mark.asyncio
-async def test_get_redis_pool(monkeypatch):
-    async def fake_create_pool(settings):
-        return f"pool-for-{settings}"
+async def test_validate_api_key_task_saves_valid_key(monkeypatch):
+    async def fake_validate(api_key):
+        return None
+
+    fake_session = FakeSession([SimpleNamespace()])
+    monkeypatch.setattr(worker, "validate_api_key", fake_validate)
+    monkeypatch.setattr(
+        worker, "AsyncSession", lambda *_args, **_kwargs: fake_session
+    )
+    redis = StreamRedis()
+    key_ref = await worker.stash_pending_api_key(redis, "key-abcd")
+
+    result = await worker.validate_api_key_task(
+        {"redis": redis, "job_id": "job-9"},
+        {"user_id": 4, "key_ref": key_ref},
+    )
+
+    assert result == {"has_api_key": True, "api_key_masked": "****abcd"}
+    assert redis.values == {}
+    assert [fields["status"] for _, fields in redis.events] == [
+        "in_progress",
+        "complete",
+    ]
+    assert fake_session._results == []
+
+
+@pytest.mark.asyncio
+async def test_validate_api_key_task_reports_invalid_key(monkeypatch):
+    async def fake_validate(api_key):
+        raise gemini.InvalidApiKeyError("API key not valid.")
+
+    monkeypatch.setattr(worker, "validate_api_key", fake_validate)
+    redis = StreamRedis()
+    key_ref = await worker.stash_pending_api_key(redis, "key-abcd")
+
+    with pytest.raises(gemini.InvalidApiKeyError):
+        await worker.validate_api_key_task(
+            {"redis": redis, "job_id": "job-9"},
+            {"user_id": 4, "key_ref": key_ref},
+        )
+
+    name, fields = redis.events[-1]
+    assert name == worker.task_event_stream_key("job-9")
+    assert fields["status"] == "failed"
+    assert fields["error"] == "Invalid Gemini API key: API key not valid."
+    assert redis.values == {}
+
+
+@pytest.mark.asyncio
+async def test_validate_api_key_task_fails_when_key_expired(monkeypatch):
+    async def unexpected_validate(api_key):
+        raise AssertionError("no key to validate")
+
+    monkeypatch.setattr(worker, "validate_api_key", unexpected_validate)
+    redis = StreamRedis()
+
+    with pytest.raises(ValueError):
+        await worker.validate_api_key_task(
+            {"redis": redis, "job_id": "job-9"},
+            {"user_id": 4, "key_ref": "gone"},
+        )
+
+    _, fields = redis.events[-1]
+    assert fields["status"] == "failed"
+    assert "submit it again" in fields["error"]
+
+
+def test_batch_worker_settings_use_batch_queue():
+    assert worker.WorkerSettings.queue_name == worker.INTERACTIVE_QUEUE_NAME
+    assert worker.BatchWorkerSettings.queue_name == worker.BATCH_QUEUE_NAME
+    assert (
+        worker.BatchWorkerSettings.max_jobs
+        == worker.settings.AI_EXAM_BATCH_MAX_JOBS
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_redis_pool_reuses_one_sized_pool(monkeypatch):
+    created = []
+
+    class FakeArqRedis:
+        def __init__(self, pool):
+            self.pool = pool
+            created.append(self)
+
+        async def ping(self):
+            return True
+
+    monkeypatch.setattr(worker, "resources", Resources())
+    monkeypatch.setattr("app.core.resources.ArqRedis", FakeArqRedis)
+
+    first = await worker.get_redis_pool()
+    second = await worker.get_redis_pool()
 
-    monkeypatch.setattr(worker, "create_pool", fake_create_pool)
-    pool = await worker.get_redis_pool()
-    assert pool == f"pool-for-{worker.WorkerSettings.redis_settings}"
+    assert first is second
+    assert len(created) == 1
+    assert created[0].pool.max_connections == worker.settings.ARQ_MAX_CONNECTIONS
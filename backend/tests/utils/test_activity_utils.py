@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from app.utils import activity
+
+
+def test_record_user_activity_is_throttled_per_user(fake_activity_redis, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(activity.time, "monotonic", lambda: now[0])
+
+    activity.record_user_activity(fake_activity_redis, 1)
+    activity.record_user_activity(fake_activity_redis, 1)
+    activity.record_user_activity(fake_activity_redis, 2)
+    assert fake_activity_redis.executed == 2
+
+    now[0] += activity.settings.USER_ACTIVITY_WRITE_INTERVAL_SECONDS
+    activity.record_user_activity(fake_activity_redis, 1)
+    assert fake_activity_redis.executed == 3
+
+
+def test_activity_counts_cover_online_window_and_today(fake_activity_redis):
+    activity.record_user_activity(fake_activity_redis, 1)
+    activity.record_user_activity(fake_activity_redis, 2)
+
+    # A user last seen well before the online window still counts for today.
+    stale = datetime.now(timezone.utc).timestamp() - 3600 * 6
+    fake_activity_redis.zadd(activity.ONLINE_USERS_KEY, {"3": stale})
+    fake_activity_redis.pfadd(
+        activity.daily_active_key(datetime.now(timezone.utc)), "3"
+    )
+
+    assert activity.get_activity_counts(fake_activity_redis) == (2, 3)
+
+    activity.clear_user_activity(fake_activity_redis, 2)
+    assert activity.get_activity_counts(fake_activity_redis) == (1, 3)
+
+
+def test_record_user_activity_swallows_redis_errors(monkeypatch):
+    monkeypatch.setattr(activity, "_last_recorded", {})
+
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis down")
+
+    activity.record_user_activity(BrokenRedis(), 5)
+    assert 5 not in activity._last_recorded
@@ -38,6 +38,14 @@ def test_blacklist_and_check_token(monkeypatch):
     assert auth_utils.is_token_blacklisted("other") is False
 
 
+def test_jwt_helpers_are_reachable_on_the_module():
+    token = auth_utils.jwt.encode({"uid": 1}, "secret", algorithm="HS256")
+
+    assert auth_utils.jwt.decode(token, "secret", algorithms=["HS256"]) == {"uid": 1}
+    with pytest.raises(auth_utils.JWTError):
+        auth_utils.jwt.decode(token, "other", algorithms=["HS256"])
+
+
 @pytest.mark.asyncio
 async def test_authenticate_user_validates_credentials(session_maker):
     password = "PlainPassword!"
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.utils.cache import SingleFlightCache
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_runs_one_computation_for_a_burst():
+    cache = SingleFlightCache(ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": len(calls)}
+
+    results = await asyncio.gather(*(cache.get(compute) for _ in range(50)))
+
+    assert len(calls) == 1
+    assert all(result == {"value": 1} for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_expires_and_skips_failures():
+    now = [0.0]
+    cache = SingleFlightCache(ttl_seconds=10, clock=lambda: now[0])
+
+    async def failing():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get(failing)
+
+    async def compute():
+        return now[0]
+
+    assert await cache.get(compute) == 0.0
+    now[0] = 5.0
+    assert await cache.get(compute) == 0.0
+    now[0] = 11.0
+    assert await cache.get(compute) == 11.0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cache_expire_keeps_last_value():
+    cache = SingleFlightCache(ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get(compute) == 1
+    cache.expire()
+    assert cache.value == 1
+    assert await cache.get(compute) == 2
@@ -0,0 +1,44 @@
+import os
+
+from app.utils.disk_cache import DiskCache
+
+
+def test_disk_cache_round_trip_keyed_by_etag(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), capacity_bytes=1024)
+
+    assert cache.read("archives/a.pdf", "v1") is None
+    assert cache.put("archives/a.pdf", "v1", b"%PDF one") is True
+    assert cache.read("archives/a.pdf", "v1") == b"%PDF one"
+    assert cache.read("archives/a.pdf", "v2") is None
+
+    mapped = cache.open("archives/a.pdf", "v1")
+    with mapped:
+        assert mapped[1:4] == b"PDF"
+
+    assert cache.stats() == {"hits": 2, "misses": 2, "writes": 1, "evictions": 0}
+    assert not any(name.startswith(".tmp-") for name in os.listdir(cache.directory))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), capacity_bytes=10)
+    cache.put("a", "1", b"aaaa")
+    cache.put("b", "1", b"bbbb")
+    # Age both entries, then use "a" so "b" is the oldest.
+    for key in ("a", "b"):
+        os.utime(cache._path(key, "1"), (1, 1))
+    assert cache.read("a", "1") == b"aaaa"
+
+    cache.put("c", "1", b"cccc")
+
+    assert cache.read("b", "1") is None
+    assert cache.read("a", "1") == b"aaaa"
+    assert cache.read("c", "1") == b"cccc"
+    assert cache.evictions == 1
+
+
+def test_disk_cache_skips_entries_that_cannot_fit(tmp_path):
+    cache = DiskCache(str(tmp_path), capacity_bytes=4)
+
+    assert cache.put("big", "1", b"too large") is False
+    assert cache.put("empty", "1", b"") is False
+    assert os.listdir(tmp_path) == []
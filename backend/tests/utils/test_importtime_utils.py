@@ -0,0 +1,63 @@
+import pytest
+
+from app.utils import importtime
+from app.utils.importtime import (
+    ImportRecord,
+    check_entry_point,
+    deferred_imports,
+    package_breakdown,
+    parse_importtime,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     yaml.error
+import time:       900 |       1020 |   yaml
+import time:       300 |        300 |   sqlalchemy.sql
+import time:       500 |        800 |     sqlalchemy
+import time:      2000 |       3820 | app.main
+some unrelated warning
+"""
+
+
+def test_parse_importtime_reads_records_and_depth():
+    records = parse_importtime(SAMPLE)
+
+    assert records[0] == ImportRecord("yaml.error", 120, 120, 2)
+    assert records[1] == ImportRecord("yaml", 900, 1020, 1)
+    assert records[-1] == ImportRecord("app.main", 2000, 3820, 0)
+    assert len(records) == 5
+
+
+def test_package_breakdown_sums_self_time_per_package():
+    breakdown = package_breakdown(parse_importtime(SAMPLE))
+
+    assert breakdown == [("app", 2.0), ("yaml", 1.02), ("sqlalchemy", 0.8)]
+
+
+def test_deferred_imports_match_packages_and_submodules():
+    records = parse_importtime(SAMPLE)
+
+    assert deferred_imports(records, ["yaml.error", "sql", "minio"]) == ["yaml.error"]
+    assert deferred_imports(records, ["yaml"]) == ["yaml"]
+
+
+def test_check_entry_point_reports_budget_and_deferred_imports():
+    records = parse_importtime(SAMPLE)
+
+    problems = check_entry_point("app.main", records, budget_ms=3)
+
+    assert problems == [
+        "app.main took 4 ms to import, over its 3 ms budget",
+        "app.main imports yaml at load time",
+    ]
+    assert check_entry_point("app.main", records, budget_ms=10)[0].endswith(
+        "imports yaml at load time"
+    )
+
+
+@pytest.mark.parametrize("module", list(importtime.IMPORT_BUDGETS_MS))
+def test_entry_points_leave_heavy_dependencies_to_first_use(module):
+    records = importtime.profile_imports(module)
+
+    assert deferred_imports(records, importtime.DEFERRED_MODULES[module]) == []
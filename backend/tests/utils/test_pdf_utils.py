@@ -0,0 +1,104 @@
+import io
+
+from PIL import Image
+import pikepdf
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+)
+
+from app.utils.pdf import compact_pdf, optimize_pdf, render_first_page
+
+
+def build_pdf(page_texts: list[str | None]) -> bytes:
+    """Build a PDF with one page per entry; None produces a blank page."""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for text in page_texts:
+        page = writer.add_blank_page(width=612, height=792)
+        if text is None:
+            continue
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+            }
+        )
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _texts(pdf_data: bytes) -> list[str]:
+    return [page.extract_text().strip() for page in PdfReader(io.BytesIO(pdf_data)).pages]
+
+
+def test_compact_pdf_drops_blank_and_duplicate_pages():
+    original = build_pdf(
+        ["Question 1", None, "Question 2", "Question 1", None, "Question 3"]
+    )
+
+    result = compact_pdf(original)
+
+    assert result is not None
+    assert result["pages_total"] == 6
+    assert result["pages_kept"] == 3
+    assert len(result["data"]) < len(original)
+    assert _texts(result["data"]) == ["Question 1", "Question 2", "Question 3"]
+
+
+def test_compact_pdf_returns_none_when_only_blank_pages():
+    assert compact_pdf(build_pdf([None, None])) is None
+
+
+def test_render_first_page_encodes_each_width():
+    images = render_first_page(
+        build_pdf(["Question 1", "Question 2"]), {"thumb": 120, "page": 400}
+    )
+
+    thumb = Image.open(io.BytesIO(images["thumb"]))
+    page = Image.open(io.BytesIO(images["page"]))
+    assert thumb.format == page.format == "WEBP"
+    assert thumb.width == 120
+    assert page.width == 400
+    assert page.height == round(400 * 792 / 612)
+
+
+def test_optimize_pdf_downsamples_images_and_linearizes():
+    scan = Image.effect_noise((1700, 2200), 40).convert("RGB")
+    source = io.BytesIO()
+    scan.save(source, format="PDF", resolution=200)
+    pdf_data = source.getvalue()
+
+    optimized = optimize_pdf(pdf_data, max_dpi=100, quality=70)
+
+    assert optimized is not None
+    assert len(optimized) < len(pdf_data) // 2
+    with pikepdf.open(io.BytesIO(optimized)) as pdf:
+        assert pdf.is_linearized
+        (image,) = pdf.pages[0].get_images().values()
+        assert (int(image.Width), int(image.Height)) == (850, 1100)
+        assert image.Filter == pikepdf.Name.DCTDecode
+
+
+def test_optimize_pdf_linearizes_text_only_documents():
+    pdf_data = build_pdf(["Question 1", "Question 2"])
+
+    optimized = optimize_pdf(pdf_data)
+
+    with pikepdf.open(io.BytesIO(optimized)) as pdf:
+        assert pdf.is_linearized
+        assert len(pdf.pages) == 2
+    assert "Question 2" in PdfReader(io.BytesIO(optimized)).pages[1].extract_text()
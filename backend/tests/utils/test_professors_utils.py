@@ -0,0 +1,61 @@
+from app.utils.professors import (
+    ProfessorIndex,
+    ProfessorTrie,
+    normalize_professor_name,
+    professor_key,
+)
+
+
+def test_normalize_professor_name_applies_nfkc_and_collapses_spaces():
+    assert normalize_professor_name("  Ｄｒ．　Smith   John ") == "Dr. Smith John"
+    assert professor_key("Smith  JOHN") == professor_key("smith john")
+    assert professor_key("王 小明") == professor_key("王小明")
+
+
+def test_professor_trie_keeps_rank_order_and_top_k():
+    trie = ProfessorTrie(["abc", "abd", "abe", "b"], top_k=2)
+
+    assert trie.prefix("ab") == ["abc", "abd"]
+    assert trie.prefix("abe") == ["abe"]
+    assert trie.prefix("") == ["abc", "abd"]
+    assert trie.prefix("x") == []
+
+
+def test_professor_index_merges_spellings_and_scopes_by_course():
+    index = ProfessorIndex(
+        [
+            ("王小明", 1, 5),
+            ("王 小明", 1, 1),
+            ("王大同", 1, 2),
+            ("Smith John", 2, 3),
+            ("smith  john", 2, 1),
+            ("李四", 2, 4),
+        ]
+    )
+
+    assert index.suggest("王") == [("王小明", 6), ("王大同", 2)]
+    assert index.suggest("") == [
+        ("王小明", 6),
+        ("Smith John", 4),
+        ("李四", 4),
+        ("王大同", 2),
+    ]
+    assert index.suggest("李", course_id=1) == []
+    assert index.suggest("", course_id=2) == [("Smith John", 4), ("李四", 4)]
+    assert index.suggest("", course_id=99) == []
+    assert index.suggest("", limit=1) == [("王小明", 6)]
+
+
+def test_professor_index_falls_back_to_substring_and_fuzzy_matches():
+    index = ProfessorIndex([("王小明", 1, 5), ("Smith John", 2, 3)])
+
+    assert index.suggest("小明") == [("王小明", 5)]
+    assert index.suggest("smth john") == [("Smith John", 3)]
+    assert index.suggest("zzz") == []
+
+
+def test_professor_index_canonical_name_snaps_to_common_spelling():
+    index = ProfessorIndex([("Smith John", 2, 3), ("smith john", 2, 1)])
+
+    assert index.canonical_name("ＳＭＩＴＨ  JOHN") == "Smith John"
+    assert index.canonical_name("  New   Prof ") == "New Prof"
@@ -0,0 +1,50 @@
+import pytest
+
+from app.utils.ranges import (
+    ByteRange,
+    RangeNotSatisfiable,
+    etag_matches,
+    parse_range_header,
+)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-99", ByteRange(0, 99)),
+        ("bytes=100-", ByteRange(100, 999)),
+        ("bytes=-200", ByteRange(800, 999)),
+        ("bytes=-5000", ByteRange(0, 999)),
+        ("bytes=900-5000", ByteRange(900, 999)),
+        (" Bytes = 1-2 ", ByteRange(1, 2)),
+    ],
+)
+def test_parse_range_header_single_ranges(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [None, "", "items=0-1", "bytes=0-1,5-6", "bytes=abc", "bytes=5-1", "bytes=-"],
+)
+def test_parse_range_header_falls_back_to_whole_object(header):
+    assert parse_range_header(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_range_header_rejects_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, 1000)
+
+
+def test_byte_range_content_range():
+    byte_range = ByteRange(5, 8)
+    assert byte_range.length == 4
+    assert byte_range.content_range(20) == "bytes 5-8/20"
+
+
+def test_etag_matches_lists_and_weak_tags():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"a"')
@@ -0,0 +1,38 @@
+from sqlalchemy.dialects import postgresql
+
+from app.utils.search import (
+    archive_search_vector,
+    build_tsquery,
+    search_document,
+    search_tokens,
+)
+
+
+def test_search_tokens_split_cjk_into_bigrams():
+    assert search_tokens("微積分(一) Calculus I") == [
+        "微積",
+        "積分",
+        "一",
+        "calculus",
+        "i",
+    ]
+    assert search_tokens("資料結構DS") == ["資料", "料結", "結構", "ds"]
+
+
+def test_search_tokens_normalize_full_width_text():
+    assert search_document("ＡＢＣ　王小明") == "abc 王小 小明"
+
+
+def test_build_tsquery_requires_every_token_and_prefixes_the_last():
+    assert build_tsquery("線性代數 lin") == "線性 & 性代 & 代數 & lin:*"
+    assert build_tsquery("微") == "微:*"
+    assert build_tsquery("  ?!  ") is None
+
+
+def test_archive_search_vector_weights_name_above_professor():
+    statement = str(
+        archive_search_vector("微積分", "王").compile(dialect=postgresql.dialect())
+    )
+    assert "setweight(to_tsvector('simple'::regconfig" in statement
+    assert "'A') || setweight" in statement
+    assert statement.endswith("'B')")
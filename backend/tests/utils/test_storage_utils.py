@@ -1,12 +1,37 @@
-from datetime import timedelta
+import asyncio
+import io
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from minio.error import S3Error
 
 from app.utils import storage
+from app.utils.disk_cache import DiskCache
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.body = io.BytesIO(data)
+        self.closed = False
+        self.released = False
+
+    def read(self, amount=None):
+        return self.body.read(amount)
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        self.released = True
 
 
 class FakeMinio:
-    def __init__(self, *, exists=False):
+    def __init__(self, *, exists=False, objects=None):
         self.exists = exists
         self.called_make_bucket = False
+        self.objects = dict(objects or {})
+        self.responses = []
 
     def bucket_exists(self, bucket):
         return self.exists
@@ -14,6 +39,29 @@ class FakeMinio:
     def make_bucket(self, bucket):
         self.called_make_bucket = True
 
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        self.objects[object_name] = data.read(length)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        data = self.objects[object_name]
+        end = offset + length if length else len(data)
+        response = FakeResponse(data[offset:end])
+        self.responses.append(response)
+        return response
+
+    def stat_object(self, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise S3Error(None, "NoSuchKey", "missing", object_name, "", "")
+        return SimpleNamespace(
+            size=len(self.objects[object_name]),
+            etag="etag-1",
+            content_type="application/pdf",
+            last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+
+    def remove_object(self, bucket_name, object_name):
+        self.objects.pop(object_name, None)
+
     def presigned_get_object(self, bucket_name, object_name, expires):
         return (
             f"http://{storage.settings.MINIO_ENDPOINT}/{bucket_name}/"
@@ -21,19 +69,123 @@ class FakeMinio:
         )
 
 
-def test_get_minio_client_creates_bucket(monkeypatch):
+def test_create_minio_client_uses_bounded_pool_without_bucket_calls(monkeypatch):
+    created = {}
+
+    def fake_minio(**kwargs):
+        created.update(kwargs)
+        return FakeMinio()
+
+    monkeypatch.setattr("minio.Minio", fake_minio)
+
+    client = storage.create_minio_client()
+
+    assert client.called_make_bucket is False
+    assert created["region"] == storage.settings.MINIO_REGION
+    pool = created["http_client"]
+    assert pool.connection_pool_kw["maxsize"] == (
+        storage.settings.MINIO_MAX_POOL_CONNECTIONS
+    )
+    assert pool.connection_pool_kw["block"] is True
+
+
+@pytest.mark.asyncio
+async def test_ensure_bucket_creates_missing_bucket():
     fake = FakeMinio()
-    monkeypatch.setattr(storage, "_minio_client", None)
-    monkeypatch.setattr(storage, "Minio", lambda *args, **kwargs: fake)
+    object_storage = storage.ObjectStorage(fake, bucket_name="bucket")
 
-    client = storage.get_minio_client()
-    assert client is fake
+    await object_storage.ensure_bucket()
     assert fake.called_make_bucket is True
 
+    existing = FakeMinio(exists=True)
+    await storage.ObjectStorage(existing).ensure_bucket()
+    assert existing.called_make_bucket is False
+
+
+@pytest.mark.asyncio
+async def test_object_storage_put_get_stat_delete():
+    fake = FakeMinio()
+    object_storage = storage.ObjectStorage(fake, max_workers=2)
+
+    await object_storage.put("archives/1/a.pdf", b"%PDF data")
+    assert await object_storage.get("archives/1/a.pdf") == b"%PDF data"
+    assert fake.responses[-1].closed and fake.responses[-1].released
+
+    info = await object_storage.stat("archives/1/a.pdf")
+    assert info.size == len(b"%PDF data")
+    assert info.etag == "etag-1"
+
+    await object_storage.delete("archives/1/a.pdf")
+    assert fake.objects == {}
+    with pytest.raises(storage.ObjectNotFound):
+        await object_storage.stat("archives/1/a.pdf")
+    object_storage.close()
+
+
+@pytest.mark.asyncio
+async def test_object_storage_stream_reads_chunks_and_ranges():
+    fake = FakeMinio(objects={"a.pdf": b"0123456789"})
+    object_storage = storage.ObjectStorage(fake)
+
+    chunks = [chunk async for chunk in object_storage.stream("a.pdf", chunk_size=4)]
+    assert chunks == [b"0123", b"4567", b"89"]
+
+    chunks = [
+        chunk
+        async for chunk in object_storage.stream(
+            "a.pdf", offset=2, length=5, chunk_size=4
+        )
+    ]
+    assert b"".join(chunks) == b"23456"
+    assert all(response.released for response in fake.responses)
+
+
+@pytest.mark.asyncio
+async def test_object_storage_reads_through_disk_cache(tmp_path):
+    fake = FakeMinio(objects={"a.pdf": b"0123456789"})
+    cache = DiskCache(str(tmp_path), capacity_bytes=1024)
+    object_storage = storage.ObjectStorage(fake, cache=cache)
+
+    assert await object_storage.get("a.pdf") == b"0123456789"
+    assert await object_storage.get("a.pdf") == b"0123456789"
+    assert len(fake.responses) == 1
+    assert cache.stats()["hits"] == 1
+
+    info = await object_storage.stat("a.pdf")
+    chunks = [
+        chunk
+        async for chunk in object_storage.stream(
+            "a.pdf", offset=2, length=5, chunk_size=2, info=info
+        )
+    ]
+    assert chunks == [b"23", b"45", b"6"]
+    assert len(fake.responses) == 1
+    object_storage.close()
+
+
+@pytest.mark.asyncio
+async def test_object_storage_stream_miss_fills_cache(tmp_path):
+    fake = FakeMinio(objects={"a.pdf": b"0123456789"})
+    cache = DiskCache(str(tmp_path), capacity_bytes=1024)
+    object_storage = storage.ObjectStorage(fake, cache=cache)
+    info = await object_storage.stat("a.pdf")
+
+    chunks = [
+        chunk
+        async for chunk in object_storage.stream("a.pdf", length=4, info=info)
+    ]
+    assert chunks == [b"0123"]
+    await asyncio.gather(*object_storage._fills.values())
+
+    assert cache.read("a.pdf", info.etag) == b"0123456789"
+    object_storage.close()
+
 
 def test_presigned_get_url_rewrites_endpoint(monkeypatch):
     fake = FakeMinio(exists=True)
-    monkeypatch.setattr(storage, "_minio_client", fake)
+    monkeypatch.setattr(
+        "app.core.resources.resources._storage", storage.ObjectStorage(fake)
+    )
 
     url = storage.presigned_get_url(
         "path/to/file.pdf",
@@ -41,3 +193,13 @@ def test_presigned_get_url_rewrites_endpoint(monkeypatch):
     )
     assert url.startswith(storage.settings.EXTERNAL_ENDPOINT)
     assert "path/to/file.pdf" in url
+
+
+def test_derived_object_name_keeps_extension():
+    assert (
+        storage.derived_object_name("archives/3/abc.pdf", "compact")
+        == "archives/3/abc.compact.pdf"
+    )
+    assert storage.derived_object_name("archives/3/abc", "compact") == (
+        "archives/3/abc.compact"
+    )
@@ -4,6 +4,7 @@ export { archiveService } from './services/archives'
 export { authService } from './services/auth'
 export { memeService } from './services/meme'
 export { statisticsService } from './services/statistics'
+export { searchService } from './services/search'
 export { aiExamService } from './services/aiExam'
 export { notificationService } from './services/notifications'
 export { discussionService } from './services/discussion'
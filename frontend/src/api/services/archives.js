@@ -1,4 +1,4 @@
-import { api } from './client'
+import { api, buildApiUrl, getAuthToken } from './client'
 
 export const archiveService = {
   uploadArchive(formData) {
@@ -13,10 +13,38 @@ export const archiveService = {
     return api.get(`/courses/${courseId}/archives/${archiveId}/preview`)
   },
 
+  // A proxied preview is served by the API, so pdf.js must send the token
+  // itself; its range requests then fetch only the pages being shown.
+  toPdfSource(preview) {
+    if (!preview?.proxied) return preview?.url || ''
+    const token = getAuthToken()
+    return {
+      url: buildApiUrl(preview.url),
+      httpHeaders: token ? { Authorization: `Bearer ${token}` } : {},
+      withCredentials: true,
+    }
+  },
+
+  getArchivePreviewImage(courseId, archiveId, variant = 'thumb') {
+    return api.get(`/courses/${courseId}/archives/${archiveId}/preview-image`, {
+      params: { variant },
+      responseType: 'blob',
+    })
+  },
+
   getArchiveDownloadUrl(courseId, archiveId) {
     return api.get(`/courses/${courseId}/archives/${archiveId}/download`)
   },
 
+  createArchiveBundle(courseId, { archiveIds } = {}) {
+    return api.post(`/courses/${courseId}/bundles`, { archive_ids: archiveIds })
+  },
+
+  // Bundle URLs need no token, so the browser downloads (and resumes) them.
+  getArchiveBundleUrl(bundle) {
+    return buildApiUrl(bundle.url)
+  },
+
   deleteArchive(courseId, archiveId) {
     return api.delete(`/courses/${courseId}/archives/${archiveId}`)
   },
@@ -41,4 +69,10 @@ export const archiveService = {
       course_category: courseCategory,
     })
   },
+
+  suggestProfessors(query, { courseId, limit } = {}) {
+    return api.get('/archives/professors', {
+      params: { q: query, course_id: courseId, limit },
+    })
+  },
 }
@@ -83,7 +83,7 @@ export const api = axios.create({
   withCredentials: true,
 })
 
-export const buildWebSocketUrl = (path, { baseURL, queryParams = {} } = {}) => {
+export const buildApiUrl = (path, { baseURL, queryParams = {} } = {}) => {
   const base =
     baseURL ||
     api?.defaults?.baseURL ||
@@ -106,25 +106,33 @@ export const buildWebSocketUrl = (path, { baseURL, queryParams = {} } = {}) => {
     resolvedBase.pathname = `${resolvedBase.pathname}/`
   }
 
-  resolvedBase.protocol = resolvedBase.protocol === 'https:' ? 'wss:' : 'ws:'
-
   const normalizedPath = String(path || '').replace(/^\//, '')
-  const wsUrl = new URL(normalizedPath, resolvedBase)
+  const url = new URL(normalizedPath, resolvedBase)
 
   Object.entries(queryParams || {}).forEach(([key, value]) => {
     if (value === undefined || value === null) return
     const str = String(value)
     if (!str) return
-    wsUrl.searchParams.set(key, str)
+    url.searchParams.set(key, str)
   })
 
+  return url.toString()
+}
+
+export const buildWebSocketUrl = (path, options = {}) => {
+  const url = buildApiUrl(path, options)
+  if (!url) return null
+  const wsUrl = new URL(url)
+  wsUrl.protocol = wsUrl.protocol === 'https:' ? 'wss:' : 'ws:'
   return wsUrl.toString()
 }
 
+export const getAuthToken = () =>
+  getSessionItem(STORAGE_KEYS.session.AUTH_TOKEN) || getLocalItem(STORAGE_KEYS.local.AUTH_TOKEN)
+
 api.interceptors.request.use(
   (config) => {
-    const token =
-      getSessionItem(STORAGE_KEYS.session.AUTH_TOKEN) || getLocalItem(STORAGE_KEYS.local.AUTH_TOKEN)
+    const token = getAuthToken()
     if (token) {
       config.headers.Authorization = `Bearer ${token}`
     }
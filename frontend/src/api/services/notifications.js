@@ -1,4 +1,4 @@
-import { api } from './client'
+import { api, buildApiUrl } from './client'
 
 const BASE_PATH = '/notifications'
 
@@ -21,4 +21,7 @@ export const notificationService = {
   remove(id) {
     return api.delete(`${BASE_PATH}/admin/notifications/${id}`)
   },
+  streamUrl() {
+    return buildApiUrl(`${BASE_PATH}/stream`)
+  },
 }
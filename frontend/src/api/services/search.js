@@ -0,0 +1,7 @@
+import { api } from './client'
+
+export const searchService = {
+  search(query, { limit, offset } = {}) {
+    return api.get('/search', { params: { q: query, limit, offset } })
+  },
+}
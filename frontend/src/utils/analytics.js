@@ -50,6 +50,7 @@ export const EVENTS = {
   // Archive events
   VIEW_ARCHIVE: 'view-archive',
   DOWNLOAD_ARCHIVE: 'download-archive',
+  DOWNLOAD_ARCHIVE_BUNDLE: 'download-archive-bundle',
   PREVIEW_ARCHIVE: 'preview-archive',
   UPLOAD_ARCHIVE: 'upload-archive',
   EDIT_ARCHIVE: 'edit-archive',
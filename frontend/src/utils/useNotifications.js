@@ -19,6 +19,13 @@ const errors = reactive({
   all: null,
 })
 
+// A `reset` makes every client that lost its place refetch the active list;
+// spread those refetches so tabs reconnecting together do not arrive at once.
+const RESET_REFRESH_MAX_DELAY_MS = 5000
+
+let eventSource = null
+let resetRefreshTimer = null
+
 const lastSeenTimestamp = ref(loadLastSeenTimestamp())
 
 const latestUnseenNotification = computed(() => {
@@ -73,18 +80,35 @@ function markNotificationAsSeen(notification) {
   state.modalVisible = false
 }
 
+function sortByLatest(notifications) {
+  return [...notifications].sort((a, b) => {
+    const aTime = new Date(a.updated_at || a.created_at).getTime()
+    const bTime = new Date(b.updated_at || b.created_at).getTime()
+    return bTime - aTime
+  })
+}
+
+function isVisibleNow(notification, now = Date.now()) {
+  if (!notification || notification.is_active === false) return false
+  if (notification.starts_at && new Date(notification.starts_at).getTime() > now) return false
+  if (notification.ends_at && new Date(notification.ends_at).getTime() < now) return false
+  return true
+}
+
+function applyNotificationChange(notifications, event) {
+  const others = notifications.filter((item) => item.id !== event.notification_id)
+  if (event.type !== 'deleted' && isVisibleNow(event.notification)) {
+    others.push(event.notification)
+  }
+  return sortByLatest(others)
+}
+
 async function refreshActive() {
   state.loadingActive = true
   errors.active = null
   try {
     const { data } = await notificationService.getActive()
-    state.active = Array.isArray(data)
-      ? [...data].sort((a, b) => {
-          const aTime = new Date(a.updated_at || a.created_at).getTime()
-          const bTime = new Date(b.updated_at || b.created_at).getTime()
-          return bTime - aTime
-        })
-      : []
+    state.active = Array.isArray(data) ? sortByLatest(data) : []
     const latest = latestUnseenNotification.value
     state.modalVisible = !!latest
   } catch (error) {
@@ -103,13 +127,7 @@ async function refreshAll() {
   errors.all = null
   try {
     const { data } = await notificationService.getAll()
-    state.all = Array.isArray(data)
-      ? [...data].sort((a, b) => {
-          const aTime = new Date(a.updated_at || a.created_at).getTime()
-          const bTime = new Date(b.updated_at || b.created_at).getTime()
-          return bTime - aTime
-        })
-      : []
+    state.all = Array.isArray(data) ? sortByLatest(data) : []
   } catch (error) {
     errors.all = error
     if (!isUnauthorizedError(error)) {
@@ -120,9 +138,56 @@ async function refreshAll() {
   }
 }
 
+// Events carry the changed notification, so they are applied in place
+// instead of refetching the list from every open tab at once.
+function handleNotificationEvent(message) {
+  let event
+  try {
+    event = JSON.parse(message.data)
+  } catch (error) {
+    console.warn('Failed to parse notification event:', error)
+    handleResetEvent()
+    return
+  }
+  state.active = applyNotificationChange(state.active, event)
+  state.all = applyNotificationChange(state.all, event)
+  state.modalVisible = !!latestUnseenNotification.value
+}
+
+function handleResetEvent() {
+  if (resetRefreshTimer) return
+  resetRefreshTimer = setTimeout(async () => {
+    resetRefreshTimer = null
+    await refreshActive()
+    if (state.centerVisible) {
+      await refreshAll()
+    }
+  }, Math.random() * RESET_REFRESH_MAX_DELAY_MS)
+}
+
+function connectNotificationStream() {
+  if (eventSource || typeof EventSource === 'undefined') return
+  const url = notificationService.streamUrl()
+  if (!url) return
+  // EventSource reconnects on its own and resends Last-Event-ID, so missed
+  // changes are replayed or answered with a `reset`.
+  eventSource = new EventSource(url)
+  eventSource.addEventListener('notification', handleNotificationEvent)
+  eventSource.addEventListener('reset', handleResetEvent)
+}
+
+function disconnectNotificationStream() {
+  clearTimeout(resetRefreshTimer)
+  resetRefreshTimer = null
+  if (!eventSource) return
+  eventSource.close()
+  eventSource = null
+}
+
 async function initNotifications() {
   if (state.initialized) return
   await refreshActive()
+  connectNotificationStream()
   state.initialized = true
 }
 
@@ -155,6 +220,7 @@ export function useNotifications() {
     errors,
     latestUnseenNotification,
     initNotifications,
+    disconnectNotificationStream,
     refreshActive,
     refreshAll,
     openModal,
@@ -126,7 +126,9 @@ describe('AdminView', () => {
     updateCourseMock.mockResolvedValue()
     deleteCourseMock.mockResolvedValue()
 
-    getUsersMock.mockResolvedValue({ data: sampleUsers })
+    getUsersMock.mockResolvedValue({
+      data: { items: sampleUsers, next_cursor: null, total: sampleUsers.length },
+    })
     createUserMock.mockResolvedValue()
     updateUserMock.mockResolvedValue()
     deleteUserMock.mockResolvedValue()
@@ -162,8 +164,9 @@ describe('AdminView', () => {
     await wrapper.vm.handleTabChange('1')
     await flushPromises()
 
-    expect(getUsersMock).toHaveBeenCalled()
-    expect(wrapper.vm.filteredUsers.length).toBe(2)
+    expect(getUsersMock).toHaveBeenCalledWith({ sort: 'name', limit: 100, include_total: true })
+    expect(wrapper.vm.users.length).toBe(2)
+    expect(wrapper.vm.usersTotal).toBe(2)
 
     wrapper.vm.openCreateDialog()
     wrapper.vm.courseForm.name = 'Discrete Math'
@@ -433,15 +436,38 @@ describe('AdminView', () => {
     await wrapper.vm.$nextTick()
     expect(wrapper.vm.filteredCourses).toEqual([sampleCourses[1]])
 
+    getUsersMock.mockClear()
     wrapper.vm.userSearchQuery = 'bob'
+    wrapper.vm.filterUserType = true
     await wrapper.vm.$nextTick()
-    expect(wrapper.vm.filteredUsers).toEqual([sampleUsers[1]])
+    vi.advanceTimersByTime(300)
+    await flushPromises()
+    expect(getUsersMock).toHaveBeenCalledTimes(1)
+    expect(getUsersMock).toHaveBeenCalledWith({
+      sort: 'name',
+      limit: 100,
+      q: 'bob',
+      is_admin: true,
+      include_total: true,
+    })
 
+    getUsersMock.mockResolvedValueOnce({
+      data: { items: [sampleUsers[1]], next_cursor: null, total: null },
+    })
+    wrapper.vm.usersNextCursor = 'next-page'
+    wrapper.vm.users = [sampleUsers[0]]
+    await wrapper.vm.loadMoreUsers()
+    expect(getUsersMock).toHaveBeenLastCalledWith({
+      sort: 'name',
+      limit: 100,
+      q: 'bob',
+      is_admin: true,
+      cursor: 'next-page',
+    })
+    expect(wrapper.vm.users).toEqual([sampleUsers[0], sampleUsers[1]])
+    expect(wrapper.vm.usersNextCursor).toBeNull()
     wrapper.vm.userSearchQuery = ''
-    await wrapper.vm.$nextTick()
-    wrapper.vm.filterUserType = true
-    await wrapper.vm.$nextTick()
-    expect(wrapper.vm.filteredUsers).toEqual([sampleUsers[0]])
+    wrapper.vm.filterUserType = null
 
     wrapper.vm.notificationSearchQuery = '維護'
     wrapper.vm.notificationSeverityFilter = 'info'
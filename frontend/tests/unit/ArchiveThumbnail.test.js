@@ -0,0 +1,68 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { mount, flushPromises } from '@vue/test-utils'
+import ArchiveThumbnail from '@/components/ArchiveThumbnail.vue'
+
+const getArchivePreviewImageMock = vi.hoisted(() => vi.fn())
+
+vi.mock('@/api', () => ({
+  archiveService: {
+    getArchivePreviewImage: getArchivePreviewImageMock,
+  },
+}))
+
+let originalURL
+
+describe('ArchiveThumbnail', () => {
+  beforeEach(() => {
+    getArchivePreviewImageMock.mockReset()
+    originalURL = globalThis.URL
+    globalThis.URL = {
+      createObjectURL: vi.fn(() => 'blob:thumb'),
+      revokeObjectURL: vi.fn(),
+    }
+  })
+
+  afterEach(() => {
+    globalThis.URL = originalURL
+  })
+
+  it('shows an icon without fetching when no preview exists', async () => {
+    const wrapper = mount(ArchiveThumbnail, { props: { courseId: 1, archiveId: 2 } })
+    await flushPromises()
+
+    expect(getArchivePreviewImageMock).not.toHaveBeenCalled()
+    expect(wrapper.find('img').exists()).toBe(false)
+    expect(wrapper.find('.pi-file-pdf').exists()).toBe(true)
+    wrapper.unmount()
+  })
+
+  it('loads the thumbnail blob and releases it on unmount', async () => {
+    getArchivePreviewImageMock.mockResolvedValue({ data: new Blob(['img']) })
+    const wrapper = mount(ArchiveThumbnail, {
+      props: { courseId: 1, archiveId: 2, version: '2024-01-01T00:00:00Z', alt: 'Midterm' },
+    })
+    await flushPromises()
+
+    expect(getArchivePreviewImageMock).toHaveBeenCalledWith(1, 2)
+    expect(wrapper.find('img').attributes('src')).toBe('blob:thumb')
+
+    await wrapper.find('button').trigger('click')
+    expect(wrapper.emitted('open')).toHaveLength(1)
+
+    wrapper.unmount()
+    expect(globalThis.URL.revokeObjectURL).toHaveBeenCalledWith('blob:thumb')
+  })
+
+  it('falls back to the icon when the image fails to load', async () => {
+    const consoleErrorSpy = vi.spyOn(console, 'error').mockImplementation(() => {})
+    getArchivePreviewImageMock.mockRejectedValue(new Error('missing'))
+    const wrapper = mount(ArchiveThumbnail, {
+      props: { courseId: 1, archiveId: 2, version: '2024-01-01T00:00:00Z' },
+    })
+    await flushPromises()
+
+    expect(wrapper.find('img').exists()).toBe(false)
+    consoleErrorSpy.mockRestore()
+    wrapper.unmount()
+  })
+})
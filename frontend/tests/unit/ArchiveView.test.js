@@ -17,6 +17,7 @@ const listCoursesMock = vi.hoisted(() => vi.fn())
 const getCourseArchivesMock = vi.hoisted(() => vi.fn())
 const getArchiveDownloadUrlMock = vi.hoisted(() => vi.fn())
 const getArchivePreviewUrlMock = vi.hoisted(() => vi.fn())
+const createArchiveBundleMock = vi.hoisted(() => vi.fn())
 const deleteArchiveMock = vi.hoisted(() => vi.fn())
 const updateArchiveMock = vi.hoisted(() => vi.fn())
 const updateArchiveCourseMock = vi.hoisted(() => vi.fn())
@@ -79,6 +80,9 @@ vi.mock('@/api', () => ({
   archiveService: {
     getArchiveDownloadUrl: getArchiveDownloadUrlMock,
     getArchivePreviewUrl: getArchivePreviewUrlMock,
+    toPdfSource: (preview) => preview?.url || '',
+    createArchiveBundle: createArchiveBundleMock,
+    getArchiveBundleUrl: (bundle) => `http://localhost${bundle.url}`,
     deleteArchive: deleteArchiveMock,
     updateArchive: updateArchiveMock,
     updateArchiveCourse: updateArchiveCourseMock,
@@ -118,6 +122,7 @@ vi.mock('@/utils/analytics', () => ({
     SEARCH_COURSE: 'search-course',
     SELECT_COURSE: 'select-course',
     DOWNLOAD_ARCHIVE: 'download-archive',
+    DOWNLOAD_ARCHIVE_BUNDLE: 'download-archive-bundle',
     PREVIEW_ARCHIVE: 'preview-archive',
     EDIT_ARCHIVE: 'edit-archive',
     DELETE_ARCHIVE: 'delete-archive',
@@ -177,6 +182,9 @@ describe('ArchiveView', () => {
     getArchivePreviewUrlMock.mockResolvedValue({
       data: { url: 'https://example.com/preview.pdf' },
     })
+    createArchiveBundleMock.mockResolvedValue({
+      data: { url: '/courses/c1/bundles/b1', filename: 'Calculus I.zip', archive_count: 1 },
+    })
     deleteArchiveMock.mockResolvedValue()
     updateArchiveMock.mockResolvedValue()
     updateArchiveCourseMock.mockResolvedValue()
@@ -275,6 +283,16 @@ describe('ArchiveView', () => {
     expect(getArchiveDownloadUrlMock).toHaveBeenCalled()
     expect(toastAddMock).toHaveBeenCalled()
 
+    await vm.downloadArchiveBundle()
+    await flushPromises()
+    expect(createArchiveBundleMock).toHaveBeenCalledWith('c1', {
+      archiveIds: vm.visibleArchiveIds,
+    })
+    expect(trackEventMock).toHaveBeenCalledWith(
+      'download-archive-bundle',
+      expect.objectContaining({ archiveCount: 1 })
+    )
+
     await vm.previewArchive(archiveItem)
     await flushPromises()
     expect(vm.showPreview).toBe(true)
@@ -25,6 +25,7 @@ const notificationStoreMock = vi.hoisted(() => ({
   initNotifications: vi.fn(),
   openCenter: vi.fn(),
   markNotificationAsSeen: vi.fn(),
+  disconnectNotificationStream: vi.fn(),
   latestUnseenNotification: null,
 }))
 
@@ -684,6 +685,7 @@ describe('Navbar methods', () => {
     expect(notificationStoreMock.state.active).toEqual([])
     expect(notificationStoreMock.state.all).toEqual([])
     expect(notificationStoreMock.state.initialized).toBe(false)
+    expect(notificationStoreMock.disconnectNotificationStream).toHaveBeenCalled()
   })
 
   it('renders template states for authentication transitions', async () => {
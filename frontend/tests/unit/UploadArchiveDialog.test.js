@@ -1,12 +1,9 @@
 import { describe, it, expect, vi, beforeEach, afterEach, beforeAll } from 'vitest'
 import { mount, flushPromises } from '@vue/test-utils'
 
-const courseServiceMock = vi.hoisted(() => ({
-  getCourseArchives: vi.fn(),
-}))
-
 const archiveServiceMock = vi.hoisted(() => ({
   uploadArchive: vi.fn(),
+  suggestProfessors: vi.fn(),
 }))
 
 const trackEventMock = vi.hoisted(() => vi.fn())
@@ -61,7 +58,6 @@ const pdfLoadMock = vi.hoisted(() =>
 )
 
 vi.mock('@/api', () => ({
-  courseService: courseServiceMock,
   archiveService: archiveServiceMock,
 }))
 
@@ -144,8 +140,14 @@ describe('UploadArchiveDialog', () => {
     trackEventMock.mockReset()
     toastAddMock.mockReset()
     archiveServiceMock.uploadArchive.mockResolvedValue()
-    courseServiceMock.getCourseArchives.mockResolvedValue({
-      data: [{ professor: 'Prof. Lin' }, { professor: 'Prof. Chen' }, { professor: 'Prof. Lin' }],
+    archiveServiceMock.suggestProfessors.mockImplementation((query) => {
+      const suggestions = [
+        { name: 'Prof. Lin', archive_count: 2 },
+        { name: 'Prof. Chen', archive_count: 1 },
+      ]
+      return Promise.resolve({
+        data: suggestions.filter((item) => item.name.toLowerCase().includes(query)),
+      })
     })
     isUnauthorizedErrorMock.mockReturnValue(false)
     pdfLoadMock.mockClear()
@@ -185,12 +187,19 @@ describe('UploadArchiveDialog', () => {
     expect(vm.form.subjectId).toBe('c1')
 
     await vm.fetchProfessorsForSubject('c1')
-    expect(courseServiceMock.getCourseArchives).toHaveBeenCalledWith('c1')
+    expect(archiveServiceMock.suggestProfessors).toHaveBeenCalledWith('', {
+      courseId: 'c1',
+      limit: 20,
+    })
 
-    vm.searchProfessor({ query: '' })
-    expect(vm.availableProfessors.length).toBe(2)
+    await vm.searchProfessor({ query: '' })
+    expect(vm.availableProfessors.map((item) => item.name)).toEqual(['Prof. Lin', 'Prof. Chen'])
 
-    vm.searchProfessor({ query: 'lin' })
+    await vm.searchProfessor({ query: 'lin' })
+    expect(archiveServiceMock.suggestProfessors).toHaveBeenCalledWith('lin', {
+      courseId: 'c1',
+      limit: 20,
+    })
     expect(vm.availableProfessors.length).toBe(1)
 
     const fakeFile = {
@@ -228,16 +237,16 @@ describe('UploadArchiveDialog', () => {
     expect(vm.formatFileSize(0)).toBe('0 Bytes')
     expect(vm.formatFileSize(2048)).toContain('KB')
 
-    courseServiceMock.getCourseArchives.mockRejectedValueOnce(new Error('fetch error'))
+    archiveServiceMock.suggestProfessors.mockRejectedValueOnce(new Error('fetch error'))
     await vm.fetchProfessorsForSubject('c1')
     expect(vm.uploadFormProfessors).toEqual([])
-    courseServiceMock.getCourseArchives.mockResolvedValue({ data: [] })
+    archiveServiceMock.suggestProfessors.mockResolvedValue({ data: [] })
 
     vm.uploadFormProfessors = [
       { name: 'Prof. Lin', code: 'Prof. Lin' },
       { name: 'Prof. Chen', code: 'Prof. Chen' },
     ]
-    vm.searchProfessor({ query: 'lin' })
+    await vm.searchProfessor({ query: 'lin' })
     expect(vm.availableProfessors).toEqual([expect.objectContaining({ name: 'Prof. Lin' })])
 
     vm.onProfessorSelect({ value: 'Prof. Hsu' })
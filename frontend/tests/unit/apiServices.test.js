@@ -6,6 +6,7 @@ import { authService } from '@/api/services/auth.js'
 import { aiExamService } from '@/api/services/aiExam.js'
 import { memeService } from '@/api/services/meme.js'
 import { statisticsService } from '@/api/services/statistics.js'
+import { searchService } from '@/api/services/search.js'
 import { discussionService } from '@/api/services/discussion.js'
 import { userService } from '@/api/services/users.js'
 import * as adminService from '@/api/services/admin.js'
@@ -31,6 +32,8 @@ vi.mock('@/api/services/client', () => ({
   },
   bindUnauthorizedWebSocket: (ws) => ws,
   buildWebSocketUrl: (path) => `ws://localhost${path}`,
+  buildApiUrl: (path) => `http://localhost${path}`,
+  getAuthToken: () => 'token-1',
 }))
 
 describe('API service wrappers', () => {
@@ -76,9 +79,30 @@ describe('API service wrappers', () => {
     archiveService.getArchivePreviewUrl('course-1', 'arch-1')
     expect(getMock).toHaveBeenCalledWith('/courses/course-1/archives/arch-1/preview')
 
+    archiveService.getArchivePreviewImage('course-1', 'arch-1')
+    expect(getMock).toHaveBeenCalledWith('/courses/course-1/archives/arch-1/preview-image', {
+      params: { variant: 'thumb' },
+      responseType: 'blob',
+    })
+
+    expect(archiveService.toPdfSource({ url: 'https://minio/a.pdf' })).toBe('https://minio/a.pdf')
+    expect(
+      archiveService.toPdfSource({ url: '/courses/course-1/archives/arch-1/content', proxied: true })
+    ).toEqual({
+      url: 'http://localhost/courses/course-1/archives/arch-1/content',
+      httpHeaders: { Authorization: 'Bearer token-1' },
+      withCredentials: true,
+    })
+
     archiveService.getArchiveDownloadUrl('course-1', 'arch-1')
     expect(getMock).toHaveBeenCalledWith('/courses/course-1/archives/arch-1/download')
 
+    archiveService.createArchiveBundle('course-1', { archiveIds: [1, 2] })
+    expect(postMock).toHaveBeenCalledWith('/courses/course-1/bundles', { archive_ids: [1, 2] })
+    expect(archiveService.getArchiveBundleUrl({ url: '/courses/course-1/bundles/b1' })).toBe(
+      'http://localhost/courses/course-1/bundles/b1'
+    )
+
     archiveService.deleteArchive('course-1', 'arch-1')
     expect(deleteMock).toHaveBeenCalledWith('/courses/course-1/archives/arch-1')
 
@@ -98,6 +122,11 @@ describe('API service wrappers', () => {
       course_name: 'Linear',
       course_category: 'freshman',
     })
+
+    archiveService.suggestProfessors('lin', { courseId: 'course-1', limit: 20 })
+    expect(getMock).toHaveBeenCalledWith('/archives/professors', {
+      params: { q: 'lin', course_id: 'course-1', limit: 20 },
+    })
   })
 
   it('notification service proxies', () => {
@@ -120,6 +149,8 @@ describe('API service wrappers', () => {
 
     notificationService.remove(1)
     expect(deleteMock).toHaveBeenCalledWith('/notifications/admin/notifications/1')
+
+    expect(notificationService.streamUrl()).toBe('http://localhost/notifications/stream')
   })
 
   it('auth service proxies', async () => {
@@ -181,6 +212,13 @@ describe('API service wrappers', () => {
     await expect(statisticsService.getSystemStatistics()).rejects.toThrow('fail')
   })
 
+  it('searchService passes the query and paging', () => {
+    searchService.search('微積分', { limit: 20, offset: 40 })
+    expect(getMock).toHaveBeenCalledWith('/search', {
+      params: { q: '微積分', limit: 20, offset: 40 },
+    })
+  })
+
   it('discussion service proxies', () => {
     discussionService.listArchiveMessages('course-1', 'arch-1')
     expect(getMock).toHaveBeenCalledWith('/courses/course-1/archives/arch-1/discussion/messages', {
@@ -226,8 +264,10 @@ describe('API service wrappers', () => {
     adminService.deleteCourse(1)
     expect(deleteMock).toHaveBeenCalledWith('/courses/admin/courses/1')
 
-    adminService.getUsers()
-    expect(getMock).toHaveBeenCalledWith('/users/admin/users')
+    adminService.getUsers({ q: 'ali', cursor: 'abc' })
+    expect(getMock).toHaveBeenCalledWith('/users/admin/users', {
+      params: { q: 'ali', cursor: 'abc' },
+    })
 
     adminService.createUser({ name: 'Alice' })
     expect(postMock).toHaveBeenCalledWith('/users/admin/users', { name: 'Alice' })
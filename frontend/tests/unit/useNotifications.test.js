@@ -32,12 +32,15 @@ const getAllMock = vi.hoisted(() =>
   }))
 )
 
+const streamUrlMock = vi.hoisted(() => vi.fn(() => 'http://localhost/api/notifications/stream'))
+
 const isUnauthorizedErrorMock = vi.hoisted(() => vi.fn(() => false))
 
 vi.mock('@/api', () => ({
   notificationService: {
     getActive: getActiveMock,
     getAll: getAllMock,
+    streamUrl: streamUrlMock,
   },
 }))
 
@@ -196,4 +199,69 @@ describe('useNotifications composable', () => {
 
     setItemSpy.mockRestore()
   })
+
+  it('applies stream events in place and refetches only on reset', async () => {
+    const sources = []
+    class FakeEventSource {
+      constructor(url) {
+        this.url = url
+        this.listeners = {}
+        this.close = vi.fn()
+        sources.push(this)
+      }
+      addEventListener(type, handler) {
+        this.listeners[type] = handler
+      }
+    }
+    vi.stubGlobal('EventSource', FakeEventSource)
+    const send = (event) => sources[0].listeners.notification({ data: JSON.stringify(event) })
+
+    const composable = await importComposable()
+    await composable.initNotifications()
+
+    expect(sources).toHaveLength(1)
+    expect(sources[0].url).toBe('http://localhost/api/notifications/stream')
+
+    send({
+      id: '1-0',
+      type: 'created',
+      notification_id: 7,
+      notification: {
+        id: 7,
+        title: 'Newest',
+        is_active: true,
+        created_at: '2025-12-01T10:00:00Z',
+        updated_at: '2025-12-01T10:00:00Z',
+      },
+    })
+    expect(composable.state.active.map((n) => n.id)).toEqual([7, 5, 2])
+    expect(composable.state.all.map((n) => n.id)).toEqual([7])
+    expect(composable.latestUnseenNotification.value?.id).toBe(7)
+
+    send({
+      id: '2-0',
+      type: 'updated',
+      notification_id: 5,
+      notification: { ...activeNotifications[1], is_active: false },
+    })
+    send({ id: '3-0', type: 'deleted', notification_id: 2, notification: null })
+    expect(composable.state.active.map((n) => n.id)).toEqual([7])
+    expect(getActiveMock).toHaveBeenCalledTimes(1)
+    expect(getAllMock).not.toHaveBeenCalled()
+
+    vi.useFakeTimers()
+    composable.state.centerVisible = true
+    sources[0].listeners.reset()
+    sources[0].listeners.reset()
+    expect(getActiveMock).toHaveBeenCalledTimes(1)
+    await vi.runAllTimersAsync()
+    expect(getActiveMock).toHaveBeenCalledTimes(2)
+    expect(getAllMock).toHaveBeenCalledTimes(1)
+    vi.useRealTimers()
+
+    composable.disconnectNotificationStream()
+    expect(sources[0].close).toHaveBeenCalled()
+
+    vi.unstubAllGlobals()
+  })
 })